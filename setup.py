@@ -41,7 +41,8 @@ setup(
               'vunit.parsing.verilog',
               'vunit.test.lint',
               'vunit.test.unit',
-              'vunit.test.acceptance'],
+              'vunit.test.acceptance',
+              'vunit.test.benchmark'],
     package_data={'vunit': data_files},
     zip_safe=False,
     url='https://github.com/VUnit/vunit',
@@ -28,6 +28,7 @@ class ActiveHDLInterface(SimulatorInterface):
     """
 
     name = "activehdl"
+    executable = "vsim"
     supports_gui_flag = True
     package_users_depend_on_bodies = True
     compile_options = [
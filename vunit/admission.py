@@ -0,0 +1,219 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Admit test suites to run in parallel within a memory budget and a number of simulator licenses
+"""
+
+import os
+import re
+import threading
+import tempfile
+import getpass
+import multiprocessing
+import logging
+from os.path import join, exists
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None  # pylint: disable=invalid-name
+    import msvcrt  # pylint: disable=import-error
+from vunit.ostools import read_file, file_exists
+LOGGER = logging.getLogger(__name__)
+
+
+class AdmissionController(object):
+    """
+    Decide which test suites may start such that the expected peak memory of
+    the running test suites stays within the memory budget and each running
+    test suite holds a license
+    """
+
+    def __init__(self, memory_budget=None, licenses=None, test_history=None):
+        """
+        :param memory_budget: Bytes of memory available to the test suites or None
+        :param licenses: A LicenseSemaphore or None
+        :param test_history: The TestHistory with the peak memory of earlier runs
+        """
+        self._memory_budget = memory_budget
+        self._licenses = licenses
+        self._test_history = test_history
+        self._lock = threading.Lock()
+        self._expected_memory = {}
+        self._running = {}
+        self._memory_in_use = 0
+
+    def set_test_suites(self, test_suites):
+        """
+        Set the test suites which will be admitted
+        """
+        if self._test_history is None:
+            return
+        names = [test_suite.name for test_suite in test_suites]
+        self._expected_memory = dict(zip(names, self._test_history.expected_max_rss(names)))
+
+    def try_admit(self, test_suite):
+        """
+        Return True if the test suite may start, it must then be released when done
+
+        A test suite is always admitted by memory when no other test suite is
+        running since it would never be admitted otherwise.
+        """
+        memory = self._expected_memory.get(test_suite.name, 0)
+        with self._lock:
+            if (self._memory_budget is not None and self._running and
+                    self._memory_in_use + memory > self._memory_budget):
+                return False
+
+            license_slot = None
+            if self._licenses is not None:
+                license_slot = self._licenses.try_acquire()
+                if license_slot is None:
+                    return False
+
+            self._running[id(test_suite)] = (memory, license_slot)
+            self._memory_in_use += memory
+            return True
+
+    def release(self, test_suite):
+        """
+        Release the memory and license of the test suite
+        """
+        with self._lock:
+            memory, license_slot = self._running.pop(id(test_suite))
+            self._memory_in_use -= memory
+
+        if license_slot is not None:
+            self._licenses.release(license_slot)
+
+
+class LicenseSemaphore(object):
+    """
+    A semaphore named after the license which is shared by the VUnit processes of the user on the host
+
+    Each of the count slots is a lock file. POSIX record locks are released
+    when the process dies and are not inherited by forked processes. On
+    Windows the first byte of the lock file is locked with msvcrt instead.
+    The lock files are kept in a directory of the user within the temporary
+    directory unless a path is given.
+    """
+
+    def __init__(self, name, count, path=None):
+        self._count = count
+        if path is None:
+            path = join(tempfile.gettempdir(), "vunit_licenses_%s" % _user_name())
+        self._path = join(path, name)
+        self._lock = threading.Lock()
+        self._held = {}
+        self._unavailable = set()
+        if not exists(self._path):
+            try:
+                os.makedirs(self._path)
+            except OSError:
+                # Created by another process or not writable which is reported by try_acquire
+                pass
+
+    def try_acquire(self):
+        """
+        Return a free slot or None if all are in use
+        """
+        with self._lock:
+            for idx in range(self._count):
+                if idx in self._held:
+                    continue
+
+                fptr = self._open_slot(idx)
+                if fptr is None:
+                    continue
+
+                try:
+                    if fcntl is not None:
+                        fcntl.lockf(fptr, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        fptr.seek(0)
+                        msvcrt.locking(fptr.fileno(), msvcrt.LK_NBLCK, 1)  # pylint: disable=used-before-assignment
+                except (IOError, OSError):
+                    fptr.close()
+                    continue
+
+                self._held[idx] = fptr
+                return idx
+        return None
+
+    def _open_slot(self, idx):
+        """
+        Open the lock file of the slot or return None when it cannot be opened such as when owned by another user
+        """
+        file_name = join(self._path, "%i.lock" % idx)
+        try:
+            return open(file_name, "a+")
+        except (IOError, OSError) as exc:
+            if idx not in self._unavailable:
+                self._unavailable.add(idx)
+                LOGGER.warning("License slot %s is unavailable: %s", file_name, exc)
+            return None
+
+    def release(self, idx):
+        """
+        Release a slot returned by try_acquire
+        """
+        with self._lock:
+            fptr = self._held.pop(idx)
+            if fcntl is None:
+                fptr.seek(0)
+                msvcrt.locking(fptr.fileno(), msvcrt.LK_UNLCK, 1)  # pylint: disable=used-before-assignment
+            fptr.close()
+
+
+def _user_name():
+    """
+    Return the name of the user usable as a file name, or unknown
+    """
+    try:
+        name = getpass.getuser()
+    except (ImportError, KeyError, OSError):
+        return "unknown"
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+def parse_license_limit(value, default_name=None):
+    """
+    Parse [NAME=]COUNT into a (name, count) tuple
+    """
+    if "=" in value:
+        name, count = value.rsplit("=", 1)
+    else:
+        name, count = default_name, value
+    count = int(count)
+    if count <= 0 or (name is not None and not re.match(r"^[\w.-]+$", name)):
+        raise ValueError(value)
+    return name, count
+
+
+def cpu_count():
+    """
+    Return the number of CPUs or 1 if unknown
+    """
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def available_memory():
+    """
+    Return the bytes of memory available for new processes or None if unknown
+    """
+    if file_exists("/proc/meminfo"):
+        match = re.search(r"^MemAvailable:\s+(\d+) kB", read_file("/proc/meminfo"), re.MULTILINE)
+        if match:
+            return int(match.group(1)) * 1024
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")  # pylint: disable=no-member
+    except (AttributeError, ValueError, OSError):
+        return None
@@ -8,13 +8,27 @@
 A simple file based database
 """
 
-from os.path import join, exists
+from os.path import join, exists, dirname, basename
 import os
 import pickle
 import io
 import struct
+import mmap
+import zlib
+import hashlib
+import logging
+from contextlib import contextmanager
 from vunit.ostools import renew_path
 
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None  # pylint: disable=invalid-name
+    import msvcrt  # pylint: disable=import-error
+
+LOGGER = logging.getLogger(__name__)
+
 
 class DataBase(object):
     """
@@ -25,8 +39,13 @@ class DataBase(object):
     Each nodes contains four bytes denoting the key length as an
     unsigned integer followed by the key followed by the data.
 
-    The reason to not just have the keys as the file names is that
-    many operating systems does not support very long file names thus limiting the key length
+    The node of a key is named by the hash of the key. The reason to not
+    just have the keys as the file names is that many operating systems
+    does not support very long file names thus limiting the key length.
+
+    Several processes may use the same database concurrently. Nodes are
+    written to a temporary file which is then renamed such that a node
+    is never seen partially written.
     """
 
     def __init__(self, path, new=False):
@@ -40,25 +59,12 @@ class DataBase(object):
         if new:
             renew_path(path)
         elif not exists(path):
-            os.makedirs(path)
-
-        # Map keys to nodes indexes
-        self._keys_to_nodes = self._discover_nodes()
-        if len(self._keys_to_nodes) == 0:
-            self._next_node = 0
-        else:
-            self._next_node = max(self._keys_to_nodes.values()) + 1
-
-    def _discover_nodes(self):
-        """
-        Discover nodes already found in the database
-        """
-        keys_to_nodes = {}
-        for file_base_name in os.listdir(self._path):
-            key = self._read_key(join(self._path, file_base_name))
-            assert key not in keys_to_nodes  # Two nodes contains the same key
-            keys_to_nodes[key] = int(file_base_name)
-        return keys_to_nodes
+            try:
+                os.makedirs(path)
+            except OSError:
+                # Created by another process at the same time
+                if not exists(path):
+                    raise
 
     @staticmethod
     def _read_key_from_fptr(fptr):
@@ -77,49 +83,536 @@ class DataBase(object):
         with io.open(file_name, "rb") as fptr:
             return self._read_key_from_fptr(fptr)
 
-    def _read_data(self, file_name):
+    def _read_node(self, key):
         """
-        Read key found in file_name
+        Read the data of key or return None if there is no node for the key
         """
-        with io.open(file_name, "rb") as fptr:
-            self._read_key_from_fptr(fptr)
-            data = fptr.read()
-        return data
+        try:
+            with io.open(self._to_file_name(key), "rb") as fptr:
+                if self._read_key_from_fptr(fptr) != key:
+                    return None
+                return fptr.read()
+        except (IOError, OSError):
+            return None
 
-    @staticmethod
-    def _write_node(file_name, key, value):
-        with io.open(file_name, "wb") as fptr:
+    def _write_node(self, key, value):
+        """
+        Write the node of key to a temporary file and rename it
+        """
+        file_name = self._to_file_name(key)
+        temp_file_name = join(self._path, ".%s.%i.tmp" % (basename(file_name), os.getpid()))
+        with io.open(temp_file_name, "wb") as fptr:
             fptr.write(struct.pack("I", len(key)))
             fptr.write(key)
             fptr.write(value)
+        _replace_file(temp_file_name, file_name)
 
     def _to_file_name(self, key):
         """
         Convert key to file name
         """
-        return join(self._path, str(self._keys_to_nodes[key]))
+        return join(self._path, hashlib.sha1(key).hexdigest())
+
+    def __setitem__(self, key, value):
+        self._write_node(key, value)
+
+    def __getitem__(self, key):
+        value = self._read_node(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return exists(self._to_file_name(key))
+
+    def __delitem__(self, key):
+        try:
+            os.remove(self._to_file_name(key))
+        except OSError:
+            raise KeyError(key)
+
+    def keys(self):
+        """
+        Return all keys by reading the key of each node
+        """
+        keys = []
+        for file_base_name in os.listdir(self._path):
+            if file_base_name.startswith("."):
+                # Temporary file
+                continue
+            try:
+                keys.append(self._read_key(join(self._path, file_base_name)))
+            except (IOError, OSError):
+                # Removed by another process
+                pass
+        return keys
+
+    @staticmethod
+    def lock():
+        """
+        Return a lock for reading and writing several keys, nodes are replaced
+        atomically but there is no lock shared between processes
+        """
+        return _NoLock()
+
+    def close(self):
+        """
+        Close the database, all values are already written
+        """
+        pass
+
+
+class FileLock(object):
+    """
+    Exclusive advisory lock of a lock file shared between processes
+
+    The lock may be acquired recursively by the same object
+    """
+
+    def __init__(self, file_name):
+        self._fptr = io.open(file_name, "a+b")
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fptr.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_windows()
+        self._depth += 1
+        return self
+
+    def _lock_windows(self):
+        """
+        Lock the first byte of the lock file, msvcrt gives up after 10 seconds
+        """
+        self._fptr.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self._fptr.fileno(), msvcrt.LK_LOCK, 1)  # pylint: disable=used-before-assignment
+                return
+            except (IOError, OSError):
+                pass
+
+    def __exit__(self, *args):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fptr.fileno(), fcntl.LOCK_UN)
+            else:
+                self._fptr.seek(0)
+                msvcrt.locking(self._fptr.fileno(), msvcrt.LK_UNLCK, 1)  # pylint: disable=used-before-assignment
+
+    def close(self):
+        self._fptr.close()
+
+
+class LogDataBase(object):  # pylint: disable=too-many-instance-attributes
+    """
+    A single file database where key value records are appended to a log
+    both keys and values are bytes
+
+    The file starts with a magic string followed by records. Each record
+    has a header with the record kind, key size, value size and a crc32
+    of the key and value. When the database is closed an index record
+    mapping all keys to the file offset of their latest value is
+    appended followed by a fixed size footer record pointing at the
+    index. Opening the database thus only requires reading the footer
+    and index. Values are read through a memory map of the file.
+
+    When the footer is missing, such as after a crash, the index is
+    re-created by scanning all records until the first incomplete or
+    corrupt record.
+
+    Several processes may use the same database concurrently. Records
+    are only appended while holding a lock of a separate lock file and
+    records appended by other processes are read before appending or
+    when a key is not found. A process which finds that the file has
+    been replaced by a compacted file opens the new file.
+    """
+
+    _magic = b"VUNITDB1"
+    _header = struct.Struct("<BIII")
+    _index_entry = struct.Struct("<QII")
+    _footer_value = struct.Struct("<Q")
+    _footer_size = _header.size + _footer_value.size
+
+    _DATA = 1
+    _INDEX = 2
+    _FOOTER = 3
+    _DELETE = 4
+
+    def __init__(self, path, new=False, read_only=False):
+        """
+        Create database in path
+        - path is a file
+        - new create new database
+        - read_only do not allow any modification
+        """
+        self._path = path
+        self._read_only = read_only
+        self._fptr = None
+        self._map = None
+
+        if read_only:
+            self._lock = _NoLock()
+        else:
+            if dirname(path) != "" and not exists(dirname(path)):
+                try:
+                    os.makedirs(dirname(path))
+                except OSError:
+                    # Created by another process at the same time
+                    if not exists(dirname(path)):
+                        raise
+            self._lock = FileLock(path + ".lock")
+
+        with self._lock:
+            if new or not (read_only or exists(path)):
+                assert not read_only
+                # Replace rather than truncate the file which might be mapped by other processes
+                with io.open(path + ".new", "wb") as fptr:
+                    fptr.write(self._magic)
+                _replace_file(path + ".new", path)
+            self._open()
+
+    def _open(self):
+        """
+        Open the file and read the index
+        """
+        # Map keys to (value offset, value size)
+        self._index = {}
+        self._live_bytes = 0
+        self._dirty = False
+
+        # Unbuffered such that records are written to the file immediately
+        self._fptr = io.open(self._path, "rb" if self._read_only else "r+b", buffering=0)
+        self._file_size = os.fstat(self._fptr.fileno()).st_size
+        self._map = mmap.mmap(self._fptr.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(self._magic)] != self._magic:
+            self._close_file()
+            raise RuntimeError("%s is not a database file" % self._path)
+
+        if not self._read_index_from_footer():
+            self._recover()
+
+    def _close_file(self):
+        """
+        Close the memory map and the file
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fptr is not None:
+            self._fptr.close()
+            self._fptr = None
+
+    def _read_record(self, offset, end):
+        """
+        Read the record at offset returning (kind, key, value offset, value size, record end)
+        or None when the record is incomplete or corrupt
+        """
+        if offset + self._header.size > end:
+            return None
+        kind, key_size, value_size, crc = self._header.unpack_from(self._map, offset)
+        key_offset = offset + self._header.size
+        record_end = key_offset + key_size + value_size
+        if kind not in (self._DATA, self._INDEX, self._FOOTER, self._DELETE) or record_end > end:
+            return None
+        if zlib.crc32(self._map[key_offset:record_end]) & 0xffffffff != crc:
+            return None
+        key = self._map[key_offset:key_offset + key_size]
+        return kind, key, key_offset + key_size, value_size, record_end
+
+    def _read_index_from_footer(self):
+        """
+        Read the index pointed to by the footer at the end of the file
+        Returns False if there is no valid footer
+        """
+        footer_offset = self._file_size - self._footer_size
+        if footer_offset < len(self._magic):
+            return False
+
+        footer = self._read_record(footer_offset, self._file_size)
+        if footer is None or footer[0] != self._FOOTER:
+            return False
+
+        index_offset = self._footer_value.unpack_from(self._map, footer[2])[0]
+        index = self._read_record(index_offset, footer_offset)
+        if index is None or index[0] != self._INDEX:
+            return False
+
+        _, _, offset, size, _ = index
+        end = offset + size
+        while offset < end:
+            value_offset, value_size, key_size = self._index_entry.unpack_from(self._map, offset)
+            offset += self._index_entry.size
+            key = self._map[offset:offset + key_size]
+            offset += key_size
+            self._index[key] = (value_offset, value_size)
+            self._live_bytes += self._header.size + key_size + value_size
+        return True
+
+    def _scan(self, offset, end):
+        """
+        Update the index from the records between offset and end
+        Returns the end of the last complete record
+        """
+        while True:
+            record = self._read_record(offset, end)
+            if record is None:
+                return offset
+            kind, key, value_offset, value_size, offset = record
+            if kind == self._DATA:
+                self._set_index(key, value_offset, value_size)
+            elif kind == self._DELETE and key in self._index:
+                self._remove_index(key)
+
+    def _recover(self):
+        """
+        Re-create the index by scanning all records
+        """
+        offset = self._scan(len(self._magic), self._file_size)
+
+        if offset < self._file_size:
+            LOGGER.warning("Discarding %i bytes of incomplete data at the end of database %s",
+                           self._file_size - offset, self._path)
+            if not self._read_only:
+                self._truncate(offset)
+
+        # Write a new index on close to avoid scanning again
+        self._dirty = not self._read_only
+
+    def _truncate(self, size):
+        """
+        Truncate the file to size
+        """
+        self._fptr.truncate(size)
+        self._file_size = size
+        self._remap()
+
+    def _remap(self):
+        """
+        Map the whole file again such that records appended since it was mapped can be read
+        """
+        self._map.close()
+        self._map = mmap.mmap(self._fptr.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _is_replaced(self):
+        """
+        Returns True if the file has been replaced by another process
+        """
+        try:
+            return os.stat(self._path).st_ino != os.fstat(self._fptr.fileno()).st_ino
+        except OSError:
+            return False
+
+    def _refresh(self):
+        """
+        Read the records appended by other processes
+        Must be called with the lock held unless read only
+        """
+        if self._is_replaced():
+            LOGGER.debug("Database %s was replaced, opening it again", self._path)
+            self._close_file()
+            self._open()
+            return
+
+        size = os.fstat(self._fptr.fileno()).st_size
+        if size == self._file_size:
+            return
+
+        self._remap()
+        offset = self._scan(self._file_size, size)
+        self._file_size = offset
+
+        if offset < size and not self._read_only:
+            # Incomplete record of a process which crashed while holding the lock
+            self._truncate(offset)
+
+    def _remove_index(self, key):
+        """
+        Remove key from the index and the amount of bytes used by live records
+        """
+        self._live_bytes -= self._header.size + len(key) + self._index[key][1]
+        del self._index[key]
+
+    def _set_index(self, key, value_offset, value_size):
+        """
+        Update the index and the amount of bytes used by live records
+        """
+        if key in self._index:
+            self._remove_index(key)
+        self._index[key] = (value_offset, value_size)
+        self._live_bytes += self._header.size + len(key) + value_size
+
+    @classmethod
+    def _pack_record(cls, kind, key, value):
+        """
+        Return the bytes of a record with header
+        """
+        return cls._header.pack(kind, len(key), len(value), zlib.crc32(key + value) & 0xffffffff) + key + value
+
+    def _append_record(self, kind, key, value):
+        """
+        Append record at the end of the file returning the offset of the value
+        Must be called with the lock held
+        """
+        offset = self._file_size
+        record = self._pack_record(kind, key, value)
+        self._fptr.seek(offset)
+        self._fptr.write(record)
+        self._file_size = offset + len(record)
+        return offset + self._header.size + len(key)
 
-    def _allocate_node_for_key(self, key):
+    def _check_writable(self):
         """
-        Allocate a node index for a new key
+        Raise RuntimeError if the database is read only
         """
-        assert key not in self._keys_to_nodes
-        self._keys_to_nodes[key] = self._next_node
-        self._next_node += 1
+        if self._read_only:
+            raise RuntimeError("Database %s is read only" % self._path)
 
     def __setitem__(self, key, value):
-        if key not in self._keys_to_nodes:
-            self._allocate_node_for_key(key)
-        self._write_node(self._to_file_name(key), key, value)
+        self._check_writable()
+        with self._lock:
+            self._refresh()
+            value_offset = self._append_record(self._DATA, key, value)
+        self._set_index(key, value_offset, len(value))
+        self._dirty = True
 
     def __getitem__(self, key):
         if key not in self:
             raise KeyError(key)
 
-        return self._read_data(self._to_file_name(key))
+        offset, size = self._index[key]
+        if offset + size > len(self._map):
+            # Written by this process after the file was mapped
+            self._remap()
+        return self._map[offset:offset + size]
 
     def __contains__(self, key):
-        return key in self._keys_to_nodes
+        if key in self._index:
+            return True
+
+        with self._lock:
+            self._refresh()
+        return key in self._index
+
+    def __delitem__(self, key):
+        self._check_writable()
+        with self._lock:
+            self._refresh()
+            if key not in self._index:
+                raise KeyError(key)
+            self._append_record(self._DELETE, key, b"")
+        self._remove_index(key)
+        self._dirty = True
+
+    def keys(self):
+        """
+        Return all keys including those written by other processes
+        """
+        with self._lock:
+            self._refresh()
+        return list(self._index.keys())
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold the lock shared between processes such that several keys are read and
+        written without other processes interleaving, the records of other processes are read first
+        """
+        self._check_writable()
+        with self._lock:
+            self._refresh()
+            yield
+
+    @classmethod
+    def _pack_index(cls, index):
+        """
+        Return the value of an index record
+        """
+        entries = []
+        for key, (value_offset, value_size) in index.items():
+            entries.append(cls._index_entry.pack(value_offset, value_size, len(key)))
+            entries.append(key)
+        return b"".join(entries)
+
+    def _write_index(self):
+        """
+        Append the index and the footer pointing at it
+        """
+        index_offset = self._file_size
+        self._append_record(self._INDEX, b"", self._pack_index(self._index))
+        self._append_record(self._FOOTER, b"", self._footer_value.pack(index_offset))
+
+    def _compact(self):
+        """
+        Re-write the database with only the latest value of each key
+        """
+        compact_path = self._path + ".compact"
+        index = {}
+        with io.open(compact_path, "wb") as fptr:
+            fptr.write(self._magic)
+            offset = len(self._magic)
+            for key in self._index:
+                value = self[key]
+                record = self._pack_record(self._DATA, key, value)
+                fptr.write(record)
+                index[key] = (offset + self._header.size + len(key), len(value))
+                offset += len(record)
+            fptr.write(self._pack_record(self._INDEX, b"", self._pack_index(index)))
+            fptr.write(self._pack_record(self._FOOTER, b"", self._footer_value.pack(offset)))
+
+        self._close_file()
+        _replace_file(compact_path, self._path)
+
+    def close(self):
+        """
+        Write the index and close the database
+        """
+        if self._fptr is None:
+            return
+
+        if self._dirty:
+            with self._lock:
+                self._refresh()
+                unused_bytes = self._file_size - len(self._magic) - self._live_bytes
+                if unused_bytes > max(self._live_bytes, 1024 * 1024):
+                    self._compact()
+                else:
+                    self._write_index()
+
+        self._close_file()
+        self._lock.close()
+
+
+class _NoLock(object):
+    """
+    Lock used by read only databases
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+def _replace_file(src, dst):
+    """
+    Rename src to dst replacing dst if it exists
+    """
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2.7
+        if exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
 
 
 class PickledDataBase(object):
@@ -138,3 +631,129 @@ class PickledDataBase(object):
 
     def __contains__(self, key):
         return key in self._database
+
+    def __delitem__(self, key):
+        del self._database[key]
+
+    def keys(self):
+        return self._database.keys()
+
+    def close(self):
+        self._database.close()
+
+
+class GenerationDataBase(object):
+    """
+    Wraps a byte based database tracking the generation in which each key was last used
+
+    Each time the database is opened a new generation starts. When closed
+    all keys which have not been used within the last max_age generations
+    are removed.
+    """
+
+    _generations_key = b"GenerationDataBase.generations"
+
+    def __init__(self, database, max_age=10):
+        self._database = database
+        self._max_age = max_age
+        self._touched = set()
+        generation, self._last_used = self._load_generations()
+        self._generation = generation + 1
+
+    def _load_generations(self):
+        """
+        Return the stored generation and the generation in which each key was last used
+        """
+        if self._generations_key in self._database:
+            return pickle.loads(self._database[self._generations_key])
+        return -1, {}
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def __getitem__(self, key):
+        value = self._database[key]
+        self._touched.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._database[key] = value
+        self._touched.add(key)
+
+    def __contains__(self, key):
+        if key in self._database:
+            self._touched.add(key)
+            return True
+        return False
+
+    def __delitem__(self, key):
+        del self._database[key]
+        self._touched.discard(key)
+        self._last_used.pop(key, None)
+
+    def keys(self):
+        return [key for key in self._database.keys() if key != self._generations_key]
+
+    def _last_used_generation(self, key):
+        """
+        Return the generation in which key was last used, keys from before
+        the generations were tracked count as used in the current generation
+        """
+        if key in self._touched:
+            return self._generation
+        return self._last_used.get(key, self._generation)
+
+    def remove_unused(self, max_age=0, measure_kept=False):
+        """
+        Remove all keys which have not been used within the last max_age generations
+
+        Returns a dictionary with the number of entries and bytes removed and kept,
+        the kept bytes are only measured when measure_kept is True
+        """
+        return self._remove_unused(self.keys(), max_age, measure_kept)
+
+    def _remove_unused(self, keys, max_age, measure_kept=False):
+        """
+        Remove the keys which have not been used within the last max_age generations
+        """
+        statistics = dict(removed_entries=0, removed_bytes=0, kept_entries=0, kept_bytes=0)
+        for key in keys:
+            try:
+                if self._last_used_generation(key) < self._generation - max_age:
+                    size = len(key) + len(self._database[key])
+                    del self[key]
+                    statistics["removed_entries"] += 1
+                    statistics["removed_bytes"] += size
+                else:
+                    statistics["kept_entries"] += 1
+                    if measure_kept:
+                        statistics["kept_bytes"] += len(key) + len(self._database[key])
+            except KeyError:
+                # Removed by another process
+                self._last_used.pop(key, None)
+        return statistics
+
+    def close(self):
+        """
+        Remove old keys, store the generation of each key and close the database
+
+        The generations stored by other processes since this database was opened
+        are merged while holding the lock of the database such that keys only used
+        by the other processes keep their generation. Only the keys known from
+        previous generations or used in this generation are considered to avoid
+        listing all keys of the database.
+        """
+        with self._database.lock():
+            generation, last_used = self._load_generations()
+            for key in set(self._last_used) | self._touched:
+                last_used[key] = max(last_used.get(key, -1), self._last_used_generation(key))
+            last_used.pop(self._generations_key, None)
+            self._generation = max(self._generation, generation)
+            self._last_used = last_used
+            self._touched = set()
+
+            self._remove_unused(set(self._last_used), self._max_age)
+            self._database[self._generations_key] = pickle.dumps((self._generation, self._last_used),
+                                                                 protocol=pickle.HIGHEST_PROTOCOL)
+        self._database.close()
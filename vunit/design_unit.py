@@ -56,13 +56,13 @@ class Entity(VHDLDesignUnit):
         VHDLDesignUnit.__init__(self, name, source_file, 'entity', True)
         self.generic_names = [] if generic_names is None else generic_names
         self._add_architecture_callback = None
-        self._architecture_names = {}
+        self._architecture_source_files = {}
 
     def add_architecture(self, design_unit):
         """
         Add architecture of this entity
         """
-        self._architecture_names[design_unit.name] = design_unit.source_file.name
+        self._architecture_source_files[design_unit.name] = design_unit.source_file
 
         if self._add_architecture_callback is not None:
             self._add_architecture_callback()
@@ -76,7 +76,12 @@ class Entity(VHDLDesignUnit):
 
     @property
     def architecture_names(self):
-        return self._architecture_names
+        return dict((name, source_file.name)
+                    for name, source_file in self._architecture_source_files.items())
+
+    @property
+    def architecture_source_files(self):
+        return self._architecture_source_files
 
     @property
     def is_entity(self):
@@ -0,0 +1,274 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Distribute test suites from a coordinator to workers on other hosts
+
+The protocol consists of JSON messages separated by newlines over TCP. A
+worker says hello and then runs each test suite the coordinator requests,
+streaming its output back followed by the results, until told to stop.
+There is no authentication so the coordinator should only be reachable from
+trusted hosts.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import logging
+from vunit.test_report import PASSED, FAILED, SKIPPED, TIMEOUT
+from vunit.ostools import ResourceUsage
+from vunit.output_file import OutputFile
+LOGGER = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+HELLO_TIMEOUT = 10.0
+_STATUS_BY_NAME = dict((status.name, status) for status in (PASSED, FAILED, SKIPPED, TIMEOUT))
+
+
+def parse_address(address, default_host=""):
+    """
+    Parse [HOST:]PORT into a (host, port) tuple
+    """
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+    else:
+        host, port = default_host, address
+    return host, int(port)
+
+
+class Connection(object):
+    """
+    Send and receive JSON messages over a socket
+    """
+
+    def __init__(self, sock):
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        """
+        Send a message, may be called from several threads
+        """
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            self._socket.sendall(data)
+
+    def receive(self):
+        """
+        Receive the next message, raises EOFError when the connection is closed
+        """
+        line = self._reader.readline()
+        if not line:
+            raise EOFError
+        return json.loads(line.decode("utf-8"))
+
+    def shutdown(self):
+        """
+        Make blocking calls in other threads return
+        """
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+
+    def close(self):
+        """
+        Close the connection
+        """
+        self._reader.close()
+        self._socket.close()
+
+
+def connect(address, timeout=60.0):
+    """
+    Connect to the coordinator at the (host, port) address, retry until timeout
+    such that workers may be started before the coordinator
+    """
+    start_time = time.time()
+    while True:
+        try:
+            return Connection(socket.create_connection(address))
+        except socket.error:
+            if time.time() - start_time > timeout:
+                raise
+            time.sleep(0.5)
+
+
+class Coordinator(object):
+    """
+    Listen for workers connecting to the coordinator
+    """
+
+    def __init__(self, address):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(address)
+        self._socket.listen(16)
+        self._socket.settimeout(0.1)
+
+    @property
+    def address(self):
+        """
+        The host and port the coordinator listens on
+        """
+        return self._socket.getsockname()[:2]
+
+    def accept(self, open_output_file=OutputFile):
+        """
+        Return a RemoteWorker for the next connecting worker or None when no worker connected within 0.1 s
+
+        :param open_output_file: Called with a file name to open the output file of a test suite
+        """
+        try:
+            sock, _ = self._socket.accept()
+        except socket.timeout:
+            return None
+
+        # A peer which connects but never says hello must not block the acceptor
+        sock.settimeout(HELLO_TIMEOUT)
+        connection = Connection(sock)
+        try:
+            hello = connection.receive()
+        except (EOFError, ValueError, socket.error):
+            LOGGER.warning("Dropped connection which did not say hello within %.0f s", HELLO_TIMEOUT)
+            connection.close()
+            return None
+
+        if not isinstance(hello, dict):
+            hello = {}
+
+        if hello.get("hello") != PROTOCOL_VERSION:
+            LOGGER.error("Rejected worker %s with protocol version %r", hello.get("name"), hello.get("hello"))
+            connection.close()
+            return None
+
+        sock.settimeout(None)
+        LOGGER.info("Worker %s connected", hello.get("name"))
+        return RemoteWorker(connection, hello.get("name"), open_output_file)
+
+    def close(self):
+        self._socket.close()
+
+
+class RemoteWorker(object):
+    """
+    Run test suites on a connected worker on behalf of a TestRunner thread
+    """
+
+    def __init__(self, connection, name, open_output_file=OutputFile):
+        self._connection = connection
+        self.name = name
+        self._open_output_file = open_output_file
+        self._alive = True
+
+    def is_alive(self):
+        return self._alive
+
+    def execute_test_suite(self, test_suite, output_path, output_file_name):
+        """
+        Run the test suite on the worker writing its output to the output file
+
+        Returns the results and resource usage, the results are None if the test suite could not be run
+        """
+        if not os.path.exists(output_path):
+            os.makedirs(output_path)
+
+        output_file = self._open_output_file(output_file_name)
+        try:
+            self._connection.send({"run": test_suite.name})
+            while True:
+                message = self._connection.receive()
+                if "output" in message:
+                    output_file.write(message["output"])
+                    output_file.flush()
+                elif "results" in message:
+                    results = dict((name, _STATUS_BY_NAME[status])
+                                   for name, status in message["results"].items())
+                    resources = message.get("resources")
+                    return results, None if resources is None else ResourceUsage.from_dict(resources)
+                elif "interrupt" in message:
+                    raise KeyboardInterrupt
+                else:
+                    LOGGER.error("Worker %s failed to run %s: %s",
+                                 self.name, test_suite.name, message.get("error"))
+                    return None, None
+
+        except (EOFError, ValueError, KeyError, TypeError, socket.error):
+            LOGGER.error("Lost connection to worker %s while running %s", self.name, test_suite.name)
+            self._alive = False
+            return None, None
+
+        finally:
+            output_file.close()
+
+    def terminate(self):
+        """
+        Stop using the worker and make a blocking receive return
+        """
+        self._alive = False
+        self._connection.shutdown()
+
+    def close(self):
+        """
+        Tell the worker to stop
+        """
+        if self._alive:
+            try:
+                self._connection.send({"stop": True})
+            except socket.error:
+                pass
+        self._connection.close()
+
+
+class _OutputSender(object):
+    """
+    File like object sending output to the coordinator
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def write(self, txt):
+        self._connection.send({"output": txt})
+
+    def flush(self):
+        pass
+
+
+def serve(connection, run_test_suite, name=None):
+    """
+    Run the test suites requested by the coordinator until told to stop
+
+    :param run_test_suite: Called with the name of the test suite and a file like object
+                           for the output, returns the results or None and the resource usage or None
+    """
+    if name is None:
+        name = "%s:%i" % (socket.gethostname(), os.getpid())
+    connection.send({"hello": PROTOCOL_VERSION, "name": name})
+
+    try:
+        while True:
+            message = connection.receive()
+            if "stop" in message:
+                return
+
+            try:
+                results, resource_usage = run_test_suite(message["run"], _OutputSender(connection))
+            except KeyboardInterrupt:
+                connection.send({"interrupt": True})
+                raise
+
+            if results is None:
+                connection.send({"error": "Could not run %s" % message["run"]})
+            else:
+                connection.send({"results": dict((test_name, status.name)
+                                                 for test_name, status in results.items()),
+                                 "resources": None if resource_usage is None else resource_usage.to_dict()})
+    except EOFError:
+        LOGGER.info("Coordinator closed the connection")
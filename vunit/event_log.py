@@ -0,0 +1,68 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Machine readable log of the events of a run as JSON Lines
+
+Each line is a JSON object with the name of the event, the time it
+happened and the fields of the event. The events are appended and flushed
+one by one such that a crashed run still leaves a usable partial log.
+"""
+
+import io
+import os
+import json
+import threading
+import time
+import logging
+LOGGER = logging.getLogger(__name__)
+
+
+class EventLog(object):
+    """
+    Write events to a binary file object
+    """
+
+    def __init__(self, fptr):
+        self._fptr = fptr
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, target):
+        """
+        Open the event log appending to the file named target or to the file descriptor when target is a number
+        """
+        if target.isdigit():
+            return cls(os.fdopen(int(target), "ab"))
+        return cls(io.open(target, "ab"))
+
+    def emit(self, event, **fields):
+        """
+        Append an event with the fields
+        """
+        fields["event"] = event
+        fields["time"] = time.time()
+        data = (json.dumps(fields, sort_keys=True) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fptr is None:
+                return
+
+            try:
+                self._fptr.write(data)
+                self._fptr.flush()
+            except (IOError, OSError) as exc:
+                # Such as when the consumer of a pipe has exited, the run itself should continue
+                LOGGER.warning("Could not write to the event log, no more events are written: %s", exc)
+                self._fptr = None
+
+    def close(self):
+        """
+        Close the event log, later events are ignored
+        """
+        with self._lock:
+            if self._fptr is not None:
+                self._fptr.close()
+                self._fptr = None
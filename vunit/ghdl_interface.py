@@ -27,6 +27,7 @@ class GHDLInterface(SimulatorInterface):
     """
 
     name = "ghdl"
+    executable = "ghdl"
     supports_gui_flag = True
 
     compile_options = [
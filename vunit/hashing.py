@@ -9,6 +9,10 @@ Wrapper arround selected hash method
 """
 
 import hashlib
+import io
+import os
+import time
+from os.path import abspath
 
 
 def hash_string(string):
@@ -16,3 +20,65 @@ def hash_string(string):
     returns hash of bytes
     """
     return hashlib.sha1(string.encode(encoding="utf-8")).hexdigest()
+
+
+def hash_bytes(data):
+    """
+    returns hash of bytes prefixed by the hash method
+    """
+    return "sha1:" + hashlib.sha1(data).hexdigest()
+
+
+class ContentHashCache(object):
+    """
+    Project wide cache of file content hashes keyed by the absolute file
+    name and its stat signature.
+
+    Within one run each file is read and hashed at most once. When a
+    database is given the hashes are also kept between runs and a file
+    with unchanged stat signature is not read at all.
+    """
+
+    # A signature recorded less than this many seconds after the file
+    # was modified is not trusted since the modification time might not
+    # change when the file is modified again within its resolution
+    _racy_seconds = 2.0
+
+    def __init__(self, database=None):
+        self._database = database
+        self._content_hashes = {}
+
+    def content_hash(self, file_name):
+        """
+        Return the content hash of file_name or None if it does not exist
+        """
+        file_name = abspath(file_name)
+        if file_name not in self._content_hashes:
+            self._content_hashes[file_name] = self._find_content_hash(file_name)
+        return self._content_hashes[file_name]
+
+    def _find_content_hash(self, file_name):
+        """
+        Find the content hash of file_name either from the database or by reading the file
+        """
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return None
+
+        signature = (stat.st_size, stat.st_mtime, stat.st_ino)
+        key = ("ContentHashCache.content_hash(%s)" % file_name).encode()
+
+        if self._database is not None and key in self._database:
+            old_signature, old_hash_time, content_hash = self._database[key]
+            if old_signature == signature and stat.st_mtime < old_hash_time - self._racy_seconds:
+                return content_hash
+
+        hash_time = time.time()
+        with io.open(file_name, "rb") as fptr:
+            content_hash = hash_bytes(fptr.read())
+
+        if self._database is not None:
+            self._database[key] = signature, hash_time, content_hash
+
+        return content_hash
@@ -27,6 +27,7 @@ class IncisiveInterface(SimulatorInterface):  # pylint: disable=too-many-instanc
     """
 
     name = "incisive"
+    executable = "irun"
     supports_gui_flag = True
     package_users_depend_on_bodies = False
 
@@ -0,0 +1,97 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Merge the JUnit XML reports or the test histories of several shards
+
+python -m vunit.merge_reports --xunit-xml merged.xml shard*/report.xml
+python -m vunit.merge_reports --test-history merged.json shard*/test_history.json
+"""
+
+from __future__ import print_function
+import argparse
+import sys
+from sys import version_info
+from xml.etree import ElementTree
+from vunit.ostools import read_file, write_file
+from vunit.test_history import TestHistory
+
+
+def merge_junit_xml(xml_strings):
+    """
+    Merge JUnit XML test suites into one test suite
+    """
+    root = ElementTree.Element("testsuite")
+    root.attrib["name"] = "testsuite"
+    root.attrib["errors"] = "0"
+
+    hostnames = []
+    for xml in xml_strings:
+        testsuite = ElementTree.fromstring(xml)
+        hostname = testsuite.attrib.get("hostname")
+        if hostname is not None and hostname not in hostnames:
+            hostnames.append(hostname)
+        for testcase in testsuite.findall("testcase"):
+            root.append(testcase)
+
+    testcases = root.findall("testcase")
+    root.attrib["failures"] = str(sum(1 for test in testcases if test.find("failure") is not None))
+    root.attrib["skipped"] = str(sum(1 for test in testcases if test.find("skipped") is not None))
+    root.attrib["tests"] = str(len(testcases))
+    root.attrib["hostname"] = ",".join(hostnames)
+
+    if version_info >= (3, 0):
+        # Python 3.x
+        return ElementTree.tostring(root, encoding="unicode")
+
+    # Python 2.x
+    return ElementTree.tostring(root, encoding="utf-8")
+
+
+def merge_test_histories(test_histories):
+    """
+    Merge test histories into one test history
+    """
+    merged = TestHistory()
+    for test_history in test_histories:
+        merged.merge(test_history)
+    return merged
+
+
+def _create_parser():
+    """
+    Create the command line argument parser
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--xunit-xml", default=None,
+                       help="Merge JUnit XML reports into this file")
+    group.add_argument("--test-history", default=None,
+                       help="Merge test histories into this file")
+    parser.add_argument("files", nargs="+",
+                        help="The reports or test histories of the shards")
+    return parser
+
+
+def main(argv=None):
+    """
+    Merge reports from the command line
+    """
+    args = _create_parser().parse_args(argv)
+
+    if args.xunit_xml is not None:
+        write_file(args.xunit_xml, merge_junit_xml([read_file(file_name) for file_name in args.files]))
+        print("Merged %i JUnit XML reports into %s" % (len(args.files), args.xunit_xml))
+    else:
+        merged = merge_test_histories([TestHistory.load(file_name) for file_name in args.files])
+        merged.save(args.test_history)
+        print("Merged %i test histories into %s" % (len(args.files), args.test_history))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
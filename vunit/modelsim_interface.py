@@ -41,6 +41,7 @@ class ModelSimInterface(VsimSimulatorMixin, SimulatorInterface):  # pylint: disa
     re-using the same vsim process to avoid startup-overhead (persistent=True)
     """
     name = "modelsim"
+    executable = "vsim"
     supports_gui_flag = True
     package_users_depend_on_bodies = False
 
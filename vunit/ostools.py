@@ -13,10 +13,13 @@ stubbed for testing
 from __future__ import print_function
 
 import time
+import signal
 import subprocess
 import threading
 import shutil
 import sys
+import codecs
+from collections import deque
 try:
     # Python 3.x
     from queue import Queue, Empty
@@ -24,6 +27,12 @@ except ImportError:
     # Python 2.7
     from Queue import Queue, Empty  # pylint: disable=import-error
 
+try:
+    # Python 3.4+
+    import selectors
+except ImportError:
+    selectors = None  # pylint: disable=invalid-name
+
 from os.path import exists, getmtime, dirname, relpath, splitdrive
 import os
 import io
@@ -58,6 +67,146 @@ class ProgramStatus(object):
 PROGRAM_STATUS = ProgramStatus()
 
 
+class TimeoutExpired(Exception):
+    """
+    Raised when a thread waits for a process after its deadline
+    """
+    pass
+
+
+_DEADLINE = threading.local()
+
+
+def set_deadline(deadline):
+    """
+    Set the time.time() after which waiting for processes raises TimeoutExpired
+    within the calling thread, None removes the deadline
+    """
+    _DEADLINE.time = deadline
+
+
+def check_deadline():
+    """
+    Raise TimeoutExpired when the deadline of the calling thread has passed
+    """
+    deadline = getattr(_DEADLINE, "time", None)
+    if deadline is not None and time.time() > deadline:
+        raise TimeoutExpired
+
+
+class ResourceUsage(object):
+    """
+    The resource usage of terminated child processes
+
+    Bytes written are counted in the 512 byte blocks reported by the operating
+    system and only cover writes reaching the storage layer.
+    """
+
+    def __init__(self, cpu_time=0.0, max_rss=0, bytes_written=0):
+        self.cpu_time = cpu_time
+        self.max_rss = max_rss
+        self.bytes_written = bytes_written
+
+    @classmethod
+    def from_rusage(cls, rusage):
+        """
+        Create from the rusage of os.wait4, ru_maxrss is in kilobytes except on macOS
+        """
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        return cls(cpu_time=rusage.ru_utime + rusage.ru_stime,
+                   max_rss=max_rss,
+                   bytes_written=rusage.ru_oublock * 512)
+
+    def add(self, other):
+        """
+        Add the usage of another process which ran before or in parallel
+        """
+        self.cpu_time += other.cpu_time
+        self.max_rss = max(self.max_rss, other.max_rss)
+        self.bytes_written += other.bytes_written
+
+    def split(self, num_parts):
+        """
+        Split the usage among num_parts tests which shared the same processes
+        """
+        return ResourceUsage(cpu_time=self.cpu_time / num_parts,
+                             max_rss=self.max_rss,
+                             bytes_written=self.bytes_written // num_parts)
+
+    def to_dict(self):
+        """
+        Return a dictionary of built-in types such as for JSON
+        """
+        return {"cpu_time": self.cpu_time,
+                "max_rss": self.max_rss,
+                "bytes_written": self.bytes_written}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create from a dictionary returned by to_dict
+        """
+        return cls(**data)
+
+    def __eq__(self, other):
+        return isinstance(other, ResourceUsage) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "ResourceUsage(%r)" % self.to_dict()
+
+
+class _Accounting(object):
+    """
+    The accounting period of a thread, processes may be reaped by other threads
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage = ResourceUsage()
+        self._is_open = True
+
+    def add(self, usage):
+        """
+        Add the usage of a reaped process unless the accounting period has ended
+        """
+        with self._lock:
+            if self._is_open:
+                self._usage.add(usage)
+
+    def close(self):
+        """
+        End the accounting period and return the accumulated usage
+        """
+        with self._lock:
+            self._is_open = False
+            return self._usage
+
+
+_ACCOUNTING = threading.local()
+
+
+def start_resource_accounting():
+    """
+    Start accumulating the resource usage of processes started by the calling thread
+    """
+    _ACCOUNTING.current = _Accounting()
+
+
+def stop_resource_accounting():
+    """
+    Stop accumulating, returns the resource usage of all processes which were
+    both started and terminated since the start or None when not supported
+    """
+    accounting = getattr(_ACCOUNTING, "current", None)
+    _ACCOUNTING.current = None
+    if accounting is None or not hasattr(os, "wait4"):
+        return None
+    return accounting.close()
+
+
 class InterruptableQueue(object):
     """
     A Queue which can be interrupted
@@ -69,6 +218,7 @@ class InterruptableQueue(object):
     def get(self):
         while True:
             PROGRAM_STATUS.check_for_shutdown()
+            check_deadline()
             try:
                 return self._queue.get(timeout=0.1)
             except Empty:
@@ -81,7 +231,7 @@ class InterruptableQueue(object):
         return self._queue.empty()
 
 
-class Process(object):
+class Process(object):  # pylint: disable=too-many-instance-attributes
     """
     A simple process interface which supports asynchronously consuming the stdout and stderr
     of the process while it is running.
@@ -123,9 +273,57 @@ class Process(object):
 
         LOGGER.debug("Started process with pid=%i: '%s'", self._process.pid, (" ".join(args)))
 
+        # Processes which outlive the accounting period such as persistent simulators are not accounted
+        self._accounting = getattr(_ACCOUNTING, "current", None)
+        self._reap_lock = threading.Lock()
+        self.resource_usage = None
+
         self._queue = InterruptableQueue()
-        self._reader = AsynchronousFileReader(self._process.stdout, self._queue)
-        self._reader.start()
+        # Lines of a chunk from the queue which have not been consumed yet
+        self._lines = deque()
+        self._exit_watcher = None
+        engine = get_io_engine()
+        if engine is None:
+            self._reader = AsynchronousFileReader(self._process.stdout, self._queue)
+            self._reader.start()
+            self._chunked = False
+        else:
+            self._reader = engine.add_reader(self._process.stdout, self._queue)
+            self._exit_watcher = engine.add_exit_watcher(self)
+            self._chunked = True
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    def poll(self):
+        """
+        Reap the process if it has terminated, returns the exit code or None if it is alive
+
+        The process is reaped with os.wait4 when available to get its resource usage
+        """
+        with self._reap_lock:
+            if self._process.returncode is not None or not hasattr(os, "wait4"):
+                return self._process.poll()
+
+            try:
+                pid, status, rusage = os.wait4(self._process.pid, os.WNOHANG)  # pylint: disable=no-member
+            except OSError:
+                # Already reaped
+                return self._process.poll()
+
+            if pid == 0:
+                return None
+
+            if os.WIFSIGNALED(status):
+                self._process.returncode = -os.WTERMSIG(status)
+            else:
+                self._process.returncode = os.WEXITSTATUS(status)
+
+            self.resource_usage = ResourceUsage.from_rusage(rusage)
+            if self._accounting is not None:
+                self._accounting.add(self.resource_usage)
+            return self._process.returncode
 
     def write(self, *args, **kwargs):
         """ Write to stdin """
@@ -143,9 +341,9 @@ class Process(object):
         Return either the next line or the exit code
         """
 
-        if not self._reader.eof():
+        if not self._eof():
             # Show what we received from standard output.
-            msg = self._queue.get()
+            msg = self._get_line()
 
             if msg is not None:
                 return msg
@@ -153,13 +351,51 @@ class Process(object):
         retcode = self.wait()
         return retcode
 
-    def wait(self):
+    def _eof(self):
+        return not self._lines and self._reader.eof()
+
+    def _get_line(self):
+        """
+        Return the next line of output or None at end of file
+        """
+        if not self._lines:
+            chunk = self._queue.get()
+            if chunk is None or not self._chunked:
+                return chunk
+            self._lines.extend(chunk[:-1].split("\n"))
+        return self._lines.popleft()
+
+    def _get_chunk(self):
+        """
+        Return the next output as a string of whole lines ending with newline or None at end of file
+        """
+        if self._lines:
+            chunk = "".join(line + "\n" for line in self._lines)
+            self._lines.clear()
+            return chunk
+
+        chunk = self._queue.get()
+        if chunk is None or self._chunked:
+            return chunk
+        return chunk + "\n"
+
+    def wait(self, use_deadline=True):
         """
         Wait while without completely blocking to avoid
-        deadlock when shutting down
+        deadlock when shutting down or waiting beyond the deadline of the thread
         """
-        while self._process.poll() is None:
+        if self._exit_watcher is not None:
+            while not self._exit_watcher.wait(0.1):
+                PROGRAM_STATUS.check_for_shutdown()
+                if use_deadline:
+                    check_deadline()
+                LOGGER.debug("Waiting for process with pid=%i to stop", self._process.pid)
+            return self._process.wait()
+
+        while self.poll() is None:
             PROGRAM_STATUS.check_for_shutdown()
+            if use_deadline:
+                check_deadline()
             time.sleep(0.05)
             LOGGER.debug("Waiting for process with pid=%i to stop", self._process.pid)
         return self._process.returncode
@@ -168,28 +404,36 @@ class Process(object):
         """
         Returns true if alive
         """
-        return self._process.poll() is None
+        return self.poll() is None
 
     def consume_output(self, callback=print):
         """
         Consume the output of the process.
         The output is interpreted as UTF-8 text.
 
-        @param callback Called for each line of output
+        @param callback Called for each line of output, when it is print whole chunks of
+                        output are written to stdout at once instead of printing each line
         @raises Process.NonZeroExitCode when the process does not exit with code zero
         """
 
         try:
-            if callback is not None:
-                while not self._reader.eof():
-                    line = self._queue.get()
+            if callback is print:
+                while not self._eof():
+                    chunk = self._get_chunk()
+                    if chunk is None:
+                        break
+                    sys.stdout.write(chunk)
+
+            elif callback is not None:
+                while not self._eof():
+                    line = self._get_line()
                     if line is None:
                         break
 
                     if callback(line) is not None:
                         return
             else:
-                while (not self._reader.eof()) and (self._queue.get() is not None):
+                while (not self._eof()) and (self._get_chunk() is not None):
                     pass
 
             retcode = None
@@ -208,20 +452,20 @@ class Process(object):
         Terminate the process
         """
         # Let's be tidy and join the threads we've started.
-        if self._process.poll() is None:
+        if self.poll() is None:
             LOGGER.debug("Terminating process with pid=%i", self._process.pid)
-            self._process.terminate()
+            self._signal_process_group(kill=False)
 
-        if self._process.poll() is None:
+        if self.poll() is None:
             time.sleep(0.05)
 
-        if self._process.poll() is None:
+        if self.poll() is None:
             LOGGER.debug("Killing process with pid=%i", self._process.pid)
-            self._process.kill()
+            self._signal_process_group(kill=True)
 
-        if self._process.poll() is None:
+        if self.poll() is None:
             LOGGER.debug("Waiting for process with pid=%i", self._process.pid)
-            self.wait()
+            self.wait(use_deadline=False)
 
         LOGGER.debug("Process with pid=%i terminated with code=%i",
                      self._process.pid,
@@ -231,6 +475,23 @@ class Process(object):
         self._process.stdout.close()
         self._process.stdin.close()
 
+    def _signal_process_group(self, kill):
+        """
+        Terminate or kill the process group created for the process such that its children also stop
+        """
+        if IS_WINDOWS_SYSTEM:
+            if kill:
+                self._process.kill()
+            else:
+                self._process.terminate()
+            return
+
+        try:
+            os.killpg(self._process.pid, signal.SIGKILL if kill else signal.SIGTERM)  # pylint: disable=no-member
+        except OSError:
+            # No process left in the group
+            pass
+
     def __del__(self):
         self.terminate()
 
@@ -273,6 +534,221 @@ class AsynchronousFileReader(threading.Thread):
         return not self.is_alive() and self._queue.empty()
 
 
+class IOEngine(object):
+    """
+    Multiplex the output pipes and exit notifications of all child
+    processes within a single thread using the selectors module instead
+    of using one reader thread per process
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name="vunit-io-engine")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add_reader(self, fd, queue, encoding="utf-8"):
+        """
+        Push the output read from fd on the queue followed by None at end of file,
+        the output is pushed as chunks of whole lines each ending with a newline
+
+        Returns a reader object with the same eof and join methods as AsynchronousFileReader
+        """
+        reader = _PipeReader(fd, queue, encoding)
+        self._register(reader.fileno, reader)
+        return reader
+
+    def add_exit_watcher(self, process):
+        """
+        Reap the process as soon as it exits by calling its poll method, such as of a subprocess.Popen
+
+        Returns an object with a wait(timeout) method or None if
+        child exit notification is not supported by the platform
+        """
+        if not hasattr(os, "pidfd_open"):
+            return None
+
+        try:
+            pidfd = os.pidfd_open(process.pid)  # pylint: disable=no-member
+        except OSError:
+            return None
+
+        watcher = _ExitWatcher(pidfd, process)
+        self._register(pidfd, watcher)
+        return watcher
+
+    def _register(self, fileno, handler):
+        """
+        Register the handler from any thread, the selector itself is only used by the engine thread
+        """
+        with self._lock:
+            self._pending.append((fileno, handler))
+        os.write(self._wakeup_write, b"\0")
+
+    def _wakeup(self):
+        """
+        Register pending handlers
+        """
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except OSError:
+            pass
+
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+
+        for fileno, handler in pending:
+            self._selector.register(fileno, selectors.EVENT_READ, handler)
+
+    def _run(self):
+        """
+        The body of the engine thread
+        """
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    self._wakeup()
+                elif not key.data.on_readable():
+                    # Unregister before the file descriptor may be closed and reused
+                    self._selector.unregister(key.fileobj)
+                    key.data.close()
+
+
+class _PipeReader(object):
+    """
+    Split the output of a pipe into chunks of whole lines on behalf of the IOEngine
+
+    Pushing chunks instead of single lines avoids the cost of a queue
+    operation per line for simulators with a lot of output.
+    """
+
+    def __init__(self, fd, queue, encoding):
+        self.fileno = fd.fileno()
+        os.set_blocking(self.fileno, False)
+        # Same universal newlines translation as TextIOWrapper
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(errors="ignore"), translate=True)
+        self._queue = queue
+        self._partial = ""
+        self._done = threading.Event()
+
+    def on_readable(self):
+        """
+        Read available data, returns False at end of file
+        """
+        try:
+            data = os.read(self.fileno, 65536)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            data = b""
+
+        text = self._partial + self._decoder.decode(data, final=not data)
+        end = text.rfind("\n") + 1
+        chunk, self._partial = text[:end], text[end:]
+
+        if not data and self._partial != "":
+            chunk += self._partial + "\n"
+            self._partial = ""
+
+        if chunk:
+            self._queue.put(chunk)
+
+        if not data:
+            self._queue.put(None)
+            return False
+        return True
+
+    def close(self):
+        """
+        Called when no longer watched, the file itself is closed by the owning Process
+        """
+        self._done.set()
+
+    def eof(self):
+        """Check whether there is no more content to expect."""
+        return self._done.is_set() and self._queue.empty()
+
+    def join(self):
+        """Wait until end of file has been reached"""
+        while not self._done.wait(0.1):
+            if PROGRAM_STATUS.is_shutting_down:
+                break
+
+
+class _ExitWatcher(object):
+    """
+    Reap a process when the IOEngine is notified of its exit through a pidfd
+    """
+
+    def __init__(self, pidfd, process):
+        self._pidfd = pidfd
+        self._process = process
+        self._exited = threading.Event()
+
+    def on_readable(self):
+        """
+        The process has exited
+        """
+        self._process.poll()
+        return False
+
+    def close(self):
+        """
+        Called when no longer watched
+        """
+        os.close(self._pidfd)
+        self._exited.set()
+
+    def wait(self, timeout):
+        """
+        Wait at most timeout seconds for the process to exit, returns True if it has exited
+        """
+        return self._exited.wait(timeout)
+
+
+_IO_ENGINE = None
+_IO_ENGINE_PID = None
+_IO_ENGINE_LOCK = threading.Lock()
+
+
+def _reset_io_engine_after_fork():
+    """
+    The engine thread does not survive a fork and the lock might have been held by another thread
+    """
+    global _IO_ENGINE, _IO_ENGINE_LOCK  # pylint: disable=global-statement
+    _IO_ENGINE = None
+    _IO_ENGINE_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_io_engine_after_fork)  # pylint: disable=no-member
+
+
+def get_io_engine():
+    """
+    Return the IOEngine of this process or None when the platform does not support it
+    """
+    global _IO_ENGINE, _IO_ENGINE_PID  # pylint: disable=global-statement
+
+    if selectors is None or IS_WINDOWS_SYSTEM or not hasattr(os, "set_blocking"):
+        return None
+
+    with _IO_ENGINE_LOCK:
+        # The engine thread does not survive a fork
+        if _IO_ENGINE is None or _IO_ENGINE_PID != os.getpid():
+            _IO_ENGINE = IOEngine()
+            _IO_ENGINE_PID = os.getpid()
+        return _IO_ENGINE
+
+
 def read_file(file_name, encoding="utf-8"):
     """ To stub during testing """
     try:
@@ -0,0 +1,131 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Write the output of a test suite straight to disk, optionally gzip compressed and
+truncated at a size cap, while keeping only the last lines in memory
+"""
+
+import io
+import gzip
+from collections import deque
+
+
+class OutputFile(object):
+    """
+    File like object for the output of a test suite
+
+    The file is gzip compressed when its name ends with .gz. Output beyond
+    the size cap is dropped from the file but still kept in the tail.
+    """
+
+    def __init__(self, file_name, tail_lines=None, size_cap=None):
+        """
+        :param tail_lines: The number of last lines to keep in memory or None
+        :param size_cap: The maximum number of bytes written to the file or None
+        """
+        if file_name.endswith(".gz"):
+            # Favor speed over size since the output is written while simulating
+            self._file = gzip.open(file_name, "wb", compresslevel=1)
+        else:
+            self._file = io.open(file_name, "wb")
+        self._tail = None if tail_lines is None else deque(maxlen=tail_lines)
+        self._partial = ""
+        self._num_lines = 0
+        self._size_cap = size_cap
+        self._size = 0
+        self.truncated = False
+
+    def write(self, txt):
+        """
+        Write text to the file and the tail
+        """
+        if self._tail is not None:
+            lines = (self._partial + txt).split("\n")
+            self._partial = lines.pop()
+            self._num_lines += len(lines)
+            self._tail.extend(lines)
+
+        if self.truncated:
+            return
+
+        data = txt if isinstance(txt, bytes) else txt.encode("utf-8")
+        if self._size_cap is not None and self._size + len(data) > self._size_cap:
+            self._file.write(data[:self._size_cap - self._size])
+            self._file.write(("\n*** Output truncated after %i bytes ***\n" % self._size_cap).encode("utf-8"))
+            self._size = self._size_cap
+            self.truncated = True
+            return
+
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def tail(self):
+        """
+        Return the number of omitted lines and the last lines kept in memory
+        """
+        assert self._tail is not None
+        lines = list(self._tail)
+        num_lines = self._num_lines
+        if self._partial != "":
+            lines.append(self._partial)
+            num_lines += 1
+        lines = lines[-self._tail.maxlen:]
+        return num_lines - len(lines), lines
+
+
+def read_output(file_name, max_size=None):
+    """
+    Read the output file which is gzip compressed when its name ends with .gz,
+    only the last max_size characters are kept in memory when given
+    """
+    with _open_for_reading(file_name) as fread:
+        if max_size is None:
+            return fread.read()
+
+        data = ""
+        truncated = False
+        while True:
+            chunk = fread.read(65536)
+            if not chunk:
+                break
+            data += chunk
+            if len(data) > max_size:
+                data = data[len(data) - max_size:]
+                truncated = True
+
+    if truncated:
+        return "*** Output truncated to the last %i characters ***\n" % max_size + data
+    return data
+
+
+def read_output_tail(file_name, num_lines):
+    """
+    Return the number of omitted lines and the last lines of the output file
+    without keeping the whole file in memory
+    """
+    tail = deque(maxlen=num_lines)
+    num_read = 0
+    with _open_for_reading(file_name) as fread:
+        for line in fread:
+            tail.append(line.rstrip("\n"))
+            num_read += 1
+    return num_read - len(tail), list(tail)
+
+
+def _open_for_reading(file_name):
+    """
+    Open the output file as text, the output may have been truncated within a character
+    """
+    if file_name.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(file_name, "rb"), encoding="utf-8", errors="replace")
+    return io.open(file_name, "r", encoding="utf-8", errors="replace")
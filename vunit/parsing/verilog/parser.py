@@ -11,14 +11,17 @@
 Verilog parsing functionality
 """
 
+import sys
 import logging
-from os.path import dirname, exists, abspath
-from vunit.ostools import read_file
+import multiprocessing
+import traceback
+from os.path import dirname, abspath
 from vunit.parsing.tokenizer import TokenStream, EOFException, LocationException
 from vunit.parsing.verilog.tokenizer import VerilogTokenizer
 from vunit.parsing.verilog.preprocess import VerilogPreprocessor, find_included_file, Macro
 from vunit.parsing.verilog.tokens import *
-from vunit.hashing import hash_string
+from vunit.hashing import ContentHashCache
+from vunit.test_scanner import find_verilog_test_cases, find_pragmas
 
 LOGGER = logging.getLogger(__name__)
 
@@ -28,11 +31,14 @@ class VerilogParser(object):
     Parse a single Verilog file
     """
 
-    def __init__(self, database=None):
+    def __init__(self, database=None, content_hash_cache=None):
         self._tokenizer = VerilogTokenizer()
         self._preprocessor = VerilogPreprocessor(self._tokenizer)
         self._database = database
-        self._content_cache = {}
+        if content_hash_cache is None:
+            content_hash_cache = ContentHashCache(database=database)
+        self._content_hash_cache = content_hash_cache
+        self._prefetched = {}
 
     def parse(self, code, file_name, include_paths=None, defines=None):
         """
@@ -42,10 +48,72 @@ class VerilogParser(object):
         defines = {} if defines is None else defines
         include_paths = [] if include_paths is None else include_paths
 
+        prefetched = self._prefetched.pop(abspath(file_name), None)
+        if prefetched is not None and prefetched[:3] == (code, include_paths, defines):
+            return prefetched[3]
+
         cached = self._lookup_parse_cache(file_name, include_paths, defines)
         if cached is not None:
             return cached
 
+        result, included_files = self._parse_uncached(code, file_name, include_paths, defines)
+
+        if self._database is None:
+            return result
+
+        self._store_result(file_name, result, included_files, defines)
+        return result
+
+    def parse_many(self, sources, num_processes=1):
+        """
+        Parse a list of (code, file_name, include_paths, defines) tuples
+        and return a list of parse results in the same order.
+
+        Cached results are looked up in this process and only the files
+        which miss the cache are parsed, using a pool of num_processes
+        worker processes when there is more than one of them. The parse
+        result of a file which failed to parse is None.
+
+        The results are also kept such that a later call to parse with the
+        same arguments returns them directly.
+        """
+        sources = [(code, file_name,
+                    [] if include_paths is None else include_paths,
+                    {} if defines is None else defines)
+                   for code, file_name, include_paths, defines in sources]
+
+        results = [None] * len(sources)
+        uncached = []
+        for idx, (_, file_name, include_paths, defines) in enumerate(sources):
+            cached = self._lookup_parse_cache(file_name, include_paths, defines)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                uncached.append(idx)
+
+        parsed = _run_parse_jobs([sources[idx] for idx in uncached], num_processes)
+
+        for idx, (result, included_files, error) in zip(uncached, parsed):
+            _, file_name, _, defines = sources[idx]
+            if error is not None:
+                LOGGER.debug("Failed to parse %s in batch:\n%s", file_name, error)
+                continue
+
+            results[idx] = result
+            if self._database is not None:
+                self._store_result(file_name, result, included_files, defines)
+
+        for (code, file_name, include_paths, defines), result in zip(sources, results):
+            if result is not None:
+                self._prefetched[abspath(file_name)] = (code, include_paths, defines, result)
+
+        return results
+
+    def _parse_uncached(self, code, file_name, include_paths, defines):
+        """
+        Parse verilog code without using the cache returning
+        the parse result and the list of included files
+        """
         initial_defines = dict((key, Macro(key, self._tokenizer.tokenize(value)))
                                for key, value in defines.items())
         tokens = self._tokenizer.tokenize(code, file_name=file_name)
@@ -56,13 +124,10 @@ class VerilogParser(object):
                                                   included_files=included_files)
 
         included_files_for_design_file = [name for _, name in included_files if name is not None]
-        result = VerilogDesignFile.parse(pp_tokens, included_files_for_design_file)
-
-        if self._database is None:
-            return result
-
-        self._store_result(file_name, result, included_files, defines)
-        return result
+        result = VerilogDesignFile.parse(pp_tokens, included_files_for_design_file,
+                                         test_cases=find_verilog_test_cases(code),
+                                         pragmas=find_pragmas(code))
+        return result, included_files
 
     @staticmethod
     def _key(file_name):
@@ -85,11 +150,9 @@ class VerilogParser(object):
         """
         Hash the contents of the file
         """
-        if file_name is None or not exists(file_name):
+        if file_name is None:
             return None
-        if file_name not in self._content_cache:
-            self._content_cache[file_name] = "sha1:" + hash_string(read_file(file_name))
-        return self._content_cache[file_name]
+        return self._content_hash_cache.content_hash(file_name)
 
     def _lookup_parse_cache(self, file_name, include_paths, defines):
         """
@@ -105,7 +168,8 @@ class VerilogParser(object):
             return None
 
         old_content_hash, old_included_files, old_defines, old_result = self._database[key]
-        if old_defines != defines:
+        if old_result is None or old_defines != defines:
+            # Result of another format version
             return None
 
         if old_content_hash != self._content_hash(file_name):
@@ -123,26 +187,142 @@ class VerilogParser(object):
         return old_result
 
 
-class VerilogDesignFile(object):
+def _run_parse_jobs(jobs, num_processes):
+    """
+    Run the parse jobs using a pool of num_processes processes unless a single process is enough
+    """
+    num_processes = min(num_processes, len(jobs))
+    if num_processes > 1 and not _can_fork():
+        # Spawned processes would import the __main__ module again which re-runs
+        # a run.py script without an if __name__ == "__main__" guard
+        LOGGER.debug("Parsing Verilog files in a single process since fork is not supported")
+        num_processes = 1
+
+    if num_processes <= 1:
+        return [_parse_job(job) for job in jobs]
+
+    LOGGER.debug("Parsing %i Verilog files using %i processes", len(jobs), num_processes)
+    if hasattr(multiprocessing, "get_context"):
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing
+    pool = context.Pool(processes=num_processes)
+    try:
+        parsed = pool.map(_parse_job, jobs, chunksize=max(1, len(jobs) // (4 * num_processes)))
+    except:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return parsed
+
+
+def _can_fork():
+    """
+    Return True if pool processes can be forked on this platform
+    """
+    if not hasattr(multiprocessing, "get_all_start_methods"):
+        # Python 2.7 always forks except on Windows
+        return sys.platform != "win32"
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+# Parser used by _parse_job, created once per worker process
+_JOB_PARSER = None
+
+
+def _parse_job(job):
+    """
+    Parse a single (code, file_name, include_paths, defines) job without any cache.
+    Used as the work function of the process pool within VerilogParser.parse_many.
+
+    Returns a tuple of the parse result, the included files and an error message which
+    is None unless parsing failed.
+    """
+    global _JOB_PARSER  # pylint: disable=global-statement
+    if _JOB_PARSER is None:
+        _JOB_PARSER = VerilogParser()
+
+    try:
+        result, included_files = _JOB_PARSER._parse_uncached(*job)  # pylint: disable=protected-access
+        return result, included_files, None
+    except KeyboardInterrupt:
+        raise
+    except:  # pylint: disable=bare-except
+        return None, None, traceback.format_exc()
+
+
+class VerilogDesignFile(object):  # pylint: disable=too-many-instance-attributes
     """
     Contains Verilog objecs found within a file
+
+    Pickled as a tuple of built-in types together with a format version
+    such that loading it from the database is fast.
     """
+
+    _format_version = 1
+
+    __slots__ = ("modules", "packages", "imports", "package_references", "instances",
+                 "included_files", "test_cases", "pragmas")
+
     def __init__(self,  # pylint: disable=too-many-arguments
                  modules=None,
                  packages=None,
                  imports=None,
                  package_references=None,
                  instances=None,
-                 included_files=None):
+                 included_files=None,
+                 test_cases=None,
+                 pragmas=None):
         self.modules = [] if modules is None else modules
         self.packages = [] if packages is None else packages
         self.imports = [] if imports is None else imports
         self.package_references = [] if package_references is None else package_references
         self.instances = [] if instances is None else instances
         self.included_files = [] if included_files is None else included_files
+        self.test_cases = [] if test_cases is None else test_cases
+        self.pragmas = [] if pragmas is None else pragmas
+
+    def to_tuple(self):
+        """
+        Return a tuple of built-in types
+        """
+        return (self._format_version,
+                [(module.name, module.parameters) for module in self.modules],
+                [package.name for package in self.packages],
+                self.imports,
+                self.package_references,
+                self.instances,
+                self.included_files,
+                self.test_cases,
+                self.pragmas)
+
+    def __reduce__(self):
+        return _verilog_design_file_from_tuple, (self.to_tuple(),)
+
+    @classmethod
+    def from_tuple(cls, value):
+        """
+        Create from tuple returned by to_tuple, returns None if the tuple has another format version
+        """
+        if not isinstance(value, tuple) or value[0] != cls._format_version:
+            return None
+
+        (_, modules, packages, imports, package_references, instances,
+         included_files, test_cases, pragmas) = value
+        return cls(modules=[VerilogModule(name, parameters) for name, parameters in modules],
+                   packages=[VerilogPackage(name) for name in packages],
+                   imports=imports,
+                   package_references=package_references,
+                   instances=instances,
+                   included_files=included_files,
+                   test_cases=test_cases,
+                   pragmas=pragmas)
 
     @classmethod
-    def parse(cls, tokens, included_files):
+    def parse(cls, tokens, included_files, test_cases=None, pragmas=None):
         """
         Parse verilog file
         """
@@ -157,7 +337,9 @@ class VerilogDesignFile(object):
                    imports=cls.find_imports(tokens),
                    package_references=cls.find_package_references(tokens),
                    instances=cls.find_instances(tokens),
-                   included_files=included_files)
+                   included_files=included_files,
+                   test_cases=test_cases,
+                   pragmas=pragmas)
 
     @staticmethod
     def find_imports(tokens):
@@ -234,11 +416,20 @@ class VerilogDesignFile(object):
         return results
 
 
+def _verilog_design_file_from_tuple(value):
+    """
+    Unpickle a VerilogDesignFile
+    """
+    return VerilogDesignFile.from_tuple(value)
+
+
 class VerilogModule(object):
     """
     A verilog module
     """
 
+    __slots__ = ("name", "parameters")
+
     def __init__(self, name, parameters):
         self.name = name
         self.parameters = parameters
@@ -294,6 +485,8 @@ class VerilogPackage(object):
     A verilog package
     """
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
 
@@ -15,7 +15,7 @@ from os.path import join, basename, dirname, splitext
 import traceback
 import logging
 from collections import OrderedDict
-from vunit.hashing import hash_string
+from vunit.hashing import hash_string, ContentHashCache
 from vunit.dependency_graph import (DependencyGraph,
                                     CircularDependencyException)
 from vunit.vhdl_parser import VHDLParser, VHDLReference
@@ -27,7 +27,7 @@ import vunit.ostools as ostools
 LOGGER = logging.getLogger(__name__)
 
 
-class Project(object):
+class Project(object):  # pylint: disable=too-many-instance-attributes
     """
     The representation of a HDL code project.
     Compute lists of source files to recompile based on file contents,
@@ -36,12 +36,20 @@ class Project(object):
     def __init__(self,
                  depend_on_package_body=False,
                  vhdl_parser=None,
-                 verilog_parser=None):
+                 verilog_parser=None,
+                 num_parse_processes=1,
+                 content_hash_cache=None):
         """
         depend_on_package_body - Package users depend also on package body
+        num_parse_processes - Number of processes used to parse a batch of Verilog files
+        content_hash_cache - ContentHashCache shared with the parsers
         """
+        self._content_hash_cache = ContentHashCache() if content_hash_cache is None else content_hash_cache
         self._vhdl_parser = VHDLParser() if vhdl_parser is None else vhdl_parser
-        self._verilog_parser = VerilogParser() if verilog_parser is None else verilog_parser
+        if verilog_parser is None:
+            verilog_parser = VerilogParser(content_hash_cache=self._content_hash_cache)
+        self._verilog_parser = verilog_parser
+        self._num_parse_processes = num_parse_processes
         self._libraries = OrderedDict()
         self._source_files_in_order = []
         self._manual_dependencies = []
@@ -100,7 +108,8 @@ class Project(object):
                 no_parse=no_parse)
             library.add_vhdl_design_units(source_file.design_units)
         elif file_type == "verilog":
-            source_file = VerilogSourceFile(file_name, library, self._verilog_parser, include_dirs, defines, no_parse)
+            source_file = VerilogSourceFile(file_name, library, self._verilog_parser, include_dirs, defines, no_parse,
+                                            content_hash_cache=self._content_hash_cache)
             library.add_verilog_design_units(source_file.design_units)
         else:
             raise ValueError(file_type)
@@ -109,6 +118,18 @@ class Project(object):
         self._source_files_in_order.append(source_file)
         return source_file
 
+    def preparse_verilog_files(self, file_names, include_dirs=None, defines=None):
+        """
+        Parse a batch of Verilog files using several processes such that the parse
+        results are already available when the files are added using add_source_file
+        """
+        if len(file_names) < 2:
+            return
+
+        sources = [(ostools.read_file(file_name, encoding=HDL_FILE_ENCODING), file_name, include_dirs, defines)
+                   for file_name in file_names]
+        self._verilog_parser.parse_many(sources, num_processes=self._num_parse_processes)
+
     def add_manual_dependency(self, source_file, depends_on):
         """
         Add manual dependency where 'source_file' depends_on 'depends_on'
@@ -296,10 +317,11 @@ class Project(object):
         LOGGER.error("Found circular dependency:\n%s",
                      " ->\n".join(source_file.name for source_file in exception.path))
 
-    def get_files_in_compile_order(self, incremental=True, dependency_graph=None):
+    def get_files_in_compile_order(self, incremental=True, dependency_graph=None, target_files=None):
         """
         Get a list of all files in compile order
         incremental -- Only return files that need recompile if True
+        target_files -- Only return files needed to elaborate these files if not None
         """
         if dependency_graph is None:
             dependency_graph = self.create_dependency_graph()
@@ -313,6 +335,9 @@ class Project(object):
         try:
             affected_files = dependency_graph.get_dependent(files)
             compile_order = dependency_graph.toposort()
+            if target_files is not None:
+                implementation_dependency_graph = self.create_dependency_graph(implementation_dependencies=True)
+                affected_files &= implementation_dependency_graph.get_dependencies(set(target_files))
         except CircularDependencyException as exc:
             self._handle_circular_dependency(exc)
             raise CompileError
@@ -575,7 +600,7 @@ class Library(object):  # pylint: disable=too-many-instance-attributes
         return hash(self.name)
 
 
-class SourceFile(object):
+class SourceFile(object):  # pylint: disable=too-many-instance-attributes
     """
     Represents a generic source file
     """
@@ -588,6 +613,10 @@ class SourceFile(object):
         self._content_hash = None
         self._compile_options = {}
 
+        # Test cases and pragmas found when parsing, None when not parsed
+        self.test_cases = None
+        self.pragmas = None
+
     def __eq__(self, other):
         if isinstance(other, type(self)):
             return self.to_tuple() == other.to_tuple()
@@ -672,13 +701,15 @@ class SourceFile(object):
         return hash_string(self._content_hash + self._compile_options_hash())
 
 
-class VerilogSourceFile(SourceFile):
+class VerilogSourceFile(SourceFile):  # pylint: disable=too-many-instance-attributes
     """
     Represents a Verilog source file
     """
     def __init__(self,  # pylint: disable=too-many-arguments
-                 name, library, verilog_parser, include_dirs=None, defines=None, no_parse=False):
+                 name, library, verilog_parser, include_dirs=None, defines=None, no_parse=False,
+                 content_hash_cache=None):
         SourceFile.__init__(self, name, library, 'verilog')
+        self._content_hash_cache = ContentHashCache() if content_hash_cache is None else content_hash_cache
         self.package_dependencies = []
         self.module_dependencies = []
         self.include_dirs = include_dirs if include_dirs is not None else []
@@ -704,7 +735,7 @@ class VerilogSourceFile(SourceFile):
             design_file = parser.parse(code, self.name, include_dirs, self.defines)
             for included_file_name in design_file.included_files:
                 self._content_hash = hash_string(self._content_hash +
-                                                 ostools.read_file(included_file_name, encoding=HDL_FILE_ENCODING))
+                                                 self._content_hash_cache.content_hash(included_file_name))
             for module in design_file.modules:
                 self.design_units.append(Module(module.name, self, module.parameters))
 
@@ -720,6 +751,9 @@ class VerilogSourceFile(SourceFile):
             for instance_name in design_file.instances:
                 self.module_dependencies.append(instance_name)
 
+            self.test_cases = design_file.test_cases
+            self.pragmas = design_file.pragmas
+
         except KeyboardInterrupt:
             raise
         except:  # pylint: disable=bare-except
@@ -758,6 +792,8 @@ class VHDLSourceFile(SourceFile):
             self.design_units = self._find_design_units(design_file)
             self.dependencies = self._find_dependencies(design_file)
             self.depending_components = design_file.component_instantiations
+            self.test_cases = design_file.test_cases
+            self.pragmas = design_file.pragmas
         except KeyboardInterrupt:
             raise
         except:  # pylint: disable=bare-except
@@ -807,8 +843,7 @@ class VHDLSourceFile(SourceFile):
         """
         result = []
         for entity in design_file.entities:
-            generic_names = [generic.identifier for generic in entity.generics]
-            result.append(Entity(entity.identifier, self, generic_names))
+            result.append(Entity(entity.identifier, self, entity.generic_names))
 
         for context in design_file.contexts:
             result.append(VHDLDesignUnit(context.identifier, self, 'context'))
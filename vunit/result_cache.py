@@ -0,0 +1,204 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Remember the fingerprint of the inputs of passed tests such that
+tests with unchanged inputs do not have to be simulated again
+"""
+
+import json
+import types
+import functools
+import logging
+from vunit.ostools import read_file, write_file, file_exists
+from vunit.hashing import hash_string
+LOGGER = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+
+
+class ResultCache(object):
+    """
+    The fingerprint of the last passing run of each test keyed by test name
+    """
+
+    def __init__(self, passed=None):
+        self._passed = {} if passed is None else passed
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Load the cache from file_name, returns an empty cache if there is none
+        """
+        if not file_exists(file_name):
+            return cls()
+
+        try:
+            data = json.loads(read_file(file_name))
+            if data["format"] != CACHE_FORMAT:
+                return cls()
+            return cls(data["passed"])
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Ignoring corrupt result cache %s", file_name)
+            return cls()
+
+    def save(self, file_name):
+        """
+        Save the cache to file_name
+        """
+        write_file(file_name, json.dumps({"format": CACHE_FORMAT,
+                                          "passed": self._passed},
+                                         indent=1, sort_keys=True))
+
+    def is_cached(self, test_names, fingerprint):
+        """
+        Return True if all tests have passed with the same fingerprint,
+        a fingerprint of None is never cached
+        """
+        if fingerprint is None:
+            return False
+        return all(self._passed.get(name) == fingerprint for name in test_names)
+
+    def add_result(self, test_name, passed, fingerprint):
+        """
+        Add the result of a test run with the fingerprint
+        """
+        if passed and fingerprint is not None:
+            self._passed[test_name] = fingerprint
+        elif test_name in self._passed:
+            del self._passed[test_name]
+
+
+def create_fingerprint(config, content_hashes, simulator_identity, elaborate_only):
+    """
+    Create the fingerprint of all inputs of a test configuration
+
+    :param config: The Configuration with generics, sim options and hooks
+    :param content_hashes: The content hashes of all source files needed by the test bench
+    :param simulator_identity: A string identifying the simulator
+    :returns: The fingerprint or None if the identity of pre_config or post_check cannot be determined
+    """
+    try:
+        hooks = [callable_identity(config.pre_config), callable_identity(config.post_check)]
+    except UnknownIdentity as exc:
+        LOGGER.debug("Not caching %s: %s", config.name, exc)
+        return None
+
+    return hash_string(json.dumps([simulator_identity,
+                                   elaborate_only,
+                                   sorted(content_hashes),
+                                   sorted((name, repr(value)) for name, value in config.generics.items()),
+                                   sorted((name, repr(value)) for name, value in config.sim_options.items()),
+                                   hooks]))
+
+
+class UnknownIdentity(Exception):
+    """
+    The identity of a callable could not be determined
+    """
+    pass
+
+
+def callable_identity(function):
+    """
+    Return a string identifying the callable which is stable between runs
+
+    The identity covers the code, default arguments and closure of functions,
+    the arguments of functools.partial and the state of callable objects.
+    Raises UnknownIdentity when it contains a value without a stable identity.
+    """
+    if function is None:
+        return None
+    return hash_string(_identity(function, set()))
+
+
+_PLAIN_TYPES = (type(None), bool, int, float, complex, str, bytes, type(u""))
+_MAX_DEPTH = 32
+
+
+def _identity(value, active):  # pylint: disable=too-many-return-statements
+    """
+    Return a string identifying the value, active is the ids of the enclosing values to stop cycles
+    """
+    if isinstance(value, _PLAIN_TYPES):
+        return repr(value)
+
+    if id(value) in active:
+        return "<cycle>"
+    if len(active) >= _MAX_DEPTH:
+        raise UnknownIdentity("%s is nested too deep" % _qualified_name(type(value)))
+    active = active | set([id(value)])
+
+    if isinstance(value, (list, tuple)):
+        return "%s[%s]" % (type(value).__name__, ", ".join(_identity(item, active) for item in value))
+
+    if isinstance(value, (set, frozenset)):
+        return "%s{%s}" % (type(value).__name__, ", ".join(sorted(_identity(item, active) for item in value)))
+
+    if isinstance(value, dict):
+        return "dict{%s}" % ", ".join(sorted("%s: %s" % (_identity(key, active), _identity(item, active))
+                                             for key, item in value.items()))
+
+    if isinstance(value, functools.partial):
+        return "partial(%s, %s, %s)" % (_identity(value.func, active),
+                                        _identity(value.args, active),
+                                        _identity(value.keywords or {}, active))
+
+    if isinstance(value, (types.BuiltinFunctionType, type, types.ModuleType)):
+        return _qualified_name(value)
+
+    if isinstance(value, types.MethodType):
+        return "method(%s, %s)" % (_identity(value.__func__, active), _identity(value.__self__, active))
+
+    if isinstance(value, types.FunctionType):
+        return _function_identity(value, active)
+
+    if hasattr(value, "__dict__"):
+        # Such as a callable object, the code of __call__ is covered by the type
+        return "%s(%s, %s)" % (_qualified_name(type(value)),
+                               _identity(type(value).__call__ if callable(value) else None, active),
+                               _identity(vars(value), active))
+
+    raise UnknownIdentity("%s has no stable identity" % _qualified_name(type(value)))
+
+
+def _function_identity(function, active):
+    """
+    Return a string identifying the name, code, default arguments and closure of the function
+    """
+    cells = []
+    for cell in function.__closure__ or ():
+        try:
+            cells.append(_identity(cell.cell_contents, active))
+        except ValueError:
+            # Empty cell
+            cells.append("<empty>")
+
+    return "function(%s, %s, %s, %s, [%s])" % (_qualified_name(function),
+                                               _code_identity(function.__code__),
+                                               _identity(function.__defaults__, active),
+                                               _identity(getattr(function, "__kwdefaults__", None), active),
+                                               ", ".join(cells))
+
+
+def _qualified_name(value):
+    """
+    Return the module and name of a function, type or module
+    """
+    if isinstance(value, types.ModuleType):
+        return value.__name__
+    return "%s.%s" % (getattr(value, "__module__", None),
+                      getattr(value, "__qualname__", getattr(value, "__name__", None)))
+
+
+def _code_identity(code):
+    """
+    Return a hash of the byte code and constants, nested code objects are hashed recursively
+    since their repr contains the memory address
+    """
+    consts = [_code_identity(const) if hasattr(const, "co_code") else repr(const)
+              for const in code.co_consts]
+    return hash_string(repr(code.co_code) + repr(consts) + repr(code.co_names))
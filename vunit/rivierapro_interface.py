@@ -30,6 +30,7 @@ class RivieraProInterface(VsimSimulatorMixin, SimulatorInterface):
     """
 
     name = "rivierapro"
+    executable = "vsim"
     supports_gui_flag = True
     package_users_depend_on_bodies = True
 
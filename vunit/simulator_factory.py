@@ -61,7 +61,8 @@ class SimulatorFactory(object):
         """
         result = ["vhdl_assert_stop_level",
                   "disable_ieee_warnings",
-                  "pli"]
+                  "pli",
+                  "timeout"]
         for sim_class in cls.supported_simulators():
             for opt in sim_class.sim_options:
                 assert opt.startswith(sim_class.name + ".")
@@ -11,6 +11,7 @@ Generic simulator interface
 from __future__ import print_function
 import sys
 import os
+import time
 from vunit.ostools import Process, simplify_path
 from vunit.exceptions import CompileError
 
@@ -21,6 +22,7 @@ class SimulatorInterface(object):
     """
 
     name = None
+    executable = None
     supports_gui_flag = False
     package_users_depend_on_bodies = False
     compile_options = []
@@ -120,18 +122,33 @@ class SimulatorInterface(object):
         """
         return False
 
+    def identity(self):
+        """
+        Return a string which changes when another simulator installation is used or the simulator is upgraded
+
+        Contains the path and modification time of the executable within the prefix when known
+        """
+        prefix = getattr(self, "_prefix", None)
+        if self.executable is None or prefix is None:
+            return self.name
+
+        for file_name in (os.path.join(prefix, self.executable), os.path.join(prefix, self.executable + ".exe")):
+            if os.path.isfile(file_name):
+                return "%s %s %r" % (self.name, os.path.abspath(file_name), os.path.getmtime(file_name))
+        return "%s %s" % (self.name, os.path.abspath(prefix))
+
     def post_process(self, output_path):
         """
         Hook for simulator interface to perform post processing such as creating coverage reports
         """
         pass
 
-    def compile_project(self, project, continue_on_error=False):
+    def compile_project(self, project, continue_on_error=False, target_files=None, event_log=None):
         """
-        Compile the project
+        Compile the project, only the dependencies of target_files when not None
         """
         self.setup_library_mapping(project)
-        self.compile_source_files(project, continue_on_error)
+        self.compile_source_files(project, continue_on_error, target_files, event_log)
 
     def simulate(self, output_path, test_suite_name, config, elaborate_only):
         """
@@ -145,21 +162,31 @@ class SimulatorInterface(object):
         """
         pass
 
-    def compile_source_files(self, project, continue_on_error=False):
+    def compile_source_files(self,  # pylint: disable=too-many-locals, too-many-branches
+                             project, continue_on_error=False, target_files=None, event_log=None):
         """
         Use compile_source_file_command to compile all source_files
+
+        :param event_log: The EventLog receiving the start and end of each compilation or None
         """
         dependency_graph = project.create_dependency_graph()
         all_ok = True
         failures = []
-        source_files = project.get_files_in_compile_order(dependency_graph=dependency_graph)
+        source_files = project.get_files_in_compile_order(dependency_graph=dependency_graph,
+                                                          target_files=target_files)
         source_files_to_skip = set()
         for source_file in source_files:
+            event = dict(file_name=source_file.name, library=source_file.library.name)
             if source_file in source_files_to_skip:
                 print("Skipping %s due to failed dependencies" % simplify_path(source_file.name))
+                if event_log is not None:
+                    event_log.emit("compile_skipped", **event)
                 continue
 
             print('Compiling %s into %s ...' % (simplify_path(source_file.name), source_file.library.name))
+            if event_log is not None:
+                event_log.emit("compile_start", **event)
+            start_time = time.time()
             try:
                 command = None
                 command = self.compile_source_file_command(source_file)
@@ -168,6 +195,10 @@ class SimulatorInterface(object):
             except CompileError:
                 success = False
 
+            if event_log is not None:
+                event_log.emit("compile_end", status="passed" if success else "failed",
+                               duration=time.time() - start_time, **event)
+
             if success:
                 project.update(source_file)
             else:
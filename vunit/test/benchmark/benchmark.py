@@ -0,0 +1,238 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Measure parse, hash, dependency graph and compile order throughput on a
+synthetic corpus and write a JSON report which can be compared between commits
+
+python -m vunit.test.benchmark.benchmark --report new.json --compare old.json
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from os.path import join
+from shutil import rmtree
+from vunit.ostools import read_file, write_file
+from vunit.hashing import ContentHashCache
+from vunit.vhdl_parser import VHDLDesignFile, CachedVHDLParser
+from vunit.parsing.verilog.parser import VerilogParser
+from vunit.project import Project
+from vunit.test.benchmark.corpus import create_corpus
+
+REPORT_FORMAT = 1
+
+
+class Benchmark(object):
+    """
+    Run the benchmarks on a corpus
+    """
+
+    def __init__(self, corpus, output_path, repeat=3):
+        self._corpus = corpus
+        self._output_path = output_path
+        self._repeat = repeat
+        self._vhdl_code = [(file_name, read_file(file_name))
+                           for _, file_name in corpus.vhdl_files]
+        self._verilog_code = [(file_name, read_file(file_name))
+                              for _, file_name in corpus.verilog_files]
+
+    def run(self):
+        """
+        Run all benchmarks and return a dictionary of results by name
+        """
+        results = {}
+        all_files = [file_name for _, file_name in self._corpus.vhdl_files + self._corpus.verilog_files]
+
+        results["vhdl_parse"] = self._measure(self._parse_vhdl, len(self._vhdl_code))
+
+        database = {}
+        self._parse_vhdl_cached(database)
+        results["vhdl_parse_cached"] = self._measure(lambda: self._parse_vhdl_cached(database),
+                                                     len(self._vhdl_code))
+
+        results["verilog_parse"] = self._measure(lambda: self._parse_verilog(None), len(self._verilog_code))
+
+        database = {}
+        self._parse_verilog(database)
+        results["verilog_parse_cached"] = self._measure(lambda: self._parse_verilog(database),
+                                                        len(self._verilog_code))
+
+        results["content_hash"] = self._measure(lambda: self._hash(all_files), len(all_files))
+
+        results["project_add_source_files"] = self._measure(self._create_project, len(all_files))
+
+        project = self._create_project()
+        results["dependency_graph"] = self._measure(project.create_dependency_graph, len(all_files))
+
+        dependency_graph = project.create_dependency_graph()
+        results["compile_order"] = self._measure(
+            lambda: project.get_files_in_compile_order(incremental=False, dependency_graph=dependency_graph),
+            len(all_files))
+
+        return results
+
+    def _measure(self, function, num_items):
+        """
+        Return the best time out of repeated calls to function
+        """
+        seconds = min(timeit.repeat(function, number=1, repeat=self._repeat))
+        return {"seconds": seconds,
+                "items": num_items,
+                "items_per_second": num_items / seconds if seconds > 0 else None}
+
+    def _parse_vhdl(self):
+        for _, code in self._vhdl_code:
+            VHDLDesignFile.parse(code)
+
+    def _parse_vhdl_cached(self, database):
+        parser = CachedVHDLParser(database=database)
+        for file_name, code in self._vhdl_code:
+            parser.parse(code, file_name)
+
+    def _parse_verilog(self, database):
+        parser = VerilogParser(database=database)
+        for file_name, code in self._verilog_code:
+            parser.parse(code, file_name, self._corpus.verilog_include_dirs, {})
+
+    @staticmethod
+    def _hash(file_names):
+        cache = ContentHashCache()
+        for file_name in file_names:
+            cache.content_hash(file_name)
+
+    def _create_project(self):
+        """
+        Create a project with all files of the corpus
+        """
+        project = Project()
+        for library_name in self._corpus.library_names:
+            project.add_library(library_name, join(self._output_path, "libraries", library_name))
+
+        for library_name, file_name in self._corpus.vhdl_files:
+            project.add_source_file(file_name, library_name, file_type="vhdl")
+
+        for library_name, file_name in self._corpus.verilog_files:
+            project.add_source_file(file_name, library_name, file_type="verilog",
+                                    include_dirs=self._corpus.verilog_include_dirs)
+        return project
+
+
+def create_report(results, corpus_args):
+    """
+    Create a report dictionary from benchmark results
+    """
+    return {"format": REPORT_FORMAT,
+            "python": sys.version,
+            "platform": platform.platform(),
+            "corpus": corpus_args,
+            "results": results}
+
+
+def compare_reports(baseline, report, threshold=0.1):
+    """
+    Compare the report against the baseline report
+
+    Returns a list of (name, baseline_seconds, seconds, ratio) for all
+    benchmarks present in both and a list of the names of benchmarks
+    which are slower than the baseline by more than threshold
+    """
+    rows = []
+    regressions = []
+    for name in sorted(report["results"]):
+        if name not in baseline["results"]:
+            continue
+        old_seconds = baseline["results"][name]["seconds"]
+        new_seconds = report["results"][name]["seconds"]
+        ratio = new_seconds / old_seconds if old_seconds > 0 else float("inf")
+        rows.append((name, old_seconds, new_seconds, ratio))
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def _print_results(results):
+    print("%-30s %12s %8s %14s" % ("benchmark", "seconds", "items", "items/second"))
+    for name in sorted(results):
+        result = results[name]
+        print("%-30s %12.4f %8i %14.1f" % (name, result["seconds"], result["items"],
+                                           result["items_per_second"] or 0.0))
+
+
+def _print_comparison(rows, regressions):
+    print("%-30s %12s %12s %8s" % ("benchmark", "baseline", "current", "ratio"))
+    for name, old_seconds, new_seconds, ratio in rows:
+        print("%-30s %12.4f %12.4f %8.2f%s" % (name, old_seconds, new_seconds, ratio,
+                                               " REGRESSION" if name in regressions else ""))
+
+
+def _create_parser():
+    """
+    Create the command line argument parser
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output-path", default=None,
+                        help="Directory of the generated corpus, a temporary directory by default")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale the size of the generated corpus")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of times each benchmark is repeated, the best time is reported")
+    parser.add_argument("--report", default=None,
+                        help="Write the JSON report to this file")
+    parser.add_argument("--compare", default=None,
+                        help="Compare against this JSON report and exit with failure on regressions")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slow down considered a regression")
+    return parser
+
+
+def main(argv=None):
+    """
+    Run benchmarks from the command line
+    """
+    args = _create_parser().parse_args(argv)
+
+    def scaled(value):
+        return max(1, int(value * args.scale))
+
+    corpus_args = dict(num_vhdl_libraries=scaled(20),
+                       num_vhdl_files_per_library=scaled(100),
+                       num_verilog_files=scaled(1000),
+                       include_depth=20,
+                       netlist_size=scaled(5000))
+
+    output_path = args.output_path if args.output_path is not None else tempfile.mkdtemp()
+    try:
+        corpus = create_corpus(join(output_path, "corpus"), **corpus_args)
+        results = Benchmark(corpus, output_path, repeat=args.repeat).run()
+    finally:
+        if args.output_path is None:
+            rmtree(output_path)
+
+    report = create_report(results, corpus_args)
+    _print_results(results)
+
+    if args.report is not None:
+        write_file(args.report, json.dumps(report, indent=2, sort_keys=True))
+
+    if args.compare is not None:
+        with open(args.compare, "r") as fptr:
+            baseline = json.load(fptr)
+        rows, regressions = compare_reports(baseline, report, args.threshold)
+        print()
+        _print_comparison(rows, regressions)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
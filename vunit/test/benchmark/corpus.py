@@ -0,0 +1,270 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Generate synthetic VHDL and SystemVerilog projects for benchmarking
+"""
+
+from os.path import join
+from vunit.ostools import write_file
+
+
+class Corpus(object):
+    """
+    The files of a generated corpus
+    """
+
+    def __init__(self):
+        # List of (library_name, file_name)
+        self.vhdl_files = []
+        # List of (library_name, file_name)
+        self.verilog_files = []
+        self.verilog_include_dirs = []
+
+    @property
+    def library_names(self):
+        """
+        Return the names of all libraries in the order of first use
+        """
+        names = []
+        for library_name, _ in self.vhdl_files + self.verilog_files:
+            if library_name not in names:
+                names.append(library_name)
+        return names
+
+
+def create_corpus(output_path,  # pylint: disable=too-many-arguments
+                  num_vhdl_libraries=20,
+                  num_vhdl_files_per_library=100,
+                  num_verilog_files=1000,
+                  include_depth=20,
+                  netlist_size=5000):
+    """
+    Create a synthetic corpus within output_path
+
+    Each VHDL library has a package used by all files of the next library
+    and entities instantiating the previous entities within the library.
+    Each Verilog module includes a chain of include_depth files and
+    instantiates the previous modules. Both languages also get a flat
+    netlist file with netlist_size instances.
+    """
+    corpus = Corpus()
+
+    for lib_idx in range(num_vhdl_libraries):
+        library_name = "vhdl_lib%i" % lib_idx
+        for file_idx in range(num_vhdl_files_per_library):
+            file_name = join(output_path, library_name, "ent%i.vhd" % file_idx)
+            write_file(file_name, _vhdl_entity(lib_idx, file_idx))
+            corpus.vhdl_files.append((library_name, file_name))
+
+        file_name = join(output_path, library_name, "pkg.vhd")
+        write_file(file_name, _vhdl_package(lib_idx))
+        corpus.vhdl_files.insert(0, (library_name, file_name))
+
+    if netlist_size > 0:
+        file_name = join(output_path, "vhdl_netlist", "netlist.vhd")
+        write_file(file_name, _vhdl_netlist(netlist_size))
+        corpus.vhdl_files.append(("vhdl_netlist", file_name))
+
+    include_dir = join(output_path, "verilog_include")
+    for idx in range(include_depth):
+        write_file(join(include_dir, "inc%i.svh" % idx), _verilog_include(idx, include_depth))
+    corpus.verilog_include_dirs.append(include_dir)
+
+    file_name = join(output_path, "verilog_lib", "pkg.sv")
+    write_file(file_name, _verilog_package())
+    corpus.verilog_files.append(("verilog_lib", file_name))
+
+    for idx in range(num_verilog_files):
+        file_name = join(output_path, "verilog_lib", "mod%i.sv" % idx)
+        write_file(file_name, _verilog_module(idx, include_depth))
+        corpus.verilog_files.append(("verilog_lib", file_name))
+
+    if netlist_size > 0:
+        file_name = join(output_path, "verilog_lib", "netlist.sv")
+        write_file(file_name, _verilog_netlist(netlist_size, num_verilog_files))
+        corpus.verilog_files.append(("verilog_lib", file_name))
+
+    return corpus
+
+
+def _vhdl_package(lib_idx):
+    """
+    Return VHDL code of a package with some types and constants
+    """
+    return """\
+library ieee;
+use ieee.std_logic_1164.all;
+
+package pkg%(lib)i is
+  constant width : natural := %(lib)i + 8;
+  type rec_t is record
+    data : std_logic_vector(width-1 downto 0);
+    valid : std_logic;
+  end record;
+  function f(value : natural) return natural;
+end package;
+
+package body pkg%(lib)i is
+  function f(value : natural) return natural is
+  begin
+    return value + %(lib)i;
+  end function;
+end package body;
+""" % dict(lib=lib_idx)
+
+
+def _vhdl_entity(lib_idx, file_idx):
+    """
+    Return VHDL code of an entity instantiating the previous entities in the library
+    """
+    uses = ""
+    if lib_idx > 0:
+        uses = "library vhdl_lib%(prev)i;\nuse vhdl_lib%(prev)i.pkg%(prev)i.all;\n" % dict(prev=lib_idx - 1)
+
+    instances = "".join("""\
+  inst%(idx)i : entity work.ent%(idx)i
+    generic map (
+      width => width)
+    port map (
+      clk => clk,
+      d => d,
+      q => open);
+
+  -- A comment about component instance %(idx)i with run("not a test")
+  comp%(idx)i : ent%(idx)i
+    port map (clk => clk, d => d, q => open);
+
+""" % dict(idx=idx) for idx in range(max(0, file_idx - 3), file_idx))
+
+    return """\
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.numeric_std.all;
+%(uses)s
+entity ent%(file)i is
+  generic (
+    width : natural := 8;
+    name : string := "ent%(file)i");
+  port (
+    clk : in std_logic;
+    d : in std_logic_vector(width-1 downto 0);
+    q : out std_logic_vector(width-1 downto 0));
+end entity;
+
+architecture rtl of ent%(file)i is
+  signal data : unsigned(width-1 downto 0);
+begin
+%(instances)s
+  process (clk)
+  begin
+    if rising_edge(clk) then
+      data <= unsigned(d) + %(file)i;
+      q <= std_logic_vector(data);
+    end if;
+  end process;
+end architecture;
+""" % dict(file=file_idx, uses=uses, instances=instances)
+
+
+def _vhdl_netlist(size):
+    """
+    Return VHDL code of a flat netlist with size instances
+    """
+    instances = "".join("""\
+  u%(idx)i : cell
+    port map (a => n(%(idx)i), b => n(%(next)i), y => n(%(next)i));
+""" % dict(idx=idx, next=idx + 1) for idx in range(size))
+
+    return """\
+library ieee;
+use ieee.std_logic_1164.all;
+
+entity netlist is
+end entity;
+
+architecture gates of netlist is
+  signal n : std_logic_vector(0 to %(size)i);
+  component cell is
+    port (a, b : in std_logic; y : out std_logic);
+  end component;
+begin
+%(instances)s
+end architecture;
+""" % dict(size=size, instances=instances)
+
+
+def _verilog_include(idx, depth):
+    """
+    Return Verilog code of an include file in a chain of include files
+    """
+    code = """\
+`ifndef INC%(idx)i_SVH
+`define INC%(idx)i_SVH
+`define WIDTH%(idx)i %(idx)i + 1
+`define MAX%(idx)i(a, b) ((a) > (b) ? (a) : (b))
+""" % dict(idx=idx)
+    if idx + 1 < depth:
+        code += '`include "inc%i.svh"\n' % (idx + 1)
+    code += "`endif\n"
+    return code
+
+
+def _verilog_package():
+    """
+    Return Verilog code of a package
+    """
+    return """\
+package pkg;
+  parameter width = 8;
+  typedef logic [width-1:0] data_t;
+endpackage
+"""
+
+
+def _verilog_module(idx, include_depth):
+    """
+    Return Verilog code of a module instantiating the previous modules
+    """
+    include = '`include "inc0.svh"\n' if include_depth > 0 else ""
+    instances = "".join("""\
+  mod%(prev)i #(.width(width)) inst%(prev)i (
+    .clk(clk),
+    .d(d),
+    .q());
+""" % dict(prev=prev) for prev in range(max(0, idx - 3), idx))
+
+    return """\
+%(include)s
+// Module %(idx)i
+module mod%(idx)i #(parameter width = 8) (
+  input logic clk,
+  input logic [width-1:0] d,
+  output logic [width-1:0] q);
+  import pkg::*;
+  /* Flip flop
+     with reset */
+  always_ff @(posedge clk) begin
+    q <= d + %(idx)i;
+  end
+%(instances)s
+endmodule
+""" % dict(idx=idx, include=include, instances=instances)
+
+
+def _verilog_netlist(size, num_modules):
+    """
+    Return Verilog code of a flat netlist with size instances
+    """
+    instances = "".join("  mod%i u%i (.clk(clk), .d(n[%i]), .q(n[%i]));\n"
+                        % (idx % num_modules if num_modules > 0 else 0, idx, idx, idx + 1)
+                        for idx in range(size))
+    return """\
+module netlist (input logic clk);
+  logic n [0:%(size)i];
+%(instances)s
+endmodule
+""" % dict(size=size, instances=instances)
@@ -0,0 +1,138 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the admission of test suites within memory and license limits
+"""
+
+import unittest
+import os
+import multiprocessing
+from os.path import join, dirname
+from vunit.admission import (AdmissionController, LicenseSemaphore, parse_license_limit,
+                             available_memory, fcntl)
+from vunit.test_history import TestHistory
+from vunit.test_runner import TestScheduler
+from vunit.ostools import renew_path
+from vunit.test.mock_2or3 import mock
+
+
+class TestAdmission(unittest.TestCase):
+    """
+    Test the admission controller and license semaphore
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_admission_out")
+        renew_path(self.output_path)
+
+    def test_memory_budget(self):
+        history = TestHistory()
+        history.add_max_rss("big1", 600)
+        history.add_max_rss("big2", 600)
+        history.add_max_rss("small", 300)
+        big1, big2, small, huge = [_test_suite(name) for name in ("big1", "big2", "small", "huge")]
+        history.add_max_rss("huge", 2000)
+
+        admission = AdmissionController(memory_budget=1000, test_history=history)
+        admission.set_test_suites([big1, big2, small, huge])
+
+        # Always admitted when nothing else is running
+        self.assertTrue(admission.try_admit(huge))
+        self.assertFalse(admission.try_admit(small))
+        admission.release(huge)
+
+        self.assertTrue(admission.try_admit(big1))
+        self.assertFalse(admission.try_admit(big2))
+        self.assertTrue(admission.try_admit(small))
+        admission.release(big1)
+        self.assertTrue(admission.try_admit(big2))
+
+    def test_license_limit(self):
+        licenses = LicenseSemaphore("simulator", 2, path=self.output_path)
+        admission = AdmissionController(licenses=licenses)
+        test_suite1, test_suite2, test_suite3 = [_test_suite(name) for name in ("tb1", "tb2", "tb3")]
+        self.assertTrue(admission.try_admit(test_suite1))
+        self.assertTrue(admission.try_admit(test_suite2))
+        self.assertFalse(admission.try_admit(test_suite3))
+        admission.release(test_suite1)
+        self.assertTrue(admission.try_admit(test_suite3))
+
+    @unittest.skipIf(fcntl is None, "Requires fcntl")
+    def test_license_limit_is_shared_between_processes(self):
+        acquired = multiprocessing.Event()
+        done = multiprocessing.Event()
+        process = multiprocessing.Process(target=_hold_license, args=(self.output_path, acquired, done))
+        process.start()
+        try:
+            self.assertTrue(acquired.wait(10.0))
+            licenses = LicenseSemaphore("simulator", 2, path=self.output_path)
+            self.assertEqual(licenses.try_acquire(), 1)
+            self.assertEqual(licenses.try_acquire(), None)
+        finally:
+            done.set()
+            process.join()
+
+        self.assertEqual(licenses.try_acquire(), 0)
+
+    def test_license_slot_which_cannot_be_opened_is_unavailable(self):
+        os.makedirs(join(self.output_path, "simulator", "0.lock"))
+        licenses = LicenseSemaphore("simulator", 2, path=self.output_path)
+        self.assertEqual(licenses.try_acquire(), 1)
+        self.assertEqual(licenses.try_acquire(), None)
+        licenses.release(1)
+        self.assertEqual(licenses.try_acquire(), 1)
+
+    @mock.patch("vunit.admission.getpass.getuser", return_value="some user")
+    @mock.patch("vunit.admission.tempfile.gettempdir")
+    def test_license_lock_files_are_per_user_by_default(self, gettempdir, _):
+        gettempdir.return_value = self.output_path
+        licenses = LicenseSemaphore("simulator", 1)
+        self.assertEqual(licenses.try_acquire(), 0)
+        self.assertTrue(os.path.exists(join(self.output_path, "vunit_licenses_some_user", "simulator", "0.lock")))
+        licenses.release(0)
+
+    def test_scheduler_skips_test_suites_which_are_not_admitted(self):
+        test_suite1, test_suite2 = _test_suite("tb1"), _test_suite("tb2")
+        admission = mock.Mock()
+        admission.try_admit.side_effect = lambda test_suite: test_suite is test_suite2
+        scheduler = TestScheduler([test_suite1, test_suite2], admission)
+        self.assertIs(scheduler.next(), test_suite2)
+        scheduler.test_done(test_suite2)
+        admission.release.assert_called_once_with(test_suite2)
+        admission.set_test_suites.assert_called_once_with([test_suite1, test_suite2])
+
+    def test_parse_license_limit(self):
+        self.assertEqual(parse_license_limit("4"), (None, 4))
+        self.assertEqual(parse_license_limit("4", default_name="ghdl"), ("ghdl", 4))
+        self.assertEqual(parse_license_limit("modelsim_se=2"), ("modelsim_se", 2))
+        self.assertRaises(ValueError, parse_license_limit, "0")
+        self.assertRaises(ValueError, parse_license_limit, "../name=2")
+        self.assertRaises(ValueError, parse_license_limit, "name=x")
+
+    def test_available_memory(self):
+        memory = available_memory()
+        if memory is not None:
+            self.assertGreater(memory, 0)
+
+
+def _test_suite(name):
+    """
+    Create a test suite stub with name
+    """
+    test_suite = mock.Mock()
+    test_suite.name = name
+    return test_suite
+
+
+def _hold_license(path, acquired, done):
+    """
+    Hold a license from another process until done
+    """
+    licenses = LicenseSemaphore("simulator", 2, path=path)
+    assert licenses.try_acquire() == 0
+    acquired.set()
+    done.wait(10.0)
@@ -0,0 +1,56 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the parser benchmark suite
+"""
+
+import unittest
+from os.path import join, dirname, exists
+from shutil import rmtree
+from vunit.ostools import renew_path
+from vunit.test.benchmark.corpus import create_corpus
+from vunit.test.benchmark.benchmark import Benchmark, compare_reports
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Test the parser benchmark suite
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_benchmark_out")
+        renew_path(self.output_path)
+
+    def tearDown(self):
+        if exists(self.output_path):
+            rmtree(self.output_path)
+
+    def test_run_on_small_corpus(self):
+        corpus = create_corpus(join(self.output_path, "corpus"),
+                               num_vhdl_libraries=2,
+                               num_vhdl_files_per_library=3,
+                               num_verilog_files=3,
+                               include_depth=2,
+                               netlist_size=10)
+        self.assertEqual(len(corpus.vhdl_files), 2 * (3 + 1) + 1)
+        self.assertEqual(len(corpus.verilog_files), 3 + 2)
+
+        results = Benchmark(corpus, self.output_path, repeat=1).run()
+        self.assertEqual(results["vhdl_parse"]["items"], len(corpus.vhdl_files))
+        self.assertEqual(results["compile_order"]["items"], len(corpus.vhdl_files) + len(corpus.verilog_files))
+
+    def test_compare_reports(self):
+        baseline = {"results": {"fast": {"seconds": 1.0},
+                                "slow": {"seconds": 1.0},
+                                "removed": {"seconds": 1.0}}}
+        report = {"results": {"fast": {"seconds": 0.5},
+                              "slow": {"seconds": 1.5},
+                              "added": {"seconds": 1.0}}}
+        rows, regressions = compare_reports(baseline, report, threshold=0.1)
+        self.assertEqual(rows, [("fast", 1.0, 0.5, 0.5),
+                                ("slow", 1.0, 1.5, 1.5)])
+        self.assertEqual(regressions, ["slow"])
@@ -9,9 +9,12 @@ Test the database related classes
 """
 
 import unittest
-from os.path import join, dirname
-from vunit.database import DataBase, PickledDataBase
+import os
+import multiprocessing
+from os.path import join, dirname, getsize
+from vunit.database import DataBase, LogDataBase, PickledDataBase, GenerationDataBase
 from vunit.ostools import renew_path
+from vunit.test.mock_2or3 import mock
 
 
 class TestDataBase(unittest.TestCase):
@@ -64,6 +67,19 @@ class TestDataBase(unittest.TestCase):
         database = self.create_database()
         self.assertRaises(KeyError, lambda: database[self.key1])
 
+    def test_delete_key(self):
+        database = self.create_database()
+        database[self.key1] = self.value1
+        database[self.key2] = self.value2
+        del database[self.key1]
+        self.assertTrue(self.key1 not in database)
+        self.assertEqual(database.keys(), [self.key2])
+        self.assertRaises(KeyError, database.__delitem__, self.key1)
+
+        database = self.create_database()
+        self.assertTrue(self.key1 not in database)
+        self.assertEqual(database[self.key2], self.value2)
+
     def test_can_overwrite_key(self):
         database = self.create_database()
 
@@ -93,3 +109,257 @@ class TestPickedDataBase(TestDataBase):
 
     def create_database(self, new=False):
         return PickledDataBase(TestDataBase.create_database(self, new))
+
+
+class TestLogDataBase(TestDataBase):
+    """
+    Test the log structured database
+
+    Re-uses test from TestDataBase class
+    """
+
+    def create_database(self, new=False, read_only=False):  # pylint: disable=arguments-differ
+        return LogDataBase(join(self.output_path, "database.log"), new=new, read_only=read_only)
+
+    def test_index_is_read_from_footer_after_close(self):
+        database = self.create_database()
+        database[self.key1] = self.value1
+        database[self.key2] = self.value2
+        database.close()
+
+        with mock.patch.object(LogDataBase, "_recover") as recover:
+            database = self.create_database()
+            self.assertFalse(recover.called)
+        self.assertEqual(database[self.key1], self.value1)
+        self.assertEqual(database[self.key2], self.value2)
+
+    def test_recovers_from_incomplete_record(self):
+        database = self.create_database()
+        database[self.key1] = self.value1
+        database[self.key2] = self.value2
+        database.close()
+
+        database = self.create_database()
+        database[self.key1] = self.value2
+        file_name = join(self.output_path, "database.log")
+        size = getsize(file_name)
+
+        # Simulate a crash in the middle of writing a record
+        with open(file_name, "r+b") as fptr:
+            fptr.truncate(size - 1)
+
+        database = self.create_database()
+        self.assertEqual(database[self.key1], self.value1)
+        self.assertEqual(database[self.key2], self.value2)
+        database[self.key1] = self.value2
+        database.close()
+
+        database = self.create_database()
+        self.assertEqual(database[self.key1], self.value2)
+        self.assertEqual(database[self.key2], self.value2)
+
+    def test_compacts_overwritten_values(self):
+        database = self.create_database()
+        value = b"x" * (256 * 1024)
+        for _ in range(10):
+            database[self.key1] = value
+        database[self.key2] = self.value2
+        database.close()
+
+        self.assertLess(getsize(join(self.output_path, "database.log")), 2 * len(value))
+        self.assertFalse(os.path.exists(join(self.output_path, "database.log.compact")))
+        database = self.create_database()
+        self.assertEqual(database[self.key1], value)
+        self.assertEqual(database[self.key2], self.value2)
+
+    def test_values_written_after_open_are_read_from_the_file(self):
+        database = self.create_database()
+        values = dict((("key%i" % idx).encode(), ("value%i" % idx).encode() * 100) for idx in range(100))
+        for key, value in values.items():
+            database[key] = value
+            self.assertEqual(database[key], value)
+        for key, value in values.items():
+            self.assertEqual(database[key], value)
+
+    def test_read_only(self):
+        database = self.create_database()
+        database[self.key1] = self.value1
+        database.close()
+
+        database = self.create_database(read_only=True)
+        self.assertEqual(database[self.key1], self.value1)
+        self.assertRaises(RuntimeError, database.__setitem__, self.key2, self.value2)
+        database.close()
+
+    def test_not_a_database_file(self):
+        with open(join(self.output_path, "database.log"), "wb") as fptr:
+            fptr.write(b"garbage")
+        self.assertRaises(RuntimeError, self.create_database)
+
+
+class TestPickedLogDataBase(TestPickedDataBase):
+    """
+    Test the picked log structured database
+
+    Re-uses test from TestDataBase class
+    """
+
+    def create_database(self, new=False):
+        return PickledDataBase(LogDataBase(join(self.output_path, "database.log"), new=new))
+
+
+class TestGenerationDataBase(unittest.TestCase):
+    """
+    Test the database tracking the generation in which keys were last used
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_database_out")
+        renew_path(self.output_path)
+
+    def create_database(self, max_age=10):
+        return GenerationDataBase(LogDataBase(join(self.output_path, "database.log")), max_age=max_age)
+
+    def test_generation_is_incremented(self):
+        database = self.create_database()
+        self.assertEqual(database.generation, 0)
+        database.close()
+        database = self.create_database()
+        self.assertEqual(database.generation, 1)
+
+    def test_keys_unused_for_max_age_generations_are_removed(self):
+        database = self.create_database(max_age=1)
+        database[b"used"] = b"value"
+        database[b"unused"] = b"value"
+        database.close()
+
+        for _ in range(3):
+            database = self.create_database(max_age=1)
+            self.assertTrue(b"used" in database)
+            database.close()
+
+        database = self.create_database(max_age=1)
+        self.assertEqual(database[b"used"], b"value")
+        self.assertFalse(b"unused" in database)
+        self.assertEqual(database.keys(), [b"used"])
+
+    def test_remove_unused(self):
+        database = self.create_database()
+        database[b"used"] = b"value"
+        database[b"unused"] = b"value"
+        database.close()
+
+        database = self.create_database()
+        self.assertEqual(database[b"used"], b"value")
+        self.assertEqual(database.remove_unused(measure_kept=True),
+                         dict(removed_entries=1, removed_bytes=len(b"unused") + len(b"value"),
+                              kept_entries=1, kept_bytes=len(b"used") + len(b"value")))
+        database.close()
+
+        database = self.create_database()
+        self.assertTrue(b"used" in database)
+        self.assertFalse(b"unused" in database)
+
+    def test_generations_of_concurrent_databases_are_merged(self):
+        database = self.create_database(max_age=1)
+        database[b"key1"] = b"value"
+        database[b"key2"] = b"value"
+        database.close()
+
+        database1 = self.create_database(max_age=1)
+        database2 = self.create_database(max_age=1)
+        self.assertTrue(b"key1" in database1)
+        self.assertTrue(b"key2" in database2)
+        database2.close()
+        database1.close()
+
+        self.create_database(max_age=1).close()
+        database = self.create_database(max_age=1)
+        self.assertEqual(sorted(database.keys()), [b"key1", b"key2"])
+
+    def test_keys_from_before_tracking_are_kept(self):
+        raw_database = LogDataBase(join(self.output_path, "database.log"))
+        raw_database[b"key"] = b"value"
+        raw_database.close()
+
+        database = self.create_database()
+        self.assertEqual(database.remove_unused()["removed_entries"], 0)
+
+
+class TestConcurrentDataBase(unittest.TestCase):
+    """
+    Test databases used by several processes at the same time
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_database_out")
+        renew_path(self.output_path)
+
+    def _test_concurrent_processes(self, database_class, path):
+        processes = [multiprocessing.Process(target=_write_keys, args=(database_class, path, idx))
+                     for idx in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        database = database_class(path)
+        for idx in range(4):
+            for key_idx in range(50):
+                key = ("%i.%i" % (idx, key_idx)).encode()
+                self.assertEqual(database[key], key * 10)
+        self.assertIn(database[b"common"], [str(idx).encode() for idx in range(4)])
+
+    def test_concurrent_processes_with_directory_database(self):
+        self._test_concurrent_processes(DataBase, join(self.output_path, "database"))
+
+    def test_concurrent_processes_with_log_database(self):
+        self._test_concurrent_processes(LogDataBase, join(self.output_path, "database.log"))
+
+    def test_log_database_sees_values_of_other_instance(self):
+        path = join(self.output_path, "database.log")
+        database1 = LogDataBase(path)
+        database2 = LogDataBase(path)
+        database1[b"key1"] = b"value1"
+        self.assertTrue(b"key1" in database2)
+        self.assertEqual(database2[b"key1"], b"value1")
+        database2[b"key2"] = b"value2"
+        self.assertEqual(database1[b"key2"], b"value2")
+        database1.close()
+        database2.close()
+
+        database = LogDataBase(path)
+        self.assertEqual(database[b"key1"], b"value1")
+        self.assertEqual(database[b"key2"], b"value2")
+
+    def test_log_database_replaced_by_compaction_of_other_instance(self):
+        path = join(self.output_path, "database.log")
+        database1 = LogDataBase(path)
+        database1[b"key1"] = b"value1"
+
+        database2 = LogDataBase(path)
+        for _ in range(10):
+            database2[b"key2"] = b"x" * (256 * 1024)
+        database2.close()
+
+        database1[b"key3"] = b"value3"
+        self.assertEqual(database1[b"key1"], b"value1")
+        database1.close()
+
+        database = LogDataBase(path)
+        self.assertEqual(database[b"key1"], b"value1")
+        self.assertEqual(database[b"key2"], b"x" * (256 * 1024))
+        self.assertEqual(database[b"key3"], b"value3")
+
+
+def _write_keys(database_class, path, idx):
+    """
+    Write keys from another process
+    """
+    database = database_class(path)
+    for key_idx in range(50):
+        key = ("%i.%i" % (idx, key_idx)).encode()
+        database[key] = key * 10
+        database[b"common"] = str(idx).encode()
+    database.close()
@@ -0,0 +1,118 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the distribution of test suites to workers
+"""
+
+import unittest
+import threading
+import socket
+from os.path import join, dirname
+from vunit.distributed import Coordinator, connect, serve, parse_address
+from vunit.test_report import PASSED, FAILED
+from vunit.ostools import renew_path, read_file, ResourceUsage
+from vunit.test.mock_2or3 import mock
+
+
+class TestDistributed(unittest.TestCase):
+    """
+    Test the coordinator and worker over localhost
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_distributed_out")
+        renew_path(self.output_path)
+        self.coordinator = Coordinator(("localhost", 0))
+        self.threads = []
+
+    def tearDown(self):
+        self.coordinator.close()
+        for thread in self.threads:
+            thread.join()
+
+    def _start_worker(self, run_test_suite):
+        """
+        Start a worker thread and return the coordinator side of it
+        """
+        connection = connect(self.coordinator.address)
+
+        def run_worker():
+            try:
+                serve(connection, run_test_suite, "worker")
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run_worker)
+        thread.start()
+        self.threads.append(thread)
+
+        remote_worker = None
+        while remote_worker is None:
+            remote_worker = self.coordinator.accept()
+        self.assertEqual(remote_worker.name, "worker")
+        return remote_worker
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("host:1234"), ("host", 1234))
+        self.assertEqual(parse_address("1234"), ("", 1234))
+        self.assertEqual(parse_address("1234", default_host="localhost"), ("localhost", 1234))
+        self.assertRaises(ValueError, parse_address, "host:port")
+
+    @mock.patch("vunit.distributed.HELLO_TIMEOUT", 0.1)
+    def test_drops_connection_which_does_not_say_hello(self):
+        silent = socket.create_connection(self.coordinator.address)
+        silent.settimeout(5.0)
+        try:
+            self.assertIsNone(self.coordinator.accept())
+            self.assertEqual(silent.recv(1), b"")
+        finally:
+            silent.close()
+
+    def test_runs_test_suites_on_worker(self):
+        requested = []
+
+        def run_test_suite(name, output_stream):
+            requested.append(name)
+            output_stream.write("line1\n")
+            output_stream.write("line2\n")
+            return {name + ".test1": PASSED, name + ".test2": FAILED}, ResourceUsage(1.5, 1024, 512)
+
+        remote_worker = self._start_worker(run_test_suite)
+        test_suite = mock.Mock()
+        test_suite.name = "lib.tb"
+        output_file_name = join(self.output_path, "tb", "output.txt")
+        results, resource_usage = remote_worker.execute_test_suite(test_suite, join(self.output_path, "tb"),
+                                                                   output_file_name)
+        self.assertEqual(results, {"lib.tb.test1": PASSED, "lib.tb.test2": FAILED})
+        self.assertEqual(resource_usage, ResourceUsage(1.5, 1024, 512))
+        self.assertEqual(read_file(output_file_name), "line1\nline2\n")
+        self.assertEqual(requested, ["lib.tb"])
+        self.assertTrue(remote_worker.is_alive())
+        remote_worker.close()
+
+    def test_worker_failing_to_run_test_suite(self):
+        remote_worker = self._start_worker(lambda name, output_stream: (None, None))
+        test_suite = mock.Mock()
+        test_suite.name = "lib.tb"
+        self.assertEqual(remote_worker.execute_test_suite(test_suite, self.output_path,
+                                                          join(self.output_path, "output.txt")),
+                         (None, None))
+        self.assertTrue(remote_worker.is_alive())
+        remote_worker.close()
+
+    def test_lost_worker(self):
+        def run_test_suite(name, output_stream):  # pylint: disable=unused-argument
+            raise EOFError
+
+        remote_worker = self._start_worker(run_test_suite)
+        test_suite = mock.Mock()
+        test_suite.name = "lib.tb"
+        self.assertEqual(remote_worker.execute_test_suite(test_suite, self.output_path,
+                                                          join(self.output_path, "output.txt")),
+                         (None, None))
+        self.assertFalse(remote_worker.is_alive())
+        remote_worker.close()
@@ -0,0 +1,64 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the event log
+"""
+
+import unittest
+import json
+import os
+from os.path import join, dirname
+from vunit.event_log import EventLog
+from vunit.ostools import renew_path, read_file
+from vunit.test.mock_2or3 import mock
+
+
+class TestEventLog(unittest.TestCase):
+    """
+    Test the event log
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_event_log_out")
+        renew_path(self.output_path)
+        self.file_name = join(self.output_path, "events.jsonl")
+
+    def test_appends_one_flushed_line_per_event(self):
+        event_log = EventLog.open(self.file_name)
+        with mock.patch("vunit.event_log.time.time", return_value=1.0):
+            event_log.emit("run_start", num_tests=2)
+            # Flushed before closing
+            self.assertEqual(read_file(self.file_name).count("\n"), 1)
+            event_log.emit("run_end")
+        event_log.close()
+
+        event_log = EventLog.open(self.file_name)
+        event_log.emit("run_start", num_tests=1)
+        event_log.close()
+
+        events = [json.loads(line) for line in read_file(self.file_name).splitlines()]
+        self.assertEqual(events[:2], [{"event": "run_start", "num_tests": 2, "time": 1.0},
+                                      {"event": "run_end", "time": 1.0}])
+        self.assertEqual(events[2]["num_tests"], 1)
+
+    def test_file_descriptor(self):
+        read_fd, write_fd = os.pipe()
+        event_log = EventLog.open(str(write_fd))
+        event_log.emit("run_end")
+        event_log.close()
+        with os.fdopen(read_fd, "rb") as fread:
+            self.assertEqual(json.loads(fread.read().decode("utf-8"))["event"], "run_end")
+
+    def test_stops_writing_after_error(self):
+        fptr = mock.Mock()
+        fptr.write.side_effect = IOError("Broken pipe")
+        event_log = EventLog(fptr)
+        with mock.patch("vunit.event_log.LOGGER") as logger:
+            event_log.emit("run_start")
+            event_log.emit("run_end")
+        self.assertEqual(fptr.write.call_count, 1)
+        self.assertEqual(logger.warning.call_count, 1)
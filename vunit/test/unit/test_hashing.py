@@ -0,0 +1,81 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the content hash cache
+"""
+
+import unittest
+from os.path import join, dirname
+import os
+from vunit.hashing import ContentHashCache, hash_bytes
+from vunit.ostools import renew_path, write_file
+from vunit.test.mock_2or3 import mock
+
+
+class TestContentHashCache(unittest.TestCase):
+    """
+    Test the content hash cache
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_hashing_out")
+        renew_path(self.output_path)
+        self.file_name = join(self.output_path, "file.sv")
+        write_file(self.file_name, "contents")
+
+    def test_content_hash(self):
+        cache = ContentHashCache()
+        self.assertEqual(cache.content_hash(self.file_name), hash_bytes(b"contents"))
+
+    def test_missing_file_has_no_content_hash(self):
+        cache = ContentHashCache()
+        self.assertEqual(cache.content_hash(join(self.output_path, "missing.sv")), None)
+
+    def test_file_is_read_once_per_run(self):
+        cache = ContentHashCache()
+        cache.content_hash(self.file_name)
+        write_file(self.file_name, "new contents")
+        with mock.patch("vunit.hashing.io.open", autospec=True) as io_open:
+            self.assertEqual(cache.content_hash(self.file_name), hash_bytes(b"contents"))
+            self.assertEqual(io_open.mock_calls, [])
+
+    def test_file_with_unchanged_signature_is_not_read_in_next_run(self):
+        database = {}
+        self._set_age(self.file_name, 10)
+        ContentHashCache(database=database).content_hash(self.file_name)
+
+        with mock.patch("vunit.hashing.io.open", autospec=True) as io_open:
+            content_hash = ContentHashCache(database=database).content_hash(self.file_name)
+            self.assertEqual(io_open.mock_calls, [])
+        self.assertEqual(content_hash, hash_bytes(b"contents"))
+
+    def test_file_with_changed_signature_is_read_in_next_run(self):
+        database = {}
+        self._set_age(self.file_name, 10)
+        ContentHashCache(database=database).content_hash(self.file_name)
+
+        write_file(self.file_name, "new contents")
+        self._set_age(self.file_name, 5)
+        self.assertEqual(ContentHashCache(database=database).content_hash(self.file_name),
+                         hash_bytes(b"new contents"))
+
+    def test_recently_modified_file_is_read_in_next_run(self):
+        database = {}
+        ContentHashCache(database=database).content_hash(self.file_name)
+
+        # Same size and possibly the same modification time
+        write_file(self.file_name, "CONTENTS")
+        self.assertEqual(ContentHashCache(database=database).content_hash(self.file_name),
+                         hash_bytes(b"CONTENTS"))
+
+    @staticmethod
+    def _set_age(file_name, seconds):
+        """
+        Set the modification time of file_name to seconds ago
+        """
+        stat = os.stat(file_name)
+        os.utime(file_name, (stat.st_atime, stat.st_mtime - seconds))
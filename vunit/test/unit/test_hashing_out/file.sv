@@ -0,0 +1 @@
+CONTENTS
\ No newline at end of file
@@ -0,0 +1,76 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test merging of shard reports
+"""
+
+import unittest
+from shutil import rmtree
+from os.path import join, dirname
+from xml.etree import ElementTree
+from vunit.merge_reports import merge_junit_xml, main
+from vunit.test_report import TestReport, PASSED, FAILED, SKIPPED
+from vunit.test_history import TestHistory
+from vunit.ostools import renew_path, write_file, read_file
+
+
+class TestMergeReports(unittest.TestCase):
+    """
+    Test merging of shard reports
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "merge_reports_out")
+        renew_path(self.output_path)
+        self.output_file_name = join(self.output_path, "output.txt")
+        write_file(self.output_file_name, "output")
+
+    def tearDown(self):
+        rmtree(self.output_path)
+
+    def _junit_xml(self, results):
+        """
+        Create a JUnit XML report with the results
+        """
+        report = TestReport()
+        for name, status in results:
+            report.add_result(name, status, 1.0, self.output_file_name)
+        return report.to_junit_xml_str()
+
+    def test_merge_junit_xml(self):
+        xml = merge_junit_xml([self._junit_xml([("lib.tb1.test", PASSED), ("lib.tb2.test", FAILED)]),
+                               self._junit_xml([("lib.tb3.test", SKIPPED)])])
+        root = ElementTree.fromstring(xml)
+        self.assertEqual(root.tag, "testsuite")
+        self.assertEqual(root.attrib["tests"], "3")
+        self.assertEqual(root.attrib["failures"], "1")
+        self.assertEqual(root.attrib["skipped"], "1")
+        self.assertEqual([test.attrib["classname"] for test in root.findall("testcase")],
+                         ["lib.tb1", "lib.tb2", "lib.tb3"])
+
+    def test_main(self):
+        file_names = []
+        for idx in range(2):
+            file_name = join(self.output_path, "shard%i.xml" % idx)
+            write_file(file_name, self._junit_xml([("lib.tb%i.test" % idx, PASSED)]))
+            file_names.append(file_name)
+
+            history = TestHistory()
+            history.add_runtime("lib.tb%i" % idx, float(idx))
+            history.save(join(self.output_path, "shard%i.json" % idx))
+
+        merged_xml = join(self.output_path, "merged.xml")
+        self.assertEqual(main(["--xunit-xml", merged_xml] + file_names), 0)
+        self.assertEqual(ElementTree.fromstring(read_file(merged_xml)).attrib["tests"], "2")
+
+        merged_json = join(self.output_path, "merged.json")
+        self.assertEqual(main(["--test-history", merged_json,
+                               join(self.output_path, "shard0.json"),
+                               join(self.output_path, "shard1.json")]), 0)
+        history = TestHistory.load(merged_json)
+        self.assertEqual(history.runtime("lib.tb0"), 0.0)
+        self.assertEqual(history.runtime("lib.tb1"), 1.0)
@@ -12,8 +12,15 @@ Test the os-dependent functionality wrappers
 from unittest import TestCase
 from shutil import rmtree
 from os.path import exists, dirname, join, abspath
+import os
 import sys
-from vunit.ostools import Process, renew_path
+import unittest
+import threading
+import time
+from vunit.ostools import (Process, renew_path, get_io_engine,
+                           start_resource_accounting, stop_resource_accounting,
+                           set_deadline, TimeoutExpired, IS_WINDOWS_SYSTEM)
+from vunit.test.mock_2or3 import mock
 
 
 class TestOSTools(TestCase):
@@ -93,3 +100,124 @@ sleep(1000)
         process = Process([sys.executable, python_script])
         process.consume_output(output.append)
         self.assertEqual(output, ["ac"])
+
+    def test_partial_last_line_is_kept(self):
+        python_script = self.make_file("run_partial.py", r"""
+from sys import stdout
+stdout.write("foo\r\nbar")
+""")
+        output = []
+        process = Process([sys.executable, python_script])
+        process.consume_output(output.append)
+        self.assertEqual(output, ["foo", "bar"])
+
+    def test_printed_output_is_written_in_chunks(self):
+        python_script = self.make_file("run_chunks.py", r"""
+from sys import stdout
+stdout.write("".join("line%i\n" % idx for idx in range(1000)))
+stdout.write("last")
+""")
+        output = mock.Mock()
+        with mock.patch("sys.stdout", new=output):
+            process = Process([sys.executable, python_script])
+            process.consume_output()
+        written = "".join(call[0][0] for call in output.write.call_args_list)
+        self.assertEqual(written, "".join("line%i\n" % idx for idx in range(1000)) + "last\n")
+        if get_io_engine() is not None:
+            self.assertLess(output.write.call_count, 100)
+
+    def test_thread_reader_fallback(self):
+        python_script = self.make_file("run_fallback.py", r"""
+from sys import stdout
+stdout.write("foo\n")
+""")
+        output = []
+        with mock.patch("vunit.ostools.get_io_engine", return_value=None):
+            process = Process([sys.executable, python_script])
+            process.consume_output(output.append)
+        self.assertEqual(output, ["foo"])
+
+    def test_many_processes_share_one_reader_thread(self):
+        if get_io_engine() is None:
+            return
+
+        python_script = self.make_file("run_many.py", r"""
+import sys
+from time import sleep
+sleep(0.2)
+for idx in range(100):
+    sys.stdout.write("%s %i\n" % (sys.argv[1], idx))
+""")
+        num_threads = threading.active_count()
+        processes = [Process([sys.executable, python_script, str(idx)]) for idx in range(16)]
+        self.assertEqual(threading.active_count(), num_threads)
+
+        for idx, process in enumerate(processes):
+            output = []
+            process.consume_output(output.append)
+            self.assertEqual(output, ["%i %i" % (idx, line_idx) for line_idx in range(100)])
+
+    def test_wait_returns_exit_code(self):
+        python_script = self.make_file("run_exit.py", r"""
+import sys
+sys.exit(3)
+""")
+        process = Process([sys.executable, python_script])
+        self.assertEqual(process.next_line(), 3)
+        self.assertFalse(process.is_alive())
+        process.terminate()
+
+    @unittest.skipUnless(hasattr(os, "wait4"), "Requires wait4")
+    def test_resource_accounting(self):
+        python_script = self.make_file("run_resources.py", r"""
+import sys
+import time
+data = bytearray(64 * 1024 * 1024)
+start = time.time()
+while time.time() - start < 0.2:
+    pass
+sys.exit(int(sys.argv[1]))
+""")
+        persistent = Process([sys.executable, "-c", "import sys; sys.stdin.read()"])
+
+        start_resource_accounting()
+        process = Process([sys.executable, python_script, "1"])
+        self.assertEqual(process.next_line(), 1)
+        usage = stop_resource_accounting()
+
+        self.assertGreater(usage.cpu_time, 0.1)
+        self.assertGreater(usage.max_rss, 64 * 1024 * 1024)
+        self.assertEqual(usage, process.resource_usage)
+
+        # Not accounted since started before the accounting period
+        persistent.terminate()
+        self.assertEqual(stop_resource_accounting(), None)
+
+    @unittest.skipIf(IS_WINDOWS_SYSTEM, "Requires process groups")
+    def test_deadline_kills_process_group(self):
+        python_script = self.make_file("run_hang.py", r"""
+import subprocess
+import sys
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+sys.stdout.write("%i\n" % child.pid)
+sys.stdout.flush()
+child.wait()
+""")
+        output = []
+        set_deadline(time.time() + 1.0)
+        try:
+            process = Process([sys.executable, python_script])
+            self.assertRaises(TimeoutExpired, process.consume_output, output.append)
+        finally:
+            set_deadline(None)
+
+        self.assertFalse(process.is_alive())
+        child_pid = int(output[0])
+        for _ in range(50):
+            try:
+                os.kill(child_pid, 0)
+            except OSError:
+                break
+            time.sleep(0.1)
+        else:
+            self.fail("Child process was not killed")
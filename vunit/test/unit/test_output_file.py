@@ -0,0 +1,65 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the output file of a test suite
+"""
+
+import unittest
+import gzip
+from os.path import join, dirname
+from vunit.output_file import OutputFile, read_output, read_output_tail
+from vunit.ostools import renew_path
+
+
+class TestOutputFile(unittest.TestCase):
+    """
+    Test the output file of a test suite
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_output_file_out")
+        renew_path(self.output_path)
+
+    def test_write_and_read(self):
+        file_name = join(self.output_path, "output.txt")
+        output_file = OutputFile(file_name)
+        output_file.write("line1\nli")
+        output_file.write("ne2\n")
+        output_file.close()
+        self.assertEqual(read_output(file_name), "line1\nline2\n")
+        self.assertFalse(output_file.truncated)
+
+    def test_compressed(self):
+        file_name = join(self.output_path, "output.txt.gz")
+        output_file = OutputFile(file_name)
+        output_file.write("line1\nline2\n")
+        output_file.close()
+        with gzip.open(file_name, "rb") as fread:
+            self.assertEqual(fread.read(), b"line1\nline2\n")
+        self.assertEqual(read_output(file_name), "line1\nline2\n")
+        self.assertEqual(read_output_tail(file_name, 1), (1, ["line2"]))
+
+    def test_tail(self):
+        output_file = OutputFile(join(self.output_path, "output.txt"), tail_lines=2)
+        output_file.write("line1\n")
+        self.assertEqual(output_file.tail(), (0, ["line1"]))
+        output_file.write("line2\nline3\nline")
+        output_file.write("4")
+        output_file.close()
+        self.assertEqual(output_file.tail(), (2, ["line3", "line4"]))
+
+    def test_size_cap(self):
+        file_name = join(self.output_path, "output.txt")
+        output_file = OutputFile(file_name, tail_lines=1, size_cap=8)
+        output_file.write("line1\n")
+        output_file.write("line2\n")
+        output_file.write("line3\n")
+        output_file.close()
+        self.assertTrue(output_file.truncated)
+        self.assertEqual(read_output(file_name), "line1\nli\n*** Output truncated after 8 bytes ***\n")
+        self.assertEqual(output_file.tail(), (2, ["line3"]))
+        self.assertEqual(read_output_tail(file_name, 2), (1, ["li", "*** Output truncated after 8 bytes ***"]))
@@ -709,6 +709,13 @@ end architecture;
         self.assertTrue(deps[1] == self.project.get_source_files_in_order()[1])
         self.assertTrue(deps[2] == self.project.get_source_files_in_order()[2])
 
+    def test_get_files_in_compile_order_with_target(self):
+        self.create_dummy_three_file_project()
+        files = self.project.get_source_files_in_order()
+        self.assertEqual(self.project.get_files_in_compile_order(target_files=[files[1]]), files[:2])
+        self.assertEqual(self.project.get_files_in_compile_order(target_files=[files[0]]), files[:1])
+        self.assertEqual(self.project.get_files_in_compile_order(target_files=[]), [])
+
     def test_compiles_same_file_into_different_libraries(self):
         pkgs = []
         second_pkgs = []
@@ -1073,6 +1080,29 @@ end architecture;
                                                   no_parse=no_parse)
             self.assertEqual(len(source_file.design_units), int(not no_parse))
 
+    def test_add_source_file_uses_preparsed_verilog_files(self):
+        self.project = Project(num_parse_processes=2)
+        self.project.add_library("lib", "work_path")
+        write_file("module1.sv", """\
+module module1;
+endmodule
+""")
+        write_file("module2.sv", """\
+module module2;
+  module1 inst();
+endmodule
+""")
+        self.project.preparse_verilog_files(["module1.sv", "module2.sv"])
+
+        with mock.patch("vunit.parsing.verilog.parser.VerilogParser._parse_uncached",
+                        autospec=True) as parse_uncached:
+            module1 = self.project.add_source_file("module1.sv", "lib", file_type="verilog")
+            module2 = self.project.add_source_file("module2.sv", "lib", file_type="verilog")
+            self.assertEqual(parse_uncached.mock_calls, [])
+
+        self.assertEqual([unit.name for unit in module2.design_units], ["module2"])
+        self.assert_compiles(module1, before=module2)
+
     def add_source_file(self, library_name, file_name, contents, defines=None):
         """
         Convenient wrapper arround project.add_source_file
@@ -0,0 +1,163 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the result cache
+"""
+
+import unittest
+import functools
+import threading
+from shutil import rmtree
+from os.path import join, dirname
+from vunit.result_cache import ResultCache, create_fingerprint, callable_identity, UnknownIdentity
+from vunit.configuration import Configuration
+from vunit.ostools import renew_path
+from vunit.test.mock_2or3 import mock
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Test the result cache
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "result_cache_out")
+        renew_path(self.output_path)
+        self.file_name = join(self.output_path, "result_cache.json")
+
+    def tearDown(self):
+        rmtree(self.output_path)
+
+    def test_is_cached(self):
+        cache = ResultCache()
+        self.assertFalse(cache.is_cached(["lib.tb.test1"], "fp"))
+        cache.add_result("lib.tb.test1", True, "fp")
+        cache.add_result("lib.tb.test2", True, "fp")
+        self.assertTrue(cache.is_cached(["lib.tb.test1", "lib.tb.test2"], "fp"))
+        self.assertFalse(cache.is_cached(["lib.tb.test1"], "other"))
+        cache.add_result("lib.tb.test2", False, "fp")
+        self.assertFalse(cache.is_cached(["lib.tb.test1", "lib.tb.test2"], "fp"))
+
+    def test_save_and_load(self):
+        cache = ResultCache()
+        cache.add_result("lib.tb.test1", True, "fp")
+        cache.save(self.file_name)
+        self.assertTrue(ResultCache.load(self.file_name).is_cached(["lib.tb.test1"], "fp"))
+
+        with open(self.file_name, "w") as fptr:
+            fptr.write("corrupt")
+        self.assertFalse(ResultCache.load(self.file_name).is_cached(["lib.tb.test1"], "fp"))
+
+    def test_fingerprint(self):
+        config = self._create_config()
+        fingerprint = create_fingerprint(config, ["hash1", "hash2"], "sim", False)
+        self.assertEqual(create_fingerprint(self._create_config(), ["hash2", "hash1"], "sim", False), fingerprint)
+        self.assertNotEqual(create_fingerprint(config, ["hash1", "hash3"], "sim", False), fingerprint)
+        self.assertNotEqual(create_fingerprint(config, ["hash1", "hash2"], "other_sim", False), fingerprint)
+        self.assertNotEqual(create_fingerprint(config, ["hash1", "hash2"], "sim", True), fingerprint)
+
+        for modify in [lambda config: config.set_generic("value", 2),
+                       lambda config: config.set_sim_option("disable_ieee_warnings", True),
+                       lambda config: setattr(config, "pre_config", _pre_config),
+                       lambda config: setattr(config, "post_check", _post_check)]:
+            config = self._create_config()
+            modify(config)
+            self.assertNotEqual(create_fingerprint(config, ["hash1", "hash2"], "sim", False), fingerprint)
+
+    def test_callable_identity(self):
+        self.assertEqual(callable_identity(None), None)
+        self.assertEqual(callable_identity(_pre_config), callable_identity(_pre_config))
+        self.assertNotEqual(callable_identity(_pre_config), callable_identity(_post_check))
+        self.assertEqual(callable_identity(_make_nested()), callable_identity(_make_nested()))
+        self.assertNotIn(" at 0x", callable_identity(_make_nested()))
+
+    def test_callable_identity_covers_captured_values(self):
+        self.assertEqual(callable_identity(_make_post_check(1)), callable_identity(_make_post_check(1)))
+        self.assertNotEqual(callable_identity(_make_post_check(1)), callable_identity(_make_post_check(2)))
+
+        self.assertEqual(callable_identity(functools.partial(_post_check, 1)),
+                         callable_identity(functools.partial(_post_check, 1)))
+        self.assertNotEqual(callable_identity(functools.partial(_post_check, 1)),
+                            callable_identity(functools.partial(_post_check, 2)))
+        self.assertNotEqual(callable_identity(functools.partial(_post_check, output_path=1)),
+                            callable_identity(functools.partial(_post_check, output_path=2)))
+
+        self.assertNotEqual(callable_identity(_make_with_default(1)), callable_identity(_make_with_default(2)))
+
+        self.assertEqual(callable_identity(_PostCheck(1)), callable_identity(_PostCheck(1)))
+        self.assertNotEqual(callable_identity(_PostCheck(1)), callable_identity(_PostCheck(2)))
+        self.assertNotEqual(callable_identity(_PostCheck(1).method), callable_identity(_PostCheck(2).method))
+
+    def test_unknown_identity_is_not_cached(self):
+        config = self._create_config()
+        lock = threading.Lock()
+        config.post_check = lambda output_path: lock
+        self.assertRaises(UnknownIdentity, callable_identity, config.post_check)
+        self.assertIsNone(create_fingerprint(config, ["hash1"], "sim", False))
+
+        cache = ResultCache()
+        cache.add_result("lib.tb.test1", True, None)
+        self.assertFalse(cache.is_cached(["lib.tb.test1"], None))
+
+    @staticmethod
+    def _create_config():
+        """
+        Create a configuration of a test bench
+        """
+        design_unit = mock.Mock()
+        design_unit.generic_names = ["value"]
+        config = Configuration("name", design_unit)
+        config.set_generic("value", 1)
+        return config
+
+
+def _pre_config():
+    return True
+
+
+def _post_check(output_path):  # pylint: disable=unused-argument
+    return False
+
+
+def _make_post_check(expected):
+    """
+    Return a post_check capturing the expected value
+    """
+    def post_check(output_path):  # pylint: disable=unused-argument
+        return expected
+    return post_check
+
+
+def _make_with_default(expected):
+    """
+    Return a post_check with the expected value as default argument
+    """
+    return lambda output_path, expected=expected: expected
+
+
+class _PostCheck(object):
+    """
+    A callable post_check object
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+
+    def __call__(self, output_path):  # pylint: disable=unused-argument
+        return self.expected
+
+    def method(self, output_path):  # pylint: disable=unused-argument
+        return self.expected
+
+
+def _make_nested():
+    """
+    Return a function with a nested code object
+    """
+    def function():
+        return [value for value in range(3)]
+    return function
@@ -79,6 +79,29 @@ class TestSimulatorInterface(unittest.TestCase):
                                           mock.call(["command3"], env=simif.get_env())], any_order=True)
         self.assertEqual(project.get_files_in_compile_order(incremental=True), [file1, file2])
 
+    def test_compile_source_files_emits_events(self):
+        simif = create_simulator_interface()
+        simif.compile_source_file_command.side_effect = iter([["command1"], ["command2"]])
+        project = Project()
+        project.add_library("lib", "lib_path")
+        write_file("file1.vhd", "")
+        file1 = project.add_source_file("file1.vhd", "lib", file_type="vhdl")
+        write_file("file2.vhd", "")
+        file2 = project.add_source_file("file2.vhd", "lib", file_type="vhdl")
+        project.add_manual_dependency(file2, depends_on=file1)
+        event_log = mock.Mock()
+
+        with mock.patch("vunit.simulator_interface.run_command", autospec=True) as run_command:
+            run_command.side_effect = iter([False])
+            self.assertRaises(CompileError, simif.compile_source_files, project,
+                              continue_on_error=True, event_log=event_log)
+
+        self.assertEqual([(call[1][0], call[2]["file_name"], call[2].get("status"))
+                          for call in event_log.emit.mock_calls],
+                         [("compile_start", file1.name, None),
+                          ("compile_end", file1.name, "failed"),
+                          ("compile_skipped", file2.name, None)])
+
     def test_compile_source_files_run_command_error(self):
         simif = create_simulator_interface()
         simif.compile_source_file_command.return_value = ["command"]
@@ -141,6 +164,32 @@ class TestSimulatorInterface(unittest.TestCase):
         self.assertEqual(simif.find_prefix(), "prefix_from_path")
         environ.get.assert_called_once_with("VUNIT_SIMNAME_PATH", None)
 
+    def test_identity(self):
+
+        class MySimulatorInterface(SimulatorInterface):  # pylint: disable=abstract-method
+            """
+            Dummy simulator interface for testing
+            """
+            name = "simname"
+            executable = "simexe"
+
+            def __init__(self, prefix):
+                self._prefix = prefix
+
+        prefix = join(self.output_path, "bin")
+        executable = join(prefix, "simexe")
+        write_file(executable, "")
+        os.utime(executable, (1000, 1000))
+        simif = MySimulatorInterface(prefix)
+        identity = simif.identity()
+        self.assertIn(executable, identity)
+        self.assertEqual(simif.identity(), identity)
+
+        os.utime(executable, (2000, 2000))
+        self.assertNotEqual(simif.identity(), identity)
+        self.assertNotEqual(MySimulatorInterface(join(self.output_path, "other")).identity(), simif.identity())
+        self.assertEqual(create_simulator_interface().identity(), None)
+
     def setUp(self):
         self.output_path = join(dirname(__file__), "test_simulator_interface__out")
         renew_path(self.output_path)
@@ -285,6 +285,25 @@ if run("Test 2")
         test_bench = TestBench(design_unit)
         self.assertRaises(ValueError, test_bench.set_sim_option, "unknown", "value")
 
+    def test_uses_test_cases_and_pragmas_of_parsed_source_file(self):
+        design_unit = Entity('tb_entity', no_arch=True)
+        test_bench = TestBench(design_unit)
+        with mock.patch("vunit.ostools.read_file") as read_file:
+            design_unit.add_architecture("arch",
+                                         test_cases=["Test 1", "Test 2"],
+                                         pragmas=["run_all_in_same_sim"])
+            self.assertFalse(read_file.called)
+        tests = self.create_tests(test_bench)
+        self.assert_has_tests(tests,
+                              [("lib.tb_entity", ("lib.tb_entity.Test 1", "lib.tb_entity.Test 2"))])
+
+    def test_duplicate_test_cases_of_parsed_source_file(self):
+        design_unit = Entity('tb_entity', no_arch=True)
+        TestBench(design_unit)
+        self.assertRaises(RuntimeError,
+                          design_unit.add_architecture, "arch",
+                          test_cases=["Test 1", "Test 1"], pragmas=[])
+
     def assert_has_tests(self, test_list, tests):
         """
         Asser that the test_list contains tests.
@@ -324,6 +343,16 @@ def get_config_of(tests, test_name):
     raise KeyError(test_name)
 
 
+class SourceFile(object):
+    """
+    Mock SourceFile, test cases and pragmas are None when not parsed
+    """
+    def __init__(self, name, test_cases=None, pragmas=None):
+        self.name = name
+        self.test_cases = test_cases
+        self.pragmas = pragmas
+
+
 class Module(object):
     def __init__(self, name, contents=''):
         self.name = name
@@ -332,6 +361,7 @@ class Module(object):
         self.is_module = True
         self.generic_names = []
         self.file_name = out('file.v')
+        self.source_file = SourceFile(self.file_name)
         write_file(out('file.v'), contents)
 
 
@@ -344,16 +374,21 @@ class Entity(object):  # pylint: disable=too-many-instance-attributes
         self.library_name = "lib"
         self.is_entity = True
         self.is_module = False
-        self.architecture_names = {}
+        self.architecture_source_files = {}
 
         if not no_arch:
-            self.architecture_names = {"arch": out("file.vhd")}
+            self.architecture_source_files = {"arch": SourceFile(out("file.vhd"))}
 
         self.generic_names = []
         self.file_name = out('file.vhd')
         write_file(out('file.vhd'), contents)
         self._add_architecture_callback = None
 
+    @property
+    def architecture_names(self):
+        return dict((name, source_file.name)
+                    for name, source_file in self.architecture_source_files.items())
+
     def set_add_architecture_callback(self, callback):
         """
         Set callback to be called when an architecture is added
@@ -361,12 +396,12 @@ class Entity(object):  # pylint: disable=too-many-instance-attributes
         assert self._add_architecture_callback is None
         self._add_architecture_callback = callback
 
-    def add_architecture(self, name, contents=""):
+    def add_architecture(self, name, contents="", test_cases=None, pragmas=None):
         """
         Add architecture to this entity
         """
         file_name = name + ".vhd"
-        self.architecture_names[name] = out(file_name)
+        self.architecture_source_files[name] = SourceFile(out(file_name), test_cases, pragmas)
         write_file(out(file_name), contents)
 
         if self._add_architecture_callback is not None:
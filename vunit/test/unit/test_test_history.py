@@ -0,0 +1,147 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the test history
+"""
+
+import unittest
+from shutil import rmtree
+from os.path import join, dirname
+from vunit.test_history import TestHistory, longest_first, assign_shards
+from vunit.ostools import renew_path, write_file
+
+
+class TestTestHistory(unittest.TestCase):
+    """
+    Test the test history
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_history_out")
+        renew_path(self.output_path)
+        self.file_name = join(self.output_path, "test_history.json")
+
+    def tearDown(self):
+        rmtree(self.output_path)
+
+    def test_save_and_load(self):
+        history = TestHistory()
+        history.add_runtime("lib.tb1", 10.0)
+        history.save(self.file_name)
+        self.assertEqual(TestHistory.load(self.file_name).runtime("lib.tb1"), 10.0)
+        self.assertEqual(TestHistory.load(self.file_name).runtime("lib.tb2"), None)
+
+    def test_load_missing_or_corrupt(self):
+        self.assertEqual(TestHistory.load(self.file_name).runtime("lib.tb1"), None)
+        write_file(self.file_name, "{corrupt")
+        self.assertEqual(TestHistory.load(self.file_name).runtime("lib.tb1"), None)
+        write_file(self.file_name, '{"format": -1, "test_suites": {"lib.tb1": {"runtime": 1.0}}}')
+        self.assertEqual(TestHistory.load(self.file_name).runtime("lib.tb1"), None)
+
+    def test_runtime_is_smoothed(self):
+        history = TestHistory()
+        history.add_runtime("lib.tb1", 10.0)
+        history.add_runtime("lib.tb1", 20.0)
+        self.assertEqual(history.runtime("lib.tb1"), 15.0)
+
+    def test_expected_runtimes_default_to_median(self):
+        history = TestHistory()
+        history.add_runtime("lib.tb1", 1.0)
+        history.add_runtime("lib.tb2", 5.0)
+        history.add_runtime("lib.tb3", 100.0)
+        self.assertEqual(history.expected_runtimes(["lib.tb1", "lib.new", "lib.tb3"]),
+                         [1.0, 100.0, 100.0])
+        self.assertEqual(history.expected_runtimes(["lib.tb1", "lib.new", "lib.tb2", "lib.tb3"]),
+                         [1.0, 5.0, 5.0, 100.0])
+        self.assertEqual(TestHistory().expected_runtimes(["lib.new"]), [0.0])
+
+    def test_max_rss_decreases_gradually(self):
+        history = TestHistory()
+        self.assertEqual(history.max_rss("lib.tb1"), None)
+        history.add_max_rss("lib.tb1", 1000)
+        history.add_max_rss("lib.tb1", 2000)
+        self.assertEqual(history.max_rss("lib.tb1"), 2000)
+        history.add_max_rss("lib.tb1", 1000)
+        self.assertEqual(history.max_rss("lib.tb1"), 1500)
+        history.add_max_rss("lib.tb2", 100)
+        history.add_max_rss("lib.tb3", 300)
+        self.assertEqual(history.expected_max_rss(["lib.tb1", "lib.tb2", "lib.tb3", "lib.tb4"]),
+                         [1500, 100, 300, 300])
+
+    def test_flip_rate(self):
+        history = TestHistory()
+        self.assertEqual(history.flip_rate("lib.tb1"), None)
+        history.add_outcome("lib.tb1", False)
+        self.assertEqual(history.flip_rate("lib.tb1"), None)
+        history.add_outcome("lib.tb1", True)
+        history.add_outcome("lib.tb1", True)
+        self.assertEqual(history.attempts("lib.tb1"), 3)
+        self.assertEqual(history.flip_rate("lib.tb1"), 0.5)
+
+    def test_longest_first(self):
+        history = TestHistory()
+        history.add_runtime("short", 1.0)
+        history.add_runtime("medium", 5.0)
+        history.add_runtime("long", 40.0)
+        test_suites = [TestSuiteStub(name) for name in ["short", "new", "long", "medium"]]
+        self.assertEqual([test_suite.name for test_suite in longest_first(test_suites, history)],
+                         ["long", "new", "medium", "short"])
+
+    def test_merge_keeps_most_run_entry(self):
+        base = TestHistory()
+        base.add_runtime("lib.tb1", 1.0)
+        base.add_runtime("lib.tb2", 2.0)
+        base.save(self.file_name)
+
+        shard1 = TestHistory.load(self.file_name)
+        shard1.add_runtime("lib.tb1", 3.0)
+        shard2 = TestHistory.load(self.file_name)
+        shard2.add_runtime("lib.tb2", 4.0)
+        shard2.add_runtime("lib.tb3", 5.0)
+
+        merged = TestHistory()
+        for history in [shard1, shard2]:
+            merged.merge(history)
+        self.assertEqual(merged.runtime("lib.tb1"), 2.0)
+        self.assertEqual(merged.runtime("lib.tb2"), 3.0)
+        self.assertEqual(merged.runtime("lib.tb3"), 5.0)
+
+    def test_assign_shards_balances_runtime(self):
+        history = TestHistory()
+        runtimes = [40.0, 30.0, 20.0, 10.0, 10.0, 5.0, 5.0]
+        names = ["lib.tb%i" % idx for idx in range(len(runtimes))]
+        for name, runtime in zip(names, runtimes):
+            history.add_runtime(name, runtime)
+
+        shards = assign_shards(names, history, 2)
+        loads = [sum(runtime for runtime, shard in zip(runtimes, shards) if shard == idx) for idx in range(2)]
+        self.assertEqual(loads, [60.0, 60.0])
+
+        # Independent of order
+        self.assertEqual(assign_shards(list(reversed(names)), history, 2), list(reversed(shards)))
+
+    def test_assign_shards_without_history_is_stable(self):
+        names = ["lib.tb%i" % idx for idx in range(100)]
+        shards = assign_shards(names, TestHistory(), 3)
+        self.assertEqual(set(shards), set([0, 1, 2]))
+        self.assertEqual(assign_shards(names[50:], TestHistory(), 3), shards[50:])
+
+    def test_assign_shards_covers_all_test_suites_once(self):
+        history = TestHistory()
+        history.add_runtime("lib.tb1", 10.0)
+        names = ["lib.tb%i" % idx for idx in range(20)]
+        shards = assign_shards(names, history, 4)
+        self.assertTrue(all(shard in range(4) for shard in shards))
+        self.assertEqual(len(shards), len(names))
+
+
+class TestSuiteStub(object):  # pylint: disable=too-few-public-methods
+    """
+    A test suite with a name
+    """
+    def __init__(self, name):
+        self.name = name
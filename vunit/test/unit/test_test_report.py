@@ -12,7 +12,10 @@ from unittest import TestCase
 from xml.etree import ElementTree
 from os.path import join, dirname
 import os
-from vunit.test_report import TestReport, PASSED, SKIPPED, FAILED
+import json
+from vunit.test_report import TestReport, JUnitXmlWriter, PASSED, SKIPPED, FAILED, TIMEOUT
+from vunit.ostools import ResourceUsage
+from vunit.test.mock_2or3 import mock
 
 
 class TestTestReport(TestCase):
@@ -58,6 +61,30 @@ Elapsed time was 1.0 seconds
         self.assertRaises(KeyError,
                           report.result_of, "invalid_test")
 
+    def test_report_with_cached_tests(self):
+        report = TestReport(printer=self.printer)
+        report.add_result("passed_test0", PASSED, time=1.0, output_file_name=self.output_file_name)
+        report.add_result("cached_test1", PASSED, time=0.0, output_file_name=self.output_file_name, cached=True)
+        report.set_expected_num_tests(2)
+        report.set_real_total_time(1.0)
+        self.assertEqual(self.report_to_str(report), """\
+==== Summary ========================
+{gi}pass{x} passed_test0 (1.0 seconds)
+{gi}pass{x} cached_test1 (cached)
+=====================================
+{gi}pass{x} 2 of 2 (1 cached)
+=====================================
+Total time was 1.0 seconds
+Elapsed time was 1.0 seconds
+=====================================
+{gi}All passed!{x}
+""")
+        self.assertTrue(report.all_ok())
+        root = ElementTree.fromstring(report.to_junit_xml_str())
+        properties = root.findall("testcase")[1].findall("properties/property")
+        self.assertEqual([(prop.attrib["name"], prop.attrib["value"]) for prop in properties],
+                         [("cached", "true")])
+
     def test_report_with_missing_tests(self):
         report = self._report_with_missing_tests()
         report.set_real_total_time(1.0)
@@ -197,6 +224,36 @@ Elapsed time was 3.0 seconds
         self.assert_has_test(root, "passed_test", time="1.0", status="passed")
         self.assert_has_test(root, "failed_test", time="3.0", status="failed")
 
+    def test_junit_xml_writer(self):
+        xml_file_name = join(dirname(__file__), "test_report_out", "report.xml")
+        writer = JUnitXmlWriter(xml_file_name)
+        report = TestReport(printer=self.printer, junit_xml_writer=writer)
+        report.add_result("lib.tb.passed_test", PASSED, time=1.0, output_file_name=self.output_file_name)
+        self.assertTrue(os.path.exists(xml_file_name + ".part"))
+        report.add_result("lib.tb.failed_test", FAILED, time=2.0, output_file_name=self.output_file_name)
+        report.add_result("lib.tb.skipped_test", SKIPPED, time=0.0, output_file_name=self.output_file_name)
+        writer.close()
+        self.assertFalse(os.path.exists(xml_file_name + ".part"))
+
+        root = ElementTree.parse(xml_file_name).getroot()
+        self.assertEqual(dict((name, root.attrib[name]) for name in ("name", "errors", "failures", "skipped", "tests")),
+                         {"name": "testsuite", "errors": "0", "failures": "1", "skipped": "1", "tests": "3"})
+        self.assertEqual([test.attrib["name"] for test in root.findall("testcase")],
+                         ["passed_test", "failed_test", "skipped_test"])
+        self.assertEqual([test.find("system-out") is not None for test in root.findall("testcase")],
+                         [False, True, False])
+        self.assertEqual(root.findall("testcase")[1].find("system-out").text, self.output_file_contents)
+
+    def test_junit_xml_writer_output(self):
+        xml_file_name = join(dirname(__file__), "test_report_out", "report.xml")
+        writer = JUnitXmlWriter(xml_file_name, output="all", max_output_size=4)
+        report = TestReport(printer=self.printer, junit_xml_writer=writer)
+        report.add_result("lib.tb.passed_test", PASSED, time=1.0, output_file_name=self.output_file_name)
+        writer.close()
+        root = ElementTree.parse(xml_file_name).getroot()
+        self.assertEqual(root.find("testcase").find("system-out").text,
+                         "*** Output truncated to the last 4 characters ***\n" + self.output_file_contents[-4:])
+
     def test_junit_report_with_testcase_classname(self):
         report = self._new_report()
         report.add_result("test", PASSED, time=1.0,
@@ -215,6 +272,105 @@ Elapsed time was 3.0 seconds
                                      ("lib.entity", "test"),
                                      ("lib.entity.config", "test")]))
 
+    def test_report_with_timeout(self):
+        report = self._new_report()
+        report.add_result("test", TIMEOUT, time=2.0, output_file_name=self.output_file_name)
+        report.set_expected_num_tests(1)
+        self.assertTrue(report.result_of("test").failed)
+        self.assertTrue(report.result_of("test").timed_out)
+        self.assertFalse(report.all_ok())
+
+        self.printer.reset()
+        report.print_str()
+        self.assertIn("{ri}fail{x} test (2.0 seconds, timeout)\n", self.printer.report_str)
+        self.assertIn("{ri}fail{x} 1 of 1\n", self.printer.report_str)
+
+        root = ElementTree.fromstring(report.to_junit_xml_str())
+        self.assertEqual(root.attrib["failures"], "1")
+        self.assertEqual(root.find("testcase").find("failure").attrib["message"], "Timeout")
+
+    def test_report_with_flaky_tests(self):
+        report = TestReport(printer=self.printer)
+        report.add_result("passed_test0", PASSED, time=1.0, output_file_name=self.output_file_name)
+        report.add_result("flaky_test1", PASSED, time=2.0, output_file_name=self.output_file_name,
+                          attempts=3, flaky=True)
+        report.set_expected_num_tests(2)
+        report.set_real_total_time(3.0)
+        self.assertEqual(self.report_to_str(report), """\
+==== Summary ========================
+{gi}pass{x} passed_test0 (1.0 seconds)
+{gi}pass{x} flaky_test1  (2.0 seconds, flaky after 3 attempts)
+=====================================
+{gi}pass{x} 2 of 2
+{rgi}flaky{x} 1 of 2
+=====================================
+Total time was 3.0 seconds
+Elapsed time was 3.0 seconds
+=====================================
+{rgi}Flaky tests which passed after failing:
+{x}flaky_test1 (3 attempts)
+=====================================
+{gi}All passed!{x}
+""")
+        self.assertTrue(report.all_ok())
+        root = ElementTree.fromstring(report.to_junit_xml_str())
+        properties = root.findall("testcase")[1].findall("properties/property")
+        self.assertEqual([(prop.attrib["name"], prop.attrib["value"]) for prop in properties],
+                         [("attempts", "3"), ("flaky", "true")])
+        data = json.loads(report.to_json_str())
+        self.assertEqual([(test["attempts"], test["flaky"]) for test in data["tests"]], [(1, False), (3, True)])
+
+    def test_print_latest_status(self):
+        report = TestReport(printer=self.printer)
+        report.add_result("test0", PASSED, time=1.0, output_file_name=self.output_file_name)
+        report.add_result("test1", FAILED, time=2.0, output_file_name=self.output_file_name)
+        self.printer.reset()
+        report.print_latest_status(total_tests=3)
+        self.assertEqual(self.printer.report_str, "{ri}fail{x} (P=1 S=0 F=1 T=3) test1 (2.0 seconds)\n")
+
+        # A result added again replaces the earlier result
+        report.add_result("test1", PASSED, time=2.0, output_file_name=self.output_file_name)
+        self.printer.reset()
+        report.print_latest_status(total_tests=3)
+        self.assertEqual(self.printer.report_str, "{gi}pass{x} (P=2 S=0 F=0 T=3) test1 (2.0 seconds)\n")
+
+    def test_throttled_progress(self):
+        report = TestReport(printer=self.printer, progress_interval=10.0)
+        self.assertTrue(report.throttled)
+        self.printer.reset()
+        with mock.patch("vunit.test_report.get_time", side_effect=[0.0, 5.0, 11.0, 12.0]):
+            for idx in range(3):
+                report.add_result("test%i" % idx, PASSED, time=1.0, output_file_name=self.output_file_name)
+                report.print_latest_status(total_tests=5)
+            report.add_result("test3", FAILED, time=1.0, output_file_name=self.output_file_name)
+            report.print_latest_status(total_tests=5)
+            report.add_result("test4", SKIPPED, time=1.0, output_file_name=self.output_file_name)
+            report.print_latest_status(total_tests=5)
+        self.assertEqual(self.printer.report_str, """\
+{gi}progress{x} (P=3 S=0 F=0 T=5) 60% done
+{ri}fail{x} (P=3 S=0 F=1 T=5) test3 (1.0 seconds)
+{gi}progress{x} (P=3 S=1 F=1 T=5) 100% done
+""")
+
+    def test_resource_usage(self):
+        report = self._new_report()
+        report.add_result("test1", PASSED, time=1.0, output_file_name=self.output_file_name,
+                          resources=ResourceUsage(cpu_time=0.5, max_rss=2048, bytes_written=512))
+        report.add_result("test2", FAILED, time=2.0, output_file_name=self.output_file_name)
+        report.set_real_total_time(3.0)
+
+        root = ElementTree.fromstring(report.to_junit_xml_str())
+        test1, test2 = root.findall("testcase")
+        self.assertEqual([(prop.attrib["name"], prop.attrib["value"]) for prop in test1.find("properties")],
+                         [("cpu_time", "0.500"), ("max_rss", "2048"), ("bytes_written", "512")])
+        self.assertEqual(test2.find("properties"), None)
+
+        data = json.loads(report.to_json_str())
+        self.assertEqual(data["real_total_time"], 3.0)
+        self.assertEqual([(test["name"], test["status"], test["time"], test["resources"]) for test in data["tests"]],
+                         [("test1", "passed", 1.0, {"cpu_time": 0.5, "max_rss": 2048, "bytes_written": 512}),
+                          ("test2", "failed", 2.0, None)])
+
     def _report_with_all_passed_tests(self):
         " @returns A report with all passed tests "
         report = self._new_report()
@@ -12,12 +12,18 @@ Test the test runner
 from __future__ import print_function
 
 import unittest
+import os
+import sys
+import threading
+import time
 from os.path import join, dirname
 
-from vunit.test_runner import TestRunner, create_output_path
-from vunit.test_report import TestReport
+from vunit.test_runner import TestRunner, TestScheduler, WorkerProcess, TestCaseMonitor, create_output_path
+from vunit.test_history import TestHistory
+from vunit.test_report import TestReport, PASSED
+from vunit.distributed import Coordinator, connect, serve
 from vunit.test_list import TestList
-from vunit.ostools import renew_path
+from vunit.ostools import renew_path, Process
 from vunit.test.mock_2or3 import mock
 
 
@@ -73,6 +79,311 @@ class TestTestRunner(unittest.TestCase):
         self.assertTrue(self.report.result_of("test").passed)
         self.assertEqual(self.report.result_of("test").output, output)
 
+    @unittest.skipUnless(WorkerProcess.is_supported(), "Requires fork")
+    def test_process_backend(self):
+        runner = TestRunner(self.report, self.output_path, num_threads=2, backend="process")
+        test_list = TestList()
+        test_list.add_test(self.create_test("test1", True))
+        test_list.add_test(self.create_test("test2", False))
+
+        def side_effect(*args, **kwargs):  # pylint: disable=unused-argument
+            print("pid=%i" % os.getpid())
+            return True
+
+        test_case3 = self.create_test("test3", True)
+        test_case3.run.side_effect = side_effect
+        test_list.add_test(test_case3)
+
+        test_case4 = self.create_test("test4", True)
+        test_case4.run.side_effect = KeyError
+        test_list.add_test(test_case4)
+
+        runner.run(test_list)
+        self.assertTrue(self.report.result_of("test1").passed)
+        self.assertTrue(self.report.result_of("test2").failed)
+        self.assertTrue(self.report.result_of("test3").passed)
+        self.assertTrue(self.report.result_of("test4").failed)
+        self.assertNotEqual(self.report.result_of("test3").output, "pid=%i\n" % os.getpid())
+        self.assertTrue(self.report.result_of("test3").output.startswith("pid="))
+
+    @unittest.skipUnless(WorkerProcess.is_supported(), "Requires fork")
+    def test_process_backend_restarts_dead_worker(self):
+        runner = TestRunner(self.report, self.output_path, backend="process")
+        test_list = TestList()
+        test_case1 = self.create_test("test1", True)
+        test_case1.run.side_effect = lambda *args, **kwargs: os._exit(1)  # pylint: disable=protected-access
+        test_list.add_test(test_case1)
+        test_list.add_test(self.create_test("test2", True))
+        runner.run(test_list)
+        self.assertTrue(self.report.result_of("test1").failed)
+        self.assertTrue(self.report.result_of("test2").passed)
+
+    @unittest.skipUnless(hasattr(os, "wait4"), "Requires wait4")
+    def test_records_resource_usage_of_simulator_processes(self):
+        for backend in ["thread", "process"] if WorkerProcess.is_supported() else ["thread"]:
+            report = TestReport()
+            runner = TestRunner(report, self.output_path, backend=backend)
+            test_case = self.create_test("test", True)
+
+            def side_effect(*args, **kwargs):  # pylint: disable=unused-argument
+                process = Process([sys.executable, "-c", "data = bytearray(32 * 1024 * 1024)"])
+                process.consume_output(None)
+                return True
+
+            test_case.run.side_effect = side_effect
+            test_list = TestList()
+            test_list.add_test(test_case)
+            runner.run(test_list)
+            self.assertGreater(report.result_of("test").resources.max_rss, 32 * 1024 * 1024)
+            self.assertGreater(report.result_of("test").resources.cpu_time, 0.0)
+
+    def test_timeout_kills_simulator_process(self):
+        for backend in ["thread", "process"] if WorkerProcess.is_supported() else ["thread"]:
+            report = TestReport()
+            runner = TestRunner(report, self.output_path, backend=backend, timeout=60.0)
+            test_case1 = self.create_test("test1", True)
+            test_case1.config.sim_options["timeout"] = 0.5
+
+            def side_effect(*args, **kwargs):  # pylint: disable=unused-argument
+                process = Process([sys.executable, "-c", "import time; time.sleep(60)"])
+                process.consume_output(None)
+                return True
+
+            test_case1.run.side_effect = side_effect
+            test_list = TestList()
+            test_list.add_test(test_case1)
+            test_list.add_test(self.create_test("test2", True))
+            runner.run(test_list)
+            self.assertTrue(report.result_of("test1").timed_out)
+            self.assertTrue(report.result_of("test1").failed)
+            self.assertIn("timed out after 0.5 seconds", report.result_of("test1").output)
+            self.assertLess(report.result_of("test1").time, 30.0)
+            self.assertTrue(report.result_of("test2").passed)
+
+    @unittest.skipUnless(WorkerProcess.is_supported(), "Requires fork")
+    def test_timeout_restarts_stuck_worker_process(self):
+        runner = TestRunner(self.report, self.output_path, backend="process", timeout=0.1)
+        test_list = TestList()
+        test_case1 = self.create_test("test1", True)
+        test_case1.run.side_effect = lambda *args, **kwargs: time.sleep(60)
+        test_list.add_test(test_case1)
+        test_list.add_test(self.create_test("test2", True))
+        with mock.patch.object(WorkerProcess, "_TIMEOUT_GRACE", 0.1):
+            runner.run(test_list)
+        self.assertTrue(self.report.result_of("test1").timed_out)
+        self.assertTrue(self.report.result_of("test2").passed)
+
+    def test_records_runtimes_in_test_history(self):
+        test_history = TestHistory()
+        runner = TestRunner(self.report, self.output_path, test_history=test_history)
+        test_list = TestList()
+        test_list.add_test(self.create_test("test1", True))
+        test_list.add_test(self.create_test("test2", False))
+        with mock.patch("vunit.ostools.get_time", side_effect=[0.0, 3.0, 3.0, 4.0]):
+            runner.run(test_list)
+        self.assertEqual(test_history.runtime("test1"), 3.0)
+        self.assertEqual(test_history.runtime("test2"), 1.0)
+
+    def test_retries_failed_test_suite_after_the_others(self):
+        test_history = TestHistory()
+        runner = TestRunner(self.report, self.output_path, test_history=test_history, retries=2)
+        test_list = TestList()
+        test_case1 = self.create_test("test1", True)
+        outcomes = [False, True]
+
+        def run_side_effect(*args, **kwargs):  # pylint: disable=unused-argument
+            self._tests.append("test1")
+            return outcomes.pop(0)
+
+        test_case1.run.side_effect = run_side_effect
+        test_list.add_test(test_case1)
+        test_list.add_test(self.create_test("test2", True))
+        runner.run(test_list)
+        self.assertEqual(self._tests, ["test1", "test2", "test1"])
+        self.assertTrue(self.report.result_of("test1").passed)
+        self.assertTrue(self.report.result_of("test1").flaky)
+        self.assertEqual(self.report.result_of("test1").attempts, 2)
+        self.assertFalse(self.report.result_of("test2").flaky)
+        self.assertEqual(test_history.attempts("test1"), 2)
+        self.assertEqual(test_history.flip_rate("test1"), 1.0)
+        self.assertEqual(test_history.flip_rate("test2"), None)
+
+    def test_retries_failed_test_suite_at_most_retries_times(self):
+        runner = TestRunner(self.report, self.output_path, retries=1)
+        test_list = TestList()
+        test_list.add_test(self.create_test("test1", False))
+        runner.run(test_list)
+        self.assertEqual(self._tests, ["test1", "test1"])
+        self.assertTrue(self.report.result_of("test1").failed)
+        self.assertFalse(self.report.result_of("test1").flaky)
+        self.assertEqual(self.report.result_of("test1").attempts, 2)
+
+    def test_scheduler_releases_test_suite_before_retry(self):
+        admission = mock.Mock()
+        admission.try_admit.return_value = True
+        test_suite = mock.Mock()
+        scheduler = TestScheduler([test_suite], admission)
+        self.assertIs(scheduler.next(), test_suite)
+        scheduler.test_done(test_suite, retry=True)
+        self.assertFalse(scheduler.is_finished())
+        self.assertEqual(admission.mock_calls[-1], mock.call.release(test_suite))
+        self.assertIs(scheduler.next(), test_suite)
+        scheduler.test_done(test_suite)
+        self.assertTrue(scheduler.is_finished())
+        self.assertEqual(admission.release.call_count, 2)
+
+    def test_prints_output_tail_of_failed_test(self):
+        runner = TestRunner(self.report, self.output_path, output_tail=2)
+        test_list = TestList()
+        test_case = self.create_test("test", False)
+        test_case.run.side_effect = lambda *args, **kwargs: print("line1\nline2\nline3") or False
+        test_list.add_test(test_case)
+        output = []
+        with mock.patch.object(runner, "_stdout") as stdout:
+            stdout.write.side_effect = output.append
+            runner.run(test_list)
+        output_file_name = join(create_output_path(self.output_path, "test"), "output.txt")
+        self.assertIn("... 1 lines omitted, see %s\nline2\nline3\n" % output_file_name, "".join(output))
+        self.assertEqual(self.report.result_of("test").output, "line1\nline2\nline3\n")
+
+    def test_compressed_output(self):
+        runner = TestRunner(self.report, self.output_path, compress_output=True)
+        test_list = TestList()
+        test_case = self.create_test("test", True)
+        test_case.run.side_effect = lambda *args, **kwargs: print("output") or True
+        test_list.add_test(test_case)
+        runner.run(test_list)
+        output_path = create_output_path(self.output_path, "test")
+        self.assertTrue(os.path.exists(join(output_path, "output.txt.gz")))
+        self.assertEqual(self.report.result_of("test").output, "output\n")
+
+    def test_moves_old_output_to_the_trash(self):
+        output_path = create_output_path(self.output_path, "test")
+        os.makedirs(output_path)
+        with open(join(output_path, "stale.txt"), "w") as fptr:
+            fptr.write("stale")
+
+        test_case = self.create_test("test", True)
+        test_case.run.side_effect = lambda *args, **kwargs: self.assertFalse(
+            os.path.exists(join(output_path, "stale.txt"))) or True
+        test_list = TestList()
+        test_list.add_test(test_case)
+        with mock.patch("vunit.test_runner.ostools.renew_path") as renew:
+            self.runner.run(test_list)
+        self.assertFalse(renew.called)
+        self.assertTrue(self.report.result_of("test").passed)
+        # Deleted before run returns
+        self.assertEqual(os.listdir(join(self.output_path, ".trash")), [])
+
+    def test_emits_events(self):
+        event_log = mock.Mock()
+        runner = TestRunner(self.report, self.output_path, event_log=event_log, retries=1)
+        test_list = TestList()
+        test_list.add_test(self.create_test("test1", True))
+        test_list.add_test(self.create_test("test2", False))
+        runner.run(test_list)
+        events = [(call[1][0], call[2].get("suite", call[2].get("test"))) for call in event_log.emit.mock_calls]
+        self.assertEqual(events, [("run_start", None),
+                                  ("suite_start", "test1"),
+                                  ("suite_end", "test1"),
+                                  ("test_result", "test1"),
+                                  ("suite_start", "test2"),
+                                  ("suite_end", "test2"),
+                                  ("suite_retry", "test2"),
+                                  ("suite_start", "test2"),
+                                  ("suite_end", "test2"),
+                                  ("test_result", "test2"),
+                                  ("run_end", None)])
+        test_result = event_log.emit.mock_calls[-2][2]
+        self.assertEqual((test_result["status"], test_result["attempts"], test_result["output_file_name"]),
+                         ("failed", 2, join(create_output_path(self.output_path, "test2"), "output.txt")))
+
+    def test_measures_test_cases_running_in_the_same_simulation(self):
+        event_log = mock.Mock()
+        runner = TestRunner(self.report, self.output_path, event_log=event_log)
+        test_suite = mock.Mock(spec_set=TestSuiteMockSpec)
+        test_suite.configure_mock(name="lib.tb", test_cases=["lib.tb.a", "lib.tb.b"])
+        test_suite.configure_mock(**{"config.sim_options": {}})
+
+        def run_side_effect(output_path):
+            """
+            Write vunit_results like the VHDL test runner while running
+            """
+            with open(join(output_path, "vunit_results"), "w") as fptr:
+                fptr.write("test_start:a\n")
+                fptr.flush()
+                time.sleep(0.5)
+                fptr.write("test_start:b\n")
+                fptr.flush()
+                time.sleep(0.2)
+            return {"lib.tb.a": PASSED, "lib.tb.b": PASSED}
+
+        test_suite.run.side_effect = run_side_effect
+        test_list = TestList()
+        test_list.add_suite(test_suite)
+        with mock.patch.object(TestCaseMonitor, "_POLL_INTERVAL", 0.02):
+            runner.run(test_list)
+
+        self.assertGreater(self.report.result_of("lib.tb.a").time, 0.4)
+        self.assertLess(self.report.result_of("lib.tb.b").time, 0.4)
+        events = [(call[1][0], call[2].get("test")) for call in event_log.emit.mock_calls
+                  if call[1][0] in ("test_start", "test_end")]
+        self.assertEqual(events, [("test_start", "lib.tb.a"),
+                                  ("test_end", "lib.tb.a"),
+                                  ("test_start", "lib.tb.b"),
+                                  ("test_end", "lib.tb.b")])
+
+    def test_runs_longest_test_suites_first_in_parallel(self):
+        test_history = TestHistory()
+        test_history.add_runtime("test1", 1.0)
+        test_history.add_runtime("test2", 10.0)
+        test_list = TestList()
+        test_list.add_test(self.create_test("test1", True))
+        test_list.add_test(self.create_test("test2", True))
+
+        for num_threads, expected in [(1, ["test1", "test2"]), (2, ["test2", "test1"])]:
+            runner = TestRunner(self.report, self.output_path, num_threads=num_threads, test_history=test_history)
+            with mock.patch("vunit.test_runner.TestScheduler", wraps=TestScheduler) as scheduler:
+                runner.run(test_list)
+            self.assertEqual([test_suite.name for test_suite in scheduler.call_args[0][0]], expected)
+
+    def test_coordinator_runs_test_suites_on_remote_workers(self):
+        coordinator = Coordinator(("localhost", 0))
+        runner = TestRunner(self.report, self.output_path, coordinator=coordinator)
+        remote_done = threading.Event()
+
+        def run_remote(test_suite_name, output_stream):
+            output_stream.write("remote %s\n" % test_suite_name)
+            remote_done.set()
+            return {test_suite_name: PASSED}, None
+
+        worker = threading.Thread(target=serve, args=(connect(coordinator.address), run_remote))
+
+        def run_local(*args, **kwargs):  # pylint: disable=unused-argument
+            """
+            Connect the remote worker once the local thread runs the first test suite
+            and keep it busy until the remote worker has run the other test suite
+            """
+            worker.start()
+            return remote_done.wait(10.0)
+
+        test_list = TestList()
+        test_case1 = self.create_test("test1", True)
+        test_case1.run.side_effect = run_local
+        test_list.add_test(test_case1)
+        test_list.add_test(self.create_test("test2", False))
+        try:
+            runner.run(test_list)
+        finally:
+            coordinator.close()
+            if worker.ident is not None:
+                worker.join()
+
+        self.assertTrue(self.report.result_of("test1").passed)
+        self.assertTrue(self.report.result_of("test2").passed)
+        self.assertEqual(self.report.result_of("test2").output, "remote test2\n")
+        self.assertEqual(self._tests, [])
+
     def create_test(self, name, passed):
         """
         Utility function to create a mocked test with name
@@ -80,6 +391,7 @@ class TestTestRunner(unittest.TestCase):
         """
         test_case = mock.Mock(spec_set=TestCaseMockSpec)
         test_case.configure_mock(name=name)
+        test_case.configure_mock(**{"config.sim_options": {}})
 
         def run_side_effect(*args, **kwargs):  # pylint: disable=unused-argument
             """
@@ -92,9 +404,20 @@ class TestTestRunner(unittest.TestCase):
         return test_case
 
 
+class TestSuiteMockSpec(object):  # pylint: disable=no-init
+    """
+    A test suite mock specification class
+    """
+    name = None
+    test_cases = None
+    config = None
+    run = None
+
+
 class TestCaseMockSpec(object):  # pylint: disable=no-init
     """
     A test case mock specification class
     """
     name = None
+    config = None
     run = None
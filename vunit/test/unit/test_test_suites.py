@@ -9,7 +9,9 @@ Test the test suites
 """
 
 from unittest import TestCase
-from vunit.test_suites import call_pre_config
+from os.path import join, dirname
+from vunit.test_suites import call_pre_config, TestCaseFollower
+from vunit.ostools import renew_path
 
 
 class TestTestSuites(TestCase):
@@ -48,3 +50,37 @@ class TestTestSuites(TestCase):
             raise WasHere
 
         self.assertRaises(WasHere, call_pre_config, pre_config, "output_path")
+
+    def test_test_case_follower(self):
+        output_path = join(dirname(__file__), "test_test_suites_out")
+        renew_path(output_path)
+        file_name = join(output_path, "vunit_results")
+        follower = TestCaseFollower(file_name, "lib.tb")
+        self.assertEqual(follower.poll(), [])
+
+        with open(file_name, "w") as fptr:
+            fptr.write("test_start:a\ntest_start:")
+            fptr.flush()
+            self.assertEqual(follower.poll(), ["lib.tb.a"])
+            fptr.write("b\ntest_suite_done\n")
+            fptr.flush()
+            self.assertEqual(follower.poll(), ["lib.tb.b"])
+            self.assertEqual(follower.poll(), [])
+
+        with open(file_name, "w") as fptr:
+            fptr.write("test_start:\n")
+        self.assertEqual(follower.poll(), ["lib.tb"])
+
+    def test_test_case_follower_crlf(self):
+        output_path = join(dirname(__file__), "test_test_suites_out")
+        renew_path(output_path)
+        file_name = join(output_path, "vunit_results")
+        follower = TestCaseFollower(file_name, "lib.tb")
+
+        with open(file_name, "wb") as fptr:
+            fptr.write(b"test_start:a\r")
+            fptr.flush()
+            self.assertEqual(follower.poll(), [])
+            fptr.write(b"\ntest_start:b\r\n")
+            fptr.flush()
+            self.assertEqual(follower.poll(), ["lib.tb.a", "lib.tb.b"])
@@ -0,0 +1,51 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Test the trash
+"""
+
+import unittest
+import os
+from os.path import join, dirname, exists
+from vunit.trash import Trash, get_trash
+from vunit.ostools import renew_path, write_file
+
+
+class TestTrash(unittest.TestCase):
+    """
+    Test the trash
+    """
+
+    def setUp(self):
+        self.output_path = join(dirname(__file__), "test_trash_out")
+        renew_path(self.output_path)
+        self.trash_path = join(self.output_path, ".trash")
+        self.trash = Trash(self.trash_path)
+
+    def test_discard(self):
+        directory = join(self.output_path, "dir")
+        write_file(join(directory, "sub", "file.txt"), "data")
+        self.assertTrue(self.trash.discard(directory))
+        self.assertFalse(exists(directory))
+        self.trash.wait()
+        self.assertEqual(os.listdir(self.trash_path), [])
+
+    def test_discard_missing_directory(self):
+        self.assertFalse(self.trash.discard(join(self.output_path, "missing")))
+        self.trash.wait()
+        self.assertEqual(os.listdir(self.trash_path), [])
+
+    def test_purge_leftovers(self):
+        write_file(join(self.trash_path, "tmp1", "discarded", "file.txt"), "data")
+        write_file(join(self.trash_path, "tmp2", "file.txt"), "data")
+        self.trash.purge_leftovers()
+        self.trash.wait()
+        self.assertEqual(os.listdir(self.trash_path), [])
+
+    def test_get_trash_is_shared(self):
+        self.assertIs(get_trash(self.trash_path), get_trash(join(self.trash_path, "..", ".trash")))
+        self.assertIsNot(get_trash(self.trash_path), get_trash(join(self.output_path, "other")))
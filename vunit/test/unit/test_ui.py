@@ -21,7 +21,7 @@ from vunit.ui import VUnit
 from vunit.project import VHDL_EXTENSIONS, VERILOG_EXTENSIONS
 from vunit.test.mock_2or3 import mock
 from vunit.test.common import set_env
-from vunit.ostools import renew_path
+from vunit.ostools import renew_path, write_file
 from vunit.builtins import add_verilog_include_dir
 from vunit.simulator_interface import SimulatorInterface
 
@@ -221,6 +221,126 @@ end architecture;
         self.assertEqual([test.name for test in lib.test_bench("tb_ent2").get_tests()],
                          [])
 
+    def test_shard(self):
+        for idx in range(4):
+            self.create_file('tb_ent%i.vhd' % idx, '''
+entity tb_ent%i is
+  generic (runner_cfg : string);
+end entity;
+
+architecture a of tb_ent%i is
+begin
+  main : process
+  begin
+    if run("test1") then
+    elsif run("test2") then
+    end if;
+  end process;
+end architecture;
+        ''' % (idx, idx))
+        self.create_file('other.vhd')
+
+        all_names = set()
+        for shard in ["1/2", "2/2"]:
+            ui = self._create_ui("--list", "--shard", shard)
+            lib = ui.add_library("lib")
+            lib.add_source_files("tb_ent*.vhd")
+            with mock.patch("sys.stdout", autospec=True) as stdout:
+                self._run_main(ui)
+            text = "".join([call[1][0] for call in stdout.write.mock_calls])
+            test_names = set(text.splitlines()[:-1])
+            self.assertEqual(test_names & all_names, set())
+            all_names |= test_names
+        self.assertEqual(len(all_names), 8)
+
+        ui = self._create_ui("--shard", "1/1")
+        lib = ui.add_library("lib")
+        lib.add_source_files("tb_ent*.vhd")
+        lib.add_source_file("other.vhd")
+        with mock.patch("sys.stdout", autospec=True):
+            self._run_main(ui, code=1)
+        simulator_if = ui._simulator_factory.create()  # pylint: disable=protected-access
+        target_files = simulator_if.compile_project.call_args[1]["target_files"]
+        self.assertEqual(sorted(basename(source_file.name) for source_file in target_files),
+                         ["tb_ent%i.vhd" % idx for idx in range(4)])
+
+    def test_parses_serially_by_default(self):
+        ui = self._create_ui()
+        self.assertEqual(ui._project._num_parse_processes, 1)  # pylint: disable=protected-access
+        ui = self._create_ui("--parse-processes", "4")
+        self.assertEqual(ui._project._num_parse_processes, 4)  # pylint: disable=protected-access
+
+    def test_admission_controller(self):
+        ui = self._create_ui()
+        self.assertEqual(ui._create_admission_controller(), None)  # pylint: disable=protected-access
+
+        with mock.patch("vunit.ui.cpu_count", return_value=3):
+            ui = self._create_ui("-p", "auto", "--license-limit", "2")
+        self.assertEqual(ui._num_threads, 3)  # pylint: disable=protected-access
+        with mock.patch("vunit.ui.available_memory", return_value=1000), \
+                mock.patch("vunit.ui.LicenseSemaphore") as license_semaphore, \
+                mock.patch("vunit.ui.AdmissionController") as admission_controller:
+            ui._create_admission_controller()  # pylint: disable=protected-access
+        license_semaphore.assert_called_once_with("mocksim", 2)
+        self.assertEqual(admission_controller.call_args[1]["memory_budget"], 1000)
+
+    def test_result_cache(self):
+        self.create_file('tb_ent.vhd', '''
+entity tb_ent is
+  generic (runner_cfg : string; value : integer := 0);
+end entity;
+
+architecture a of tb_ent is
+begin
+end architecture;
+        ''')
+
+        def run(value, *args, **kwargs):
+            """
+            Run tb_ent with the generic value and return the number of simulations
+            """
+            identity = kwargs.pop("identity", "mocksim /bin/vsim 1.0")
+            with mock.patch("vunit.ui.SimulatorFactory", new=MockSimulatorFactory):
+                ui = VUnit.from_argv(argv=["--output-path=%s" % self._output_path] + list(args),
+                                     compile_builtins=False)
+            lib = ui.add_library("lib")
+            lib.add_source_file("tb_ent.vhd")
+            lib.set_generic("value", value)
+
+            simulator_if = ui._simulator_factory.create()  # pylint: disable=protected-access
+            simulator_if.name = "mocksim"
+            simulator_if.identity.return_value = identity
+
+            def simulate(output_path, *args, **kwargs):  # pylint: disable=unused-argument
+                write_file(join(dirname(output_path), "vunit_results"), "test_suite_done\n")
+                return True
+            simulator_if.simulate.side_effect = simulate
+
+            with mock.patch("sys.stdout", autospec=True):
+                self._run_main(ui)
+            return simulator_if.simulate.call_count
+
+        self.assertEqual(run(1, "--clean"), 1)
+        self.assertFalse(exists(join(self._output_path, "result_cache.json")))
+        self.assertEqual(run(1, "--result-cache"), 1)
+        self.assertEqual(run(1, "--result-cache"), 0)
+        self.assertEqual(run(1), 1)
+        self.assertEqual(run(2, "--result-cache"), 1)
+        self.assertEqual(run(2, "--result-cache"), 0)
+        self.assertEqual(run(2, "--result-cache", identity="mocksim /bin/vsim 2.0"), 1)
+        self.assertEqual(run(2, "--result-cache", identity="mocksim /bin/vsim 2.0"), 0)
+
+        self.create_file('tb_ent.vhd', '''
+entity tb_ent is
+  generic (runner_cfg : string; value : integer := 0);
+end entity;
+
+architecture changed of tb_ent is
+begin
+end architecture;
+        ''')
+        self.assertEqual(run(2, "--result-cache"), 1)
+
     def test_add_source_files(self):
         files = ["file1.vhd",
                  "file2.vhd",
@@ -667,6 +787,45 @@ endmodule
         lib.add_source_file(tb_file_name)
         self.assertRaises(ValueError, lib.test_bench("tb_top").scan_tests_from_file, "missing.sv")
 
+    def test_worker_does_not_modify_output_path_of_coordinator(self):
+        ui = self._create_ui()
+        ui.add_library("lib")
+        ui.add_source_files(self.create_entity_file(), "lib")
+        ui._close_database()  # pylint: disable=protected-access
+        marker = join(self._preprocessed_path, "marker")
+        write_file(marker, "")
+        database_file_name = join(self._output_path, "project_database.log")
+        with open(database_file_name, "rb") as fptr:
+            database_contents = fptr.read()
+
+        with mock.patch("vunit.ui.SimulatorFactory", new=MockSimulatorFactory):
+            worker = VUnit.from_argv(argv=["--output-path=%s" % self._output_path, "--worker", "1234"],
+                                     compile_builtins=False)
+        worker.enable_location_preprocessing()
+        lib = worker.add_library("lib")
+        source_file = lib.add_source_file(self.create_entity_file(1))
+        worker._close_database()  # pylint: disable=protected-access
+
+        self.assertTrue(exists(marker))
+        self.assertEqual(abspath(source_file.name), abspath("ent1.vhd"))
+        with open(database_file_name, "rb") as fptr:
+            self.assertEqual(fptr.read(), database_contents)
+        self.assertTrue(exists(join(self._output_path, "worker_output", "project_database.log")))
+
+    def test_retries_argument(self):
+        self.assertEqual(self._create_ui()._retries, 0)  # pylint: disable=protected-access
+        self.assertEqual(self._create_ui("--retries", "0")._retries, 0)  # pylint: disable=protected-access
+        self.assertEqual(self._create_ui("--retries", "2")._retries, 2)  # pylint: disable=protected-access
+        with mock.patch("sys.stderr"):
+            self.assertRaises(SystemExit, self._create_ui, "--retries", "-1")
+
+    def test_event_log_is_closed_by_main(self):
+        ui = self._create_ui("--list", "--event-log", "events.jsonl")
+        event_log = ui._event_log  # pylint: disable=protected-access
+        with mock.patch.object(event_log, "close", wraps=event_log.close) as close:
+            self._run_main(ui, 0)
+        close.assert_called_once_with()
+
     def test_can_list_tests_without_simulator(self):
         with set_env(PATH=""):
             ui = self._create_ui("--list")
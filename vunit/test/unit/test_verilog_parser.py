@@ -12,6 +12,7 @@ from unittest import TestCase
 from os.path import join, dirname, exists
 import os
 import shutil
+import pickle
 from vunit.ostools import renew_path
 from vunit.parsing.verilog.parser import VerilogParser
 from vunit.test.mock_2or3 import mock
@@ -54,6 +55,21 @@ endmodule
         self.assertEqual(modules[1].name, "true2")
         self.assertEqual(modules[2].name, "true3")
 
+    def test_parse_test_cases_and_pragmas(self):
+        design_file = self.parse("""\
+// vunit_pragma fail_on_warning
+module tb_foo;
+`TEST_SUITE begin
+  `TEST_CASE("Test 1") begin
+  end
+  `TEST_CASE("Test 2") begin
+  end
+end
+endmodule
+""")
+        self.assertEqual(design_file.test_cases, ["Test 1", "Test 2"])
+        self.assertEqual(design_file.pragmas, ["fail_on_warning"])
+
     def test_parse_parameter_without_type(self):
         modules = self.parse("""\
 module foo;
@@ -216,6 +232,25 @@ endmodule
         new_result = self.parse(code, cache=cache)
         self.assertNotEqual(id(result), id(new_result))
 
+    def test_pickled_result_is_equal(self):
+        code = """\
+`include "missing.sv"
+module name #(parameter width = 8);
+  import pkg::*;
+  true1 instance_name1();
+endmodule
+package pkg2;
+endpackage
+"""
+        original = self.parse(code)
+        result = pickle.loads(pickle.dumps(original, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(result.modules[0].name, "name")
+        self.assertEqual(result.modules[0].parameters, ["width"])
+        self.assertEqual(result.packages[0].name, "pkg2")
+        self.assertEqual(result.imports, ["pkg"])
+        self.assertEqual(result.instances, original.instances)
+        self.assertEqual(result.included_files, original.included_files)
+
     def test_cached_parsing_updated_by_changing_file(self):
         code = """\
 module mod1;
@@ -305,6 +340,72 @@ endmodule;
         self.assertEqual(len(result.modules), 1)
         self.assertEqual(result.modules[0].name, "mod2")
 
+    def test_parse_many(self):
+        sources = []
+        for idx in range(3):
+            file_name = "file%i.sv" % idx
+            code = """\
+module mod%i;
+endmodule
+""" % idx
+            self.write_file(file_name, code)
+            sources.append((code, file_name, None, None))
+
+        for num_processes in (1, 2):
+            results = VerilogParser().parse_many(sources, num_processes=num_processes)
+            self.assertEqual([[module.name for module in result.modules] for result in results],
+                             [["mod0"], ["mod1"], ["mod2"]])
+
+    def test_parse_many_is_serial_without_fork(self):
+        code = """\
+module mod;
+endmodule
+"""
+        self.write_file("file.sv", code)
+        with mock.patch("vunit.parsing.verilog.parser._can_fork", return_value=False), \
+                mock.patch("vunit.parsing.verilog.parser.multiprocessing") as multiprocessing:
+            results = VerilogParser().parse_many([(code, "file.sv", None, None)] * 2, num_processes=2)
+        self.assertFalse(multiprocessing.get_context.called)
+        self.assertFalse(multiprocessing.Pool.called)
+        self.assertEqual([result.modules[0].name for result in results], ["mod", "mod"])
+
+    def test_parse_many_uses_and_updates_cache(self):
+        code = """\
+module mod;
+endmodule
+"""
+        self.write_file("file_name.sv", code)
+        cache = {}
+        result, = VerilogParser(database=cache).parse_many([(code, "file_name.sv", None, None)])
+        self.assertEqual(result.modules[0].name, "mod")
+
+        new_result, = VerilogParser(database=cache).parse_many([(code, "file_name.sv", None, None)])
+        self.assertEqual(id(result), id(new_result))
+
+    def test_parse_reuses_result_of_parse_many(self):
+        code = """\
+module mod;
+endmodule
+"""
+        self.write_file("file_name.sv", code)
+        parser = VerilogParser()
+        result, = parser.parse_many([(code, "file_name.sv", None, None)])
+        self.assertEqual(id(parser.parse(code, "file_name.sv")), id(result))
+        self.assertNotEqual(id(parser.parse(code, "file_name.sv")), id(result))
+
+    def test_parse_many_ignores_result_with_other_defines(self):
+        code = """\
+`ifdef foo
+module `foo;
+endmodule
+`endif
+"""
+        self.write_file("file_name.sv", code)
+        parser = VerilogParser()
+        parser.parse_many([(code, "file_name.sv", None, {"foo": "mod1"})])
+        result = parser.parse(code, "file_name.sv", defines={"foo": "mod2"})
+        self.assertEqual(result.modules[0].name, "mod2")
+
     def write_file(self, file_name, contents):
         """
         Write file with contents into output path
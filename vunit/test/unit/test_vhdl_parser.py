@@ -9,7 +9,11 @@ Test of the VHDL parser
 """
 
 from unittest import TestCase
-from vunit.vhdl_parser import (VHDLDesignFile,
+import pickle
+from vunit.test.mock_2or3 import mock
+from vunit.vhdl_design_file_summary import VHDLDesignFileSummary
+from vunit.vhdl_parser import (CachedVHDLParser,
+                               VHDLDesignFile,
                                VHDLInterfaceElement,
                                VHDLEntity,
                                VHDLSubtypeIndication,
@@ -29,6 +33,19 @@ class TestVHDLParser(TestCase):  # pylint: disable=too-many-public-methods
         self.assertEqual(design_file.packages, [])
         self.assertEqual(design_file.architectures, [])
 
+    def test_parsing_test_cases_and_pragmas(self):
+        design_file = VHDLDesignFile.parse("""\
+-- vunit_pragma run_all_in_same_sim
+architecture a of tb_ent is
+begin
+  if run("Test 1") then
+  -- elsif run("Commented") then
+  elsif run("Test 2") then
+end architecture;
+""")
+        self.assertEqual(design_file.test_cases, ["Test 1", "Test 2"])
+        self.assertEqual(design_file.pragmas, ["run_all_in_same_sim"])
+
     def test_parsing_simple_entity(self):
         entity = self.parse_single_entity("""\
 entity simple is
@@ -445,3 +462,90 @@ record
                             generics=[data_width],
                             ports=[clk, data])
         return entity
+
+
+class TestCachedVHDLParser(TestCase):
+    """
+    Test of the cached VHDL parser
+    """
+
+    code = """\
+entity ent is
+end entity;
+"""
+
+    def test_identical_content_at_other_path_is_parsed_once(self):
+        database = {}
+        parser = CachedVHDLParser(database=database)
+        with mock.patch("vunit.vhdl_parser.VHDLDesignFile.parse", wraps=VHDLDesignFile.parse) as parse:
+            design_file1 = parser.parse(self.code, "lib1/ent.vhd")
+            design_file2 = CachedVHDLParser(database=database).parse(self.code, "lib2/ent.vhd")
+            self.assertEqual(parse.call_count, 1)
+        self.assertEqual(design_file1.entities[0].identifier, "ent")
+        self.assertEqual(design_file2.entities[0].identifier, "ent")
+
+    def test_modified_content_is_parsed_again(self):
+        database = {}
+        CachedVHDLParser(database=database).parse(self.code, "ent.vhd")
+        design_file = CachedVHDLParser(database=database).parse(self.code.replace("ent is", "ent2 is"), "ent.vhd")
+        self.assertEqual(design_file.entities[0].identifier, "ent2")
+
+    def test_result_is_found_in_shared_database(self):
+        shared_database = {}
+        CachedVHDLParser(database=shared_database).parse(self.code, "shared/ent.vhd")
+
+        database = {}
+        parser = CachedVHDLParser(database=database, shared_database=shared_database)
+        with mock.patch("vunit.vhdl_parser.VHDLDesignFile.parse") as parse:
+            design_file = parser.parse(self.code, "ent.vhd")
+            self.assertFalse(parse.called)
+            design_file = CachedVHDLParser(database=database).parse(self.code, "ent.vhd")
+            self.assertFalse(parse.called)
+        self.assertEqual(design_file.entities[0].identifier, "ent")
+
+    def test_shared_database_is_not_modified(self):
+        shared_database = {}
+        CachedVHDLParser(database={}, shared_database=shared_database).parse(self.code, "ent.vhd")
+        self.assertEqual(shared_database, {})
+
+    def test_summary_is_pickled_compactly(self):
+        code = """\
+library lib;
+use lib.pkg.all;
+
+entity ent is
+  generic (width : natural := 8);
+  port (clk : in std_logic);
+end entity;
+
+architecture a of ent is
+begin
+  inst : entity lib.other;
+end architecture;
+"""
+        design_file = VHDLDesignFile.parse(code)
+        summary = VHDLDesignFileSummary.from_design_file(design_file)
+        data = pickle.dumps(summary, protocol=pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(data), len(pickle.dumps(design_file, protocol=pickle.HIGHEST_PROTOCOL)))
+
+        loaded = pickle.loads(data)
+        self.assertEqual(loaded.entities[0].identifier, "ent")
+        self.assertEqual(loaded.entities[0].generic_names, ["width"])
+        self.assertEqual(loaded.architectures[0].identifier, "a")
+        self.assertEqual(loaded.architectures[0].entity, "ent")
+        self.assertEqual(loaded.references, design_file.references)
+
+    def test_result_of_other_format_version_is_parsed_again(self):
+        database = {}
+        CachedVHDLParser(database=database).parse(self.code, "ent.vhd")
+        for key in database:
+            if isinstance(database[key], VHDLDesignFileSummary):
+                with mock.patch.object(VHDLDesignFileSummary, "_format_version", -1):
+                    data = pickle.dumps(database[key])
+                database[key] = pickle.loads(data)
+                self.assertEqual(database[key], None)
+
+        with mock.patch("vunit.vhdl_parser.VHDLDesignFile.parse", wraps=VHDLDesignFile.parse) as parse:
+            design_file = CachedVHDLParser(database=database).parse(self.code, "ent.vhd")
+            self.assertEqual(parse.call_count, 1)
+        self.assertEqual(design_file.entities[0].identifier, "ent")
@@ -10,11 +10,11 @@ Contains classes to represent a test bench and test cases
 
 import logging
 from os.path import basename
-import re
 from collections import OrderedDict
 import vunit.ostools as ostools
 from vunit.test_list import TestList
 from vunit.vhdl_parser import remove_comments
+from vunit.test_scanner import find_vhdl_test_cases, find_verilog_test_cases, find_pragmas
 from vunit.test_suites import IndependentSimTestCase, SameSimTestSuite
 from vunit.project import file_type_of
 from vunit.configuration import Configuration, ConfigurationVisitor, DEFAULT_NAME
@@ -41,15 +41,15 @@ class TestBench(ConfigurationVisitor):
             if len(design_unit.architecture_names) > 0:
                 self._add_architecture_callback()
         else:
-            self.scan_tests_from_file(design_unit.file_name)
+            self._scan_tests_from_source_file(design_unit.source_file)
 
     def _add_architecture_callback(self):
         """
         Called when architectures have been added
         """
         self._check_architectures(self.design_unit)
-        file_name = list(self.design_unit.architecture_names.values())[0]
-        self.scan_tests_from_file(file_name)
+        source_file = list(self.design_unit.architecture_source_files.values())[0]
+        self._scan_tests_from_source_file(source_file)
 
     @property
     def name(self):
@@ -154,6 +154,17 @@ class TestBench(ConfigurationVisitor):
             del configs[DEFAULT_NAME]
         return configs.values()
 
+    def _scan_tests_from_source_file(self, source_file):
+        """
+        Use the test cases and pragmas found when the source file was parsed
+        or scan the file when it was not parsed
+        """
+        if source_file.test_cases is None or source_file.pragmas is None:
+            self.scan_tests_from_file(source_file.name)
+        else:
+            self._set_tests(_check_test_cases(source_file.test_cases, source_file.name),
+                            _check_pragmas(source_file.pragmas, source_file.name))
+
     def scan_tests_from_file(self, file_name):
         """
         Scan file for test cases and pragmas
@@ -162,8 +173,13 @@ class TestBench(ConfigurationVisitor):
             raise ValueError("File %r does not exist" % file_name)
 
         code = ostools.read_file(file_name)
-        pragmas = _find_pragmas(code, file_name)
+        self._set_tests(_find_test_cases(code, file_name),
+                        _find_pragmas(code, file_name))
 
+    def _set_tests(self, test_case_names, pragmas):
+        """
+        Create the default configuration and test cases from the test case names and pragmas
+        """
         default_config = Configuration(DEFAULT_NAME, self.design_unit)
 
         if "fail_on_warning" in pragmas:
@@ -171,7 +187,6 @@ class TestBench(ConfigurationVisitor):
 
         self._configs = OrderedDict({default_config.name: default_config})
 
-        test_case_names = _find_test_cases(code, file_name)
         self._individual_tests = "run_all_in_same_sim" not in pragmas and len(test_case_names) > 0
         self.test_cases = [TestCase(name,
                                     self.design_unit,
@@ -231,24 +246,23 @@ class TestCase(ConfigurationVisitor):
                     elaborate_only=elaborate_only))
 
 
-_RE_VHDL_TEST_CASE = re.compile(r'\s+run\("(.*?)"\)', re.IGNORECASE)
-_RE_VERILOG_TEST_CASE = re.compile(r'`TEST_CASE\("(.*?)"\)')
-
-
 def _find_test_cases(code, file_name):
     """
     Finds all if run("something") strings in file
     """
     is_verilog = file_type_of(file_name) == 'verilog'
     if is_verilog:
-        regexp = _RE_VERILOG_TEST_CASE
+        test_cases = find_verilog_test_cases(code)
     else:
-        code = remove_comments(code)
-        regexp = _RE_VHDL_TEST_CASE
+        test_cases = find_vhdl_test_cases(remove_comments(code))
+
+    return _check_test_cases(test_cases, file_name)
 
-    test_cases = [match.group(1)
-                  for match in regexp.finditer(code)]
 
+def _check_test_cases(test_cases, file_name):
+    """
+    Check that test case names are unique
+    """
     unique = set()
     not_unique = set()
     for test_case in test_cases:
@@ -265,22 +279,23 @@ def _find_test_cases(code, file_name):
     return test_cases
 
 
-_RE_PRAGMA = re.compile(r'vunit_pragma\s+([a-zA-Z0-9_]+)', re.IGNORECASE)
 _VALID_PRAGMAS = ["run_all_in_same_sim", "fail_on_warning"]
 
 
 def _find_pragmas(code, file_name):
     """
     Return a list of all vunit pragmas parsed from the code
+    """
+    return _check_pragmas(find_pragmas(code), file_name)
+
 
-    @TODO only look inside comments
+def _check_pragmas(pragmas, file_name):
+    """
+    Warn about invalid pragmas
     """
-    pragmas = []
-    for match in _RE_PRAGMA.finditer(code):
-        pragma = match.group(1)
+    for pragma in pragmas:
         if pragma not in _VALID_PRAGMAS:
             LOGGER.warning("Invalid pragma '%s' in %s",
                            pragma,
                            file_name)
-        pragmas.append(pragma)
     return pragmas
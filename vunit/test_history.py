@@ -0,0 +1,205 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Persistent history of test suite runtimes and peak memory used to schedule the longest
+test suites first, to split the test suites into shards of balanced runtime and to keep
+parallel test suites within a memory budget. The outcome of each attempt is also
+recorded to find flaky test suites.
+"""
+
+import json
+import logging
+from vunit.ostools import read_file, write_file, file_exists
+from vunit.hashing import hash_string
+LOGGER = logging.getLogger(__name__)
+
+HISTORY_FORMAT = 1
+
+
+class TestHistory(object):
+    """
+    The history of each test suite keyed by test suite name
+    """
+
+    # Weight of the latest runtime in the smoothed runtime
+    _RUNTIME_WEIGHT = 0.5
+
+    def __init__(self, test_suites=None):
+        self._test_suites = {} if test_suites is None else test_suites
+
+    @classmethod
+    def load(cls, file_name):
+        """
+        Load the history from file_name, returns an empty history if there is none
+        """
+        if not file_exists(file_name):
+            return cls()
+
+        try:
+            data = json.loads(read_file(file_name))
+            if data["format"] != HISTORY_FORMAT:
+                LOGGER.debug("Ignoring test history %s with different format", file_name)
+                return cls()
+            return cls(data["test_suites"])
+        except (ValueError, KeyError, TypeError):
+            LOGGER.warning("Ignoring corrupt test history %s", file_name)
+            return cls()
+
+    def save(self, file_name):
+        """
+        Save the history to file_name
+        """
+        write_file(file_name, json.dumps({"format": HISTORY_FORMAT,
+                                          "test_suites": self._test_suites},
+                                         indent=1, sort_keys=True))
+
+    def runtime(self, test_suite_name):
+        """
+        Return the smoothed runtime of the test suite or None if it has never been run
+        """
+        return self._test_suites.get(test_suite_name, {}).get("runtime")
+
+    def add_runtime(self, test_suite_name, runtime):
+        """
+        Add the runtime of a test suite run
+        """
+        entry = self._test_suites.setdefault(test_suite_name, {})
+        entry["runs"] = entry.get("runs", 0) + 1
+        old_runtime = entry.get("runtime")
+        if old_runtime is None:
+            entry["runtime"] = runtime
+        else:
+            entry["runtime"] = (self._RUNTIME_WEIGHT * runtime +
+                                (1.0 - self._RUNTIME_WEIGHT) * old_runtime)
+
+    def max_rss(self, test_suite_name):
+        """
+        Return the peak resident memory in bytes of the test suite or None if unknown
+        """
+        return self._test_suites.get(test_suite_name, {}).get("max_rss")
+
+    def add_max_rss(self, test_suite_name, max_rss):
+        """
+        Add the peak resident memory of a test suite run
+
+        A lower peak than before only lowers the remembered peak gradually.
+        """
+        entry = self._test_suites.setdefault(test_suite_name, {})
+        old_max_rss = entry.get("max_rss")
+        if old_max_rss is None:
+            entry["max_rss"] = max_rss
+        else:
+            entry["max_rss"] = max(max_rss, int(self._RUNTIME_WEIGHT * max_rss +
+                                                (1.0 - self._RUNTIME_WEIGHT) * old_max_rss))
+
+    def add_outcome(self, test_suite_name, passed):
+        """
+        Add the outcome of an attempt to run the test suite, including retries
+        """
+        entry = self._test_suites.setdefault(test_suite_name, {})
+        entry["attempts"] = entry.get("attempts", 0) + 1
+        last_passed = entry.get("last_passed")
+        if last_passed is not None and last_passed != passed:
+            entry["flips"] = entry.get("flips", 0) + 1
+        entry["last_passed"] = passed
+
+    def attempts(self, test_suite_name):
+        """
+        Return the number of attempts to run the test suite
+        """
+        return self._test_suites.get(test_suite_name, {}).get("attempts", 0)
+
+    def flip_rate(self, test_suite_name):
+        """
+        Return the fraction of consecutive attempts where the outcome changed
+        between pass and fail or None if there are less than two attempts
+        """
+        attempts = self.attempts(test_suite_name)
+        if attempts < 2:
+            return None
+        return self._test_suites[test_suite_name].get("flips", 0) / float(attempts - 1)
+
+    def merge(self, other):
+        """
+        Merge the other history into this one
+
+        The entry of the test suite which has been run the most times is kept
+        such that histories of shards started from the same history can be merged.
+        """
+        for name, entry in other._test_suites.items():  # pylint: disable=protected-access
+            if entry.get("runs", 0) > self._test_suites.get(name, {}).get("runs", 0):
+                self._test_suites[name] = entry
+
+    def expected_runtimes(self, test_suite_names):
+        """
+        Return the expected runtime of each test suite
+
+        Test suites without history are expected to take the median runtime
+        of the test suites with history.
+        """
+        return _with_median_default([self.runtime(name) for name in test_suite_names], 0.0)
+
+    def expected_max_rss(self, test_suite_names):
+        """
+        Return the expected peak resident memory of each test suite
+
+        Test suites without history are expected to use the median memory
+        of the test suites with history.
+        """
+        return _with_median_default([self.max_rss(name) for name in test_suite_names], 0)
+
+
+def _with_median_default(values, default):
+    """
+    Replace None values with the median of the other values or the default if there are none
+    """
+    known = sorted(value for value in values if value is not None)
+    if known:
+        default = known[len(known) // 2]
+    return [default if value is None else value for value in values]
+
+
+def longest_first(test_suites, test_history):
+    """
+    Return the test suites ordered by decreasing expected runtime
+
+    Running the longest test suites first keeps the wall time close to the
+    optimum when running in parallel. Test suites with equal expected
+    runtime keep their relative order.
+    """
+    expected = test_history.expected_runtimes([test_suite.name for test_suite in test_suites])
+    order = sorted(range(len(test_suites)), key=lambda idx: -expected[idx])
+    return [test_suites[idx] for idx in order]
+
+
+def assign_shards(test_suite_names, test_history, num_shards):
+    """
+    Return the shard index of each test suite such that the shards have balanced expected runtime
+
+    Test suites without history are assigned by a hash of their name such
+    that the assignment is stable when other test suites are added or
+    removed. Test suites with history are then assigned longest first to
+    the shard with the least expected runtime. The result only depends on
+    the names and the history and not on the order of the test suites.
+    """
+    expected = test_history.expected_runtimes(test_suite_names)
+    loads = [0.0] * num_shards
+    shards = [None] * len(test_suite_names)
+
+    known = []
+    for idx, name in enumerate(test_suite_names):
+        if test_history.runtime(name) is None:
+            shards[idx] = int(hash_string(name), 16) % num_shards
+            loads[shards[idx]] += expected[idx]
+        else:
+            known.append(idx)
+
+    for idx in sorted(known, key=lambda idx: (-expected[idx], test_suite_names[idx])):
+        shards[idx] = loads.index(min(loads))
+        loads[shards[idx]] += expected[idx]
+
+    return shards
@@ -9,6 +9,7 @@ Functionality to handle lists of test suites and filtering of them
 """
 
 from vunit.test_report import (PASSED, FAILED)
+from vunit.test_history import assign_shards
 
 
 class TestList(object):
@@ -35,6 +36,14 @@ class TestList(object):
         self._test_suites = [test for test in self._test_suites
                              if test.keep_matches(test_filter)]
 
+    def keep_shard(self, shard_index, num_shards, test_history):
+        """
+        Keep only the test suites of shard_index out of num_shards shards balanced using the test history
+        """
+        shards = assign_shards([test_suite.name for test_suite in self._test_suites], test_history, num_shards)
+        self._test_suites = [test_suite for test_suite, shard in zip(self._test_suites, shards)
+                             if shard == shard_index]
+
     def num_tests(self):
         """
         Return the number of tests within
@@ -78,6 +87,10 @@ class TestSuiteWrapper(object):
     def name(self):
         return self._test_case.name
 
+    @property
+    def config(self):
+        return self._test_case.config
+
     def keep_matches(self, test_filter):
         return test_filter(self._test_case.name)
 
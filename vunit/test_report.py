@@ -11,23 +11,47 @@ Provide test reporting functionality
 
 from xml.etree import ElementTree
 from sys import version_info
+import io
 import os
+import shutil
+import json
 import socket
 import re
 from vunit.color_printer import COLOR_PRINTER
-from vunit.ostools import read_file
+from vunit.output_file import read_output
+from vunit.ostools import get_time
 
 
-class TestReport(object):
+class TestReport(object):  # pylint: disable=too-many-instance-attributes
     """
     Collect reports from running testcases
     """
-    def __init__(self, printer=COLOR_PRINTER):
+    def __init__(self, printer=COLOR_PRINTER, progress_interval=None, junit_xml_writer=None):
+        """
+        :param progress_interval: Print a summary of the progress every progress_interval
+                                  seconds instead of the status of each test, failures
+                                  are still printed when they happen
+        :param junit_xml_writer: A JUnitXmlWriter which each result is written to when added
+        """
         self._test_results = {}
         self._test_names_in_order = []
+        # The results of each status in the order they were added
+        self._passed = []
+        self._failed = []
+        self._skipped = []
         self._printer = printer
         self._real_total_time = 0.0
         self._expected_num_tests = 0
+        self._progress_interval = progress_interval
+        self._last_progress_time = None
+        self._junit_xml_writer = junit_xml_writer
+
+    @property
+    def throttled(self):
+        """
+        Return True when only printing a summary of the progress at intervals
+        """
+        return self._progress_interval is not None
 
     def set_real_total_time(self, real_total_time):
         """
@@ -52,8 +76,24 @@ class TestReport(object):
         Add a a test result
         """
         result = TestResult(*args, **kwargs)
+        if result.name in self._test_results:
+            old_result = self._test_results[result.name]
+            self._results_with_status_of(old_result).remove(old_result)
         self._test_results[result.name] = result
         self._test_names_in_order.append(result.name)
+        self._results_with_status_of(result).append(result)
+        if self._junit_xml_writer is not None:
+            self._junit_xml_writer.add(result)
+
+    def _results_with_status_of(self, result):
+        """
+        Return the list of results with the same status as the result
+        """
+        if result.passed:
+            return self._passed
+        elif result.failed:
+            return self._failed
+        return self._skipped
 
     def _last_test_result(self):
         """
@@ -74,7 +114,16 @@ class TestReport(object):
         total number of passed, failed and skipped tests
         """
         result = self._last_test_result()
-        passed, failed, skipped = self._split()
+
+        if self.throttled and not result.failed:
+            now = get_time()
+            if self._last_progress_time is None:
+                self._last_progress_time = now
+            if now - self._last_progress_time >= self._progress_interval or self.num_tests() >= total_tests:
+                self._last_progress_time = now
+                self._print_progress(total_tests)
+            return
+
         if result.passed:
             self._printer.write("pass", fg='gi')
         elif result.failed:
@@ -84,16 +133,24 @@ class TestReport(object):
         else:
             assert False
 
-        args = []
-        args.append("P=%i" % len(passed))
-        args.append("S=%i" % len(skipped))
-        args.append("F=%i" % len(failed))
-        args.append("T=%i" % total_tests)
-
-        self._printer.write(" (%s) %s (%.1f seconds)\n" %
-                            (" ".join(args),
+        self._printer.write(" (%s) %s %s\n" %
+                            (self._counts_str(total_tests),
                              result.name,
-                             result.time))
+                             result.time_str))
+
+    def _print_progress(self, total_tests):
+        """
+        Print a summary of the progress
+        """
+        self._printer.write("progress", fg='gi')
+        self._printer.write(" (%s) %i%% done\n" % (self._counts_str(total_tests),
+                                                   100 * self.num_tests() // max(total_tests, 1)))
+
+    def _counts_str(self, total_tests):
+        """
+        Return the number of passed, skipped and failed tests so far and the total number of tests
+        """
+        return "P=%i S=%i F=%i T=%i" % (len(self._passed), len(self._skipped), len(self._failed), total_tests)
 
     def all_ok(self):
         """
@@ -132,8 +189,18 @@ class TestReport(object):
         n_passed = len(passed)
         total = len(all_tests)
 
+        n_cached = sum(1 for result in passed if result.cached)
+        flaky = [result for result in passed if result.flaky]
+
         self._printer.write("pass", fg='gi')
-        self._printer.write(" %i of %i\n" % (n_passed, total))
+        if n_cached > 0:
+            self._printer.write(" %i of %i (%i cached)\n" % (n_passed, total, n_cached))
+        else:
+            self._printer.write(" %i of %i\n" % (n_passed, total))
+
+        if flaky:
+            self._printer.write("flaky", fg='rgi')
+            self._printer.write(" %i of %i\n" % (len(flaky), total))
 
         if n_skipped > 0:
             self._printer.write("skip", fg='rgi')
@@ -150,6 +217,8 @@ class TestReport(object):
 
         self._printer.write("%s\n" % ("=" * (max(max_len + 25, 0))))
 
+        self._print_flaky(flaky, max_len)
+
         if n_failed > 0:
             self._printer.write("Some failed!", fg='ri')
         elif n_skipped > 0:
@@ -164,22 +233,23 @@ class TestReport(object):
                                 % (len(all_tests), self._expected_num_tests), fg='rgi')
             self._printer.write("\n")
 
+    def _print_flaky(self, flaky, max_len):
+        """
+        Print the flaky tests which passed after failing an earlier attempt
+        """
+        if not flaky:
+            return
+
+        self._printer.write("Flaky tests which passed after failing:\n", fg='rgi')
+        for test_result in flaky:
+            self._printer.write("%s (%i attempts)\n" % (test_result.name, test_result.attempts))
+        self._printer.write("%s\n" % ("=" * (max(max_len + 25, 0))))
+
     def _split(self):
         """
         Split the test cases into passed and failures
         """
-        failures = []
-        passed = []
-        skipped = []
-        for result in self._test_results_in_order():
-            if result.passed:
-                passed.append(result)
-            elif result.failed:
-                failures.append(result)
-            elif result.skipped:
-                skipped.append(result)
-
-        return passed, failures, skipped
+        return list(self._passed), list(self._failed), list(self._skipped)
 
     def to_junit_xml_str(self):
         """
@@ -187,14 +257,7 @@ class TestReport(object):
         """
         _, failures, skipped = self._split()
 
-        root = ElementTree.Element("testsuite")
-        root.attrib["name"] = "testsuite"
-        root.attrib["errors"] = "0"
-        root.attrib["failures"] = str(len(failures))
-        root.attrib["skipped"] = str(len(skipped))
-        root.attrib["tests"] = str(len(self._test_results))
-        root.attrib["hostname"] = socket.gethostname()
-
+        root = _testsuite_element(len(self._test_results), len(failures), len(skipped))
         for result in self._test_results_in_order():
             root.append(result.to_xml())
 
@@ -206,6 +269,96 @@ class TestReport(object):
             xml = ElementTree.tostring(root, encoding="utf-8")
         return xml
 
+    def to_json_str(self):
+        """
+        Convert test report to a json string with the status, time and resource usage of each test
+        """
+        return json.dumps({"tests": [result.to_dict() for result in self._test_results_in_order()],
+                           "real_total_time": self._real_total_time},
+                          indent=1, sort_keys=True)
+
+
+class JUnitXmlWriter(object):
+    """
+    Write a JUnit XML report incrementally as each test result is added such that
+    the output of all tests is never kept in memory at once
+
+    The test cases are appended to a .part file since the counts in the testsuite
+    element are only known when closing.
+    """
+
+    def __init__(self, file_name, output="failed", max_output_size=None):
+        """
+        :param output: Embed the output of all, failed or none of the tests
+        :param max_output_size: Only embed the last max_output_size characters of the output or None
+        """
+        assert output in ("all", "failed", "none")
+        self._file_name = file_name
+        self._output = output
+        self._max_output_size = max_output_size
+        self._num_tests = 0
+        self._num_failures = 0
+        self._num_skipped = 0
+
+        path = os.path.dirname(file_name)
+        if path != "" and not os.path.exists(path):
+            os.makedirs(path)
+        self._part = io.open(file_name + ".part", "wb")
+
+    def add(self, result):
+        """
+        Append the test result
+        """
+        include_output = self._output == "all" or (self._output == "failed" and result.failed)
+        self._part.write(_xml_bytes(result.to_xml(include_output, self._max_output_size)))
+        self._part.flush()
+        self._num_tests += 1
+        self._num_failures += int(result.failed)
+        self._num_skipped += int(result.skipped)
+
+    def close(self):
+        """
+        Write the complete report
+        """
+        self._part.close()
+        root = _testsuite_element(self._num_tests, self._num_failures, self._num_skipped)
+        # A text gives an end tag instead of a self closing start tag
+        root.text = "-"
+        header = _xml_bytes(root)[:-len(b"-</testsuite>")]
+
+        with io.open(self._file_name, "wb") as fwrite:
+            fwrite.write(header)
+            with io.open(self._file_name + ".part", "rb") as fread:
+                shutil.copyfileobj(fread, fwrite)
+            fwrite.write(b"</testsuite>")
+        os.remove(self._file_name + ".part")
+
+
+def _testsuite_element(num_tests, num_failures, num_skipped):
+    """
+    Return the testsuite element of a JUnit XML report without test cases
+    """
+    root = ElementTree.Element("testsuite")
+    root.attrib["name"] = "testsuite"
+    root.attrib["errors"] = "0"
+    root.attrib["failures"] = str(num_failures)
+    root.attrib["skipped"] = str(num_skipped)
+    root.attrib["tests"] = str(num_tests)
+    root.attrib["hostname"] = socket.gethostname()
+    return root
+
+
+def _xml_bytes(element):
+    """
+    Return the UTF-8 encoded XML of the element without an XML declaration
+    """
+    if version_info >= (3, 0):
+        # Python 3.x
+        return ElementTree.tostring(element, encoding="unicode").encode("utf-8")
+
+    # Python 2.x, the default encoding uses character references and has no XML declaration
+    return ElementTree.tostring(element)
+
 
 class TestStatus(object):
     """
@@ -228,31 +381,45 @@ class TestStatus(object):
 PASSED = TestStatus("passed")
 SKIPPED = TestStatus("skipped")
 FAILED = TestStatus("failed")
+TIMEOUT = TestStatus("timeout")
 
 
-class TestResult(object):
+class TestResult(object):  # pylint: disable=too-many-instance-attributes
     """
     Represents the result of a single test case
     """
 
-    def __init__(self, name, status, time, output_file_name):
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 name, status, time, output_file_name, cached=False, resources=None, attempts=1, flaky=False):
         assert status in (PASSED,
                           FAILED,
-                          SKIPPED)
+                          SKIPPED,
+                          TIMEOUT)
+        assert status == PASSED or not cached
         self.name = name
         self._status = status
         self.time = time
         self._output_file_name = output_file_name
+        self.cached = cached
+        self.resources = resources
+        self.attempts = attempts
+        self.flaky = flaky
 
     @property
     def output(self):
         """
         Return test output
         """
+        return self._read_output()
+
+    def _read_output(self, max_size=None):
+        """
+        Return the test output, only the last max_size characters when given
+        """
         file_exists = os.path.isfile(self._output_file_name)
         is_readable = os.access(self._output_file_name, os.R_OK)
         if file_exists and is_readable:
-            return read_file(self._output_file_name)
+            return read_output(self._output_file_name, max_size)
         else:
             return "Failed to read output file: %s" % self._output_file_name
 
@@ -266,7 +433,24 @@ class TestResult(object):
 
     @property
     def failed(self):
-        return self._status == FAILED
+        return self._status in (FAILED, TIMEOUT)
+
+    @property
+    def timed_out(self):
+        return self._status == TIMEOUT
+
+    @property
+    def time_str(self):
+        """
+        Return the runtime as shown in the console
+        """
+        if self.cached:
+            return "(cached)"
+        elif self.timed_out:
+            return "(%.1f seconds, timeout)" % self.time
+        elif self.flaky:
+            return "(%.1f seconds, flaky after %i attempts)" % (self.time, self.attempts)
+        return "(%.1f seconds)" % self.time
 
     def print_status(self, printer, padding=0):
         """
@@ -284,11 +468,14 @@ class TestResult(object):
 
         my_padding = max(padding - len(self.name), 0)
 
-        printer.write("%s (%.1f seconds)\n" % (self.name + (" " * my_padding), self.time))
+        printer.write("%s %s\n" % (self.name + (" " * my_padding), self.time_str))
 
-    def to_xml(self):
+    def to_xml(self, include_output=True, max_output_size=None):
         """
         Convert the test result to ElementTree XML object
+
+        :param include_output: Embed the output of the test
+        :param max_output_size: Only embed the last max_output_size characters of the output or None
         """
         test = ElementTree.Element("testcase")
         match = re.search(r"(.+)\.([^.]+)$", self.name)
@@ -300,10 +487,48 @@ class TestResult(object):
         test.attrib["time"] = "%.1f" % self.time
         if self.failed:
             failure = ElementTree.SubElement(test, "failure")
-            failure.attrib["message"] = "Failed"
+            failure.attrib["message"] = "Timeout" if self.timed_out else "Failed"
         elif self.skipped:
             skipped = ElementTree.SubElement(test, "skipped")
             skipped.attrib["message"] = "Skipped"
-        system_out = ElementTree.SubElement(test, "system-out")
-        system_out.text = self.output
+        properties = self._properties()
+        if properties:
+            element = ElementTree.SubElement(test, "properties")
+            for name, value in properties:
+                prop = ElementTree.SubElement(element, "property")
+                prop.attrib["name"] = name
+                prop.attrib["value"] = value
+        if include_output:
+            system_out = ElementTree.SubElement(test, "system-out")
+            system_out.text = self._read_output(max_output_size)
         return test
+
+    def _properties(self):
+        """
+        Return the name and value of the JUnit XML properties of the test
+        """
+        properties = []
+        if self.cached:
+            properties.append(("cached", "true"))
+        if self.attempts > 1:
+            properties.append(("attempts", str(self.attempts)))
+        if self.flaky:
+            properties.append(("flaky", "true"))
+        if self.resources is not None:
+            properties.append(("cpu_time", "%.3f" % self.resources.cpu_time))
+            properties.append(("max_rss", str(self.resources.max_rss)))
+            properties.append(("bytes_written", str(self.resources.bytes_written)))
+        return properties
+
+    def to_dict(self):
+        """
+        Convert the test result to a dictionary for the json report
+        """
+        return {"name": self.name,
+                "status": self._status.name,
+                "time": self.time,
+                "cached": self.cached,
+                "attempts": self.attempts,
+                "flaky": self.flaky,
+                "output_file_name": self._output_file_name,
+                "resources": None if self.resources is None else self.resources.to_dict()}
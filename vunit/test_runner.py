@@ -14,13 +14,20 @@ from __future__ import print_function
 import os
 from os.path import join, exists
 import traceback
+import signal
 import threading
 import sys
 import time
 import logging
+import multiprocessing
 import vunit.ostools as ostools
-from vunit.test_report import PASSED, FAILED
+from vunit.test_report import PASSED, FAILED, TIMEOUT
 from vunit.hashing import hash_string
+from vunit.test_history import longest_first
+from vunit.distributed import serve
+from vunit.output_file import OutputFile, read_output, read_output_tail
+from vunit.test_suites import TestCaseFollower
+from vunit.trash import get_trash
 LOGGER = logging.getLogger(__name__)
 
 
@@ -28,7 +35,10 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
     """
     Administer the execution of a list of test suites
     """
-    def __init__(self, report, output_path, verbose=False, num_threads=1):
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 report, output_path, verbose=False, num_threads=1, backend="thread", test_history=None,
+                 coordinator=None, timeout=None, admission=None, retries=0,
+                 output_tail=None, output_size_cap=None, compress_output=False, event_log=None):
         self._lock = threading.Lock()
         self._local = threading.local()
         self._report = report
@@ -38,7 +48,25 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
         self._stdout = sys.stdout
         self._stderr = sys.stderr
 
-    def run(self, test_suites):
+        assert backend in ("thread", "process")
+        if backend == "process" and not WorkerProcess.is_supported():
+            LOGGER.warning("Process backend requires fork support, using threads instead")
+            backend = "thread"
+        self._backend = backend
+        self._test_history = test_history
+        self._coordinator = coordinator
+        self._timeout = timeout
+        self._admission = admission
+        self._retries = retries
+        self._attempts = {}
+        self._failed_tests = set()
+        self._output_tail = output_tail
+        self._output_size_cap = output_size_cap
+        self._compress_output = compress_output
+        self._event_log = event_log
+        self._trash = get_trash(join(output_path, ".trash"))
+
+    def run(self, test_suites):  # pylint: disable=too-many-branches, too-many-statements
         """
         Run a list of test suites
         """
@@ -46,6 +74,7 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
         if not exists(self._output_path):
             os.makedirs(self._output_path)
 
+        self._trash.purge_leftovers()
         self._create_test_mapping_file(test_suites)
 
         num_tests = 0
@@ -59,60 +88,122 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
             print("Running %i tests" % num_tests)
             print()
 
+        # Tests might already have been reported such as cached results
+        num_tests += self._report.num_tests()
         self._report.set_expected_num_tests(num_tests)
+        self._emit("run_start", num_tests=num_tests)
 
-        scheduler = TestScheduler(test_suites)
+        if self._test_history is not None and self._num_threads > 1:
+            test_suites = longest_first(list(test_suites), self._test_history)
+
+        scheduler = TestScheduler(test_suites, self._admission)
 
         threads = []
+        workers = []
+        acceptor = None
+        stop_accepting = threading.Event()
 
         # Disable continuous output in parallel mode
-        write_stdout = self._verbose and self._num_threads == 1
+        write_stdout = self._verbose and self._num_threads == 1 and self._coordinator is None
 
         try:
             sys.stdout = ThreadLocalOutput(self._local, self._stdout)
             sys.stderr = ThreadLocalOutput(self._local, self._stdout)
 
+            workers = self._create_workers(test_suites, write_stdout)
+
             # Start P-1 worker threads
-            for _ in range(self._num_threads - 1):
+            for worker in workers[1:]:
                 new_thread = threading.Thread(target=self._run_thread,
-                                              args=(write_stdout, scheduler, num_tests, False))
+                                              args=(write_stdout, scheduler, num_tests, False, worker))
                 threads.append(new_thread)
                 new_thread.start()
 
+            # Accept remote workers only after the local worker threads have started since
+            # the acceptor appends to workers and each worker must be run by a single thread
+            if self._coordinator is not None:
+                acceptor = threading.Thread(target=self._accept_workers,
+                                            args=(stop_accepting, scheduler, num_tests, threads, workers))
+                acceptor.start()
+
             # Run one worker in main thread such that P=1 is not multithreaded
-            self._run_thread(write_stdout, scheduler, num_tests, True)
+            self._run_thread(write_stdout, scheduler, num_tests, True, workers[0])
 
             scheduler.wait_for_finish()
 
         except KeyboardInterrupt:
             LOGGER.debug("TestRunner: Caught Ctrl-C shutting down")
             ostools.PROGRAM_STATUS.shutdown()
+            for worker in [worker for worker in workers if worker is not None]:
+                worker.terminate()
             raise
 
         finally:
+            stop_accepting.set()
+            if acceptor is not None:
+                acceptor.join()
+
             for thread in threads:
                 thread.join()
 
+            for worker in [worker for worker in workers if worker is not None]:
+                worker.close()
+
+            # Nothing may touch the output path while directories are deleted after the run,
+            # do not delay shutting down when interrupted
+            if not ostools.PROGRAM_STATUS.is_shutting_down:
+                self._trash.wait()
             sys.stdout = self._stdout
             sys.stderr = self._stderr
+            self._emit("run_end")
             LOGGER.debug("TestRunner: Leaving")
 
-    def _run_thread(self, write_stdout, scheduler, num_tests, is_main):
+    def _create_workers(self, test_suites, write_stdout):
+        """
+        Create one worker per thread, a thread runs the test suites itself when its worker is None
+        """
+        if self._backend == "process":
+            # Fork all workers before starting any thread
+            return [WorkerProcess(self, test_suites, write_stdout)
+                    for _ in range(self._num_threads)]
+        return [None] * self._num_threads
+
+    def _accept_workers(self,  # pylint: disable=too-many-arguments
+                        stop_accepting, scheduler, num_tests, threads, workers):
+        """
+        Start a thread for each remote worker connecting to the coordinator until stopped
+        """
+        while not stop_accepting.is_set():
+            worker = self._coordinator.accept(self.open_output_file)
+            if worker is None:
+                continue
+
+            new_thread = threading.Thread(target=self._run_thread,
+                                          args=(False, scheduler, num_tests, False, worker))
+            with self._lock:
+                workers.append(worker)
+                threads.append(new_thread)
+            new_thread.start()
+
+    def _run_thread(self,  # pylint: disable=too-many-arguments
+                    write_stdout, scheduler, num_tests, is_main, worker=None):
         """
-        Run worker thread
+        Run worker thread, the test suites are run by the worker process when given
         """
         self._local.output = self._stdout
 
-        while True:
+        while worker is None or worker.is_alive():
             test_suite = None
+            retry = False
             try:
                 test_suite = scheduler.next()
 
-                with self._lock:
-                    for test_name in test_suite.test_cases:
-                        print("Starting %s" % test_name)
+                if not self._report.throttled:
+                    with self._lock:
+                        for test_name in test_suite.test_cases:
+                            print("Starting %s" % test_name)
 
-                self._run_test_suite(test_suite, write_stdout, num_tests)
+                retry = self._run_test_suite(test_suite, write_stdout, num_tests, worker)
 
             except StopIteration:
                 return
@@ -126,52 +217,182 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
 
             finally:
                 if test_suite is not None:
-                    scheduler.test_done()
+                    scheduler.test_done(test_suite, retry)
 
-    def _run_test_suite(self, test_suite, write_stdout, num_tests):
+    def _run_test_suite(self,  # pylint: disable=too-many-arguments, too-many-locals
+                        test_suite, write_stdout, num_tests, worker=None):
         """
-        Run the actual test suite
+        Run the actual test suite, returns True if the failed test suite shall be
+        retried since it has been attempted less than retries + 1 times
         """
         output_path = create_output_path(self._output_path, test_suite.name)
-        output_file_name = join(output_path, "output.txt")
+        output_file_name = self.output_file_name(output_path)
         start_time = ostools.get_time()
-
+        self._local.output_tail = None
+        self._emit("suite_start",
+                   suite=test_suite.name,
+                   tests=list(test_suite.test_cases),
+                   output_path=output_path,
+                   worker=getattr(worker, "name", None))
+
+        monitor = self._monitor_test_cases(test_suite, output_path, worker)
         try:
-            # If we could not clean output path, fail all tests
+            if worker is None:
+                results, resource_usage = self.execute_test_suite(test_suite, output_path, output_file_name,
+                                                                  write_stdout)
+            else:
+                results, resource_usage = worker.execute_test_suite(test_suite, output_path, output_file_name)
+        finally:
+            durations = None if monitor is None else monitor.stop()
+        runtime = ostools.get_time() - start_time
+
+        could_run = results is not None
+        if not could_run:
+            # We could not clean output path or run the test suite, fail all tests
+            results = self._fail_suite(test_suite)
+
+        any_not_passed = any(value != PASSED for value in results.values())
+        failed_tests = [name for name, value in results.items() if value in (FAILED, TIMEOUT)]
+
+        with self._lock:
+            attempt = self._attempts.get(test_suite.name, 0) + 1
+            self._attempts[test_suite.name] = attempt
+            self._failed_tests.update(failed_tests)
+            if self._test_history is not None:
+                self._test_history.add_outcome(test_suite.name, not failed_tests)
+            self._emit("suite_end",
+                       suite=test_suite.name,
+                       duration=runtime,
+                       attempt=attempt,
+                       results=dict((name, value.name) for name, value in results.items()),
+                       output_file_name=output_file_name)
+
+            if could_run and (not write_stdout) and (any_not_passed or self._verbose):
+                self._print_output(output_file_name, self._local.output_tail)
+
+            if failed_tests and attempt <= self._retries:
+                print("Retrying %s (attempt %i of %i)" % (test_suite.name, attempt + 1, self._retries + 1))
+                self._emit("suite_retry", suite=test_suite.name, attempt=attempt + 1)
+                return True
+
+            self._add_results(test_suite, results, runtime, num_tests, output_file_name,
+                              resource_usage, attempt, durations)
+            return False
+
+    def _renew_output_path(self, output_path):
+        """
+        Ensure the output path exists and is empty, an old output path is moved to
+        the trash and deleted in the background such that the simulation can start right away
+        """
+        if exists(output_path) and self._trash.discard(output_path):
+            os.makedirs(output_path)
+        else:
             ostools.renew_path(output_path)
-            output_file = open(output_file_name, "w")
+
+    def execute_test_suite(self,  # pylint: disable=too-many-arguments
+                           test_suite, output_path, output_file_name, write_stdout, output_stream=None):
+        """
+        Run the test suite with output redirected to the output file and the output stream when given
+
+        Returns the results and the resource usage of the simulator processes,
+        the results are None if the output path could not be created
+        """
+        try:
+            self._renew_output_path(output_path)
+            output_file = self.open_output_file(output_file_name)
         except KeyboardInterrupt:
             raise
         except:  # pylint: disable=bare-except
-            results = self._fail_suite(test_suite)
             with self._lock:
                 traceback.print_exc()
-                self._add_results(test_suite, results, start_time, num_tests, output_file_name)
-            return
+            return None, None
 
         try:
+            outputs = [output_file]
             if write_stdout:
-                self._local.output = TeeToFile([self._stdout, output_file])
-            else:
-                self._local.output = TeeToFile([output_file])
-
+                outputs.insert(0, self._stdout)
+            if output_stream is not None:
+                outputs.append(output_stream)
+            self._local.output = TeeToFile(outputs)
+
+            timeout = self.timeout_of(test_suite)
+            ostools.set_deadline(None if timeout is None else time.time() + timeout)
+            ostools.start_resource_accounting()
             results = test_suite.run(output_path)
         except KeyboardInterrupt:
             raise
+        except ostools.TimeoutExpired:
+            print("Test suite %s timed out after %g seconds" % (test_suite.name, timeout))
+            results = self._fail_suite(test_suite, TIMEOUT)
         except:  # pylint: disable=bare-except
             traceback.print_exc()
             results = self._fail_suite(test_suite)
         finally:
+            ostools.set_deadline(None)
+            resource_usage = ostools.stop_resource_accounting()
             self._local.output = self._stdout
             output_file.flush()
             output_file.close()
+            if self._output_tail is not None:
+                self._local.output_tail = output_file.tail()
 
-        any_not_passed = any(value != PASSED for value in results.values())
+        return results, resource_usage
 
-        with self._lock:
-            if (not write_stdout) and (any_not_passed or self._verbose):
-                self._print_output(output_file_name)
-            self._add_results(test_suite, results, start_time, num_tests, output_file_name)
+    def output_file_name(self, output_path):
+        """
+        Return the name of the output file within the output path of a test suite
+        """
+        return join(output_path, "output.txt.gz" if self._compress_output else "output.txt")
+
+    def open_output_file(self, output_file_name):
+        """
+        Open the output file of a test suite for writing
+        """
+        return OutputFile(output_file_name, self._output_tail, self._output_size_cap)
+
+    def timeout_of(self, test_suite):
+        """
+        Return the timeout in seconds of the test suite or None, the timeout sim option
+        takes precedence over the default timeout
+        """
+        return test_suite.config.sim_options.get("timeout", self._timeout)
+
+    def run_worker(self, test_suites, connection):
+        """
+        Run the test suites requested by a coordinator sending the output and results back to it
+        """
+        test_suites = dict((test_suite.name, test_suite) for test_suite in test_suites)
+
+        def run_test_suite(test_suite_name, output_stream):
+            """
+            Run the test suite within the output path of this worker
+            """
+            if test_suite_name not in test_suites:
+                LOGGER.error("Coordinator requested unknown test suite %s", test_suite_name)
+                return None, None
+
+            print("Running %s" % test_suite_name)
+            output_path = create_output_path(self._output_path, test_suite_name)
+            return self.execute_test_suite(test_suites[test_suite_name],
+                                           output_path,
+                                           self.output_file_name(output_path),
+                                           self._verbose,
+                                           output_stream)
+
+        if not exists(self._output_path):
+            os.makedirs(self._output_path)
+
+        self._trash.purge_leftovers()
+        try:
+            sys.stdout = ThreadLocalOutput(self._local, self._stdout)
+            sys.stderr = ThreadLocalOutput(self._local, self._stdout)
+            self._local.output = self._stdout
+            serve(connection, run_test_suite)
+        finally:
+            self._trash.wait()
+            connection.close()
+            sys.stdout = self._stdout
+            sys.stderr = self._stderr
 
     def _create_test_mapping_file(self, test_suites):
         """
@@ -199,40 +420,320 @@ class TestRunner(object):  # pylint: disable=too-many-instance-attributes
             for value in mapping:
                 fptr.write(value + "\n")
 
-    @staticmethod
-    def _print_output(output_file_name):
+    def _print_output(self, output_file_name, tail=None):
         """
-        Print contents of output file if it exists
+        Print contents of output file if it exists, only the last lines are printed when
+        keeping a tail of the output, the tail is read from the file unless given
         """
-        with open(output_file_name, "r") as fread:
-            for line in fread:
-                print(line, end="")
+        if self._output_tail is None:
+            print(read_output(output_file_name), end="")
+            return
 
-    def _add_results(self, test_suite, results, start_time, num_tests, output_file_name):
+        num_omitted, lines = tail if tail is not None else read_output_tail(output_file_name, self._output_tail)
+        if num_omitted > 0:
+            print("... %i lines omitted, see %s" % (num_omitted, output_file_name))
+        for line in lines:
+            print(line)
+
+    def _add_results(self,  # pylint: disable=too-many-arguments
+                     test_suite, results, runtime, num_tests, output_file_name, resource_usage=None,
+                     attempts=1, durations=None):
         """
-        Add results to test report
+        Add results to test report, a test which passed after failing an earlier attempt is flaky
+
+        :param durations: The duration of each started test or None to split the runtime evenly
         """
-        runtime = ostools.get_time() - start_time
         time_per_test = runtime / len(results)
+        resources_per_test = None if resource_usage is None else resource_usage.split(len(results))
+
+        if self._test_history is not None:
+            self._test_history.add_runtime(test_suite.name, runtime)
+            if resource_usage is not None:
+                self._test_history.add_max_rss(test_suite.name, resource_usage.max_rss)
 
         for test_name in test_suite.test_cases:
             status = results[test_name]
+            flaky = status == PASSED and test_name in self._failed_tests
+            test_time = time_per_test if durations is None else durations.get(test_name, 0.0)
             self._report.add_result(test_name,
                                     status,
-                                    time_per_test,
-                                    output_file_name)
+                                    test_time,
+                                    output_file_name,
+                                    resources=resources_per_test,
+                                    attempts=attempts,
+                                    flaky=flaky)
             self._report.print_latest_status(total_tests=num_tests)
-        print()
+            self._emit("test_result",
+                       test=test_name,
+                       status=status.name,
+                       time=test_time,
+                       attempts=attempts,
+                       flaky=flaky,
+                       cached=False,
+                       output_file_name=output_file_name)
+        if not self._report.throttled:
+            print()
+
+    def _monitor_test_cases(self, test_suite, output_path, worker):
+        """
+        Return a TestCaseMonitor following a test suite running multiple test cases in the same
+        simulation or None, remote workers do not share the output path
+        """
+        if len(test_suite.test_cases) < 2 or not (worker is None or isinstance(worker, WorkerProcess)):
+            return None
+
+        results_file_name = join(output_path, "vunit_results")
+        if exists(results_file_name):
+            # From an earlier run, the output path is renewed before running the test suite
+            os.remove(results_file_name)
+        return TestCaseMonitor(TestCaseFollower(results_file_name, test_suite.name), self._emit)
+
+    def _emit(self, event, **fields):
+        """
+        Emit an event to the event log if there is one
+        """
+        if self._event_log is not None:
+            self._event_log.emit(event, **fields)
 
     @staticmethod
-    def _fail_suite(test_suite):
+    def _fail_suite(test_suite, status=FAILED):
         """ Return failure for all tests in suite """
         results = {}
         for test_name in test_suite.test_cases:
-            results[test_name] = FAILED
+            results[test_name] = status
         return results
 
 
+class WorkerProcess(object):
+    """
+    A forked process which runs test suites on behalf of a TestRunner thread
+
+    The test suites are inherited when forking such that only the index of the
+    test suite and its results have to be sent between the processes. Python
+    pre_config and post_check hooks thus run in parallel without sharing the GIL.
+    """
+
+    # Seconds after the timeout of a test suite before the worker process is killed
+    # when it does not stop the test suite itself such as when stuck in a Python hook
+    _TIMEOUT_GRACE = 10.0
+
+    def __init__(self, runner, test_suites, write_stdout):
+        self._runner = runner
+        self._test_suites = test_suites
+        self._write_stdout = write_stdout
+        self._suite_index = dict((id(test_suite), idx) for idx, test_suite in enumerate(test_suites))
+        self._connection = None
+        self._process = None
+        self._start()
+
+    @staticmethod
+    def is_supported():
+        """
+        Return True if worker processes can be forked on this platform
+        """
+        if ostools.IS_WINDOWS_SYSTEM:
+            return False
+        if hasattr(multiprocessing, "get_all_start_methods"):
+            return "fork" in multiprocessing.get_all_start_methods()
+        return True
+
+    def _start(self):
+        """
+        Fork the worker process
+        """
+        if hasattr(multiprocessing, "get_context"):
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing
+
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(target=self._main, args=(child_connection,))
+        self._process.daemon = True
+        self._process.start()
+        child_connection.close()
+        LOGGER.debug("Started worker process with pid=%i", self._process.pid)
+
+    def _main(self, connection):
+        """
+        The body of the worker process
+        """
+        self._connection.close()
+        # The lock might have been held by another thread when forking
+        self._runner._lock = threading.Lock()  # pylint: disable=protected-access
+
+        try:
+            while True:
+                message = connection.recv()
+                if message is None:
+                    break
+
+                idx, output_path, output_file_name = message
+                try:
+                    results = self._runner.execute_test_suite(self._test_suites[idx],
+                                                              output_path,
+                                                              output_file_name,
+                                                              self._write_stdout)
+                    sys.stdout.flush()
+                    connection.send(("results", results))
+                except KeyboardInterrupt:
+                    raise
+                except:  # pylint: disable=bare-except
+                    connection.send(("error", traceback.format_exc()))
+
+            # The deletion thread of this process dies with it
+            self._runner._trash.wait()  # pylint: disable=protected-access
+
+        except KeyboardInterrupt:
+            try:
+                connection.send(("interrupt", None))
+            except (IOError, OSError):
+                pass
+
+        except EOFError:
+            pass
+
+        finally:
+            connection.close()
+
+    def execute_test_suite(self, test_suite, output_path, output_file_name):
+        """
+        Run the test suite within the worker process
+
+        Returns the results and resource usage, the results are None if the test suite could not be run
+        """
+        self._connection.send((self._suite_index[id(test_suite)], output_path, output_file_name))
+
+        timeout = self._runner.timeout_of(test_suite)
+        deadline = None if timeout is None else time.time() + timeout + self._TIMEOUT_GRACE
+
+        try:
+            while not self._connection.poll(0.1):
+                ostools.PROGRAM_STATUS.check_for_shutdown()
+                if deadline is not None and time.time() > deadline:
+                    LOGGER.error("Worker process with pid=%i did not stop %s after its timeout, restarting it",
+                                 self._process.pid, test_suite.name)
+                    self._restart()
+                    return self._runner._fail_suite(test_suite, TIMEOUT), None  # pylint: disable=protected-access
+            kind, value = self._connection.recv()
+        except EOFError:
+            LOGGER.error("Worker process with pid=%i died while running %s, restarting it",
+                         self._process.pid, test_suite.name)
+            self._process.join()
+            self._connection.close()
+            self._start()
+            return None, None
+
+        if kind == "interrupt":
+            raise KeyboardInterrupt
+
+        if kind == "error":
+            LOGGER.error("Worker process failed to run %s:\n%s", test_suite.name, value)
+            return None, None
+
+        return value
+
+    @staticmethod
+    def is_alive():
+        """
+        A worker process which dies is restarted
+        """
+        return True
+
+    def _restart(self):
+        """
+        Replace a stuck worker process
+        """
+        self.terminate()
+        self._connection.close()
+        self._start()
+
+    def terminate(self):
+        """
+        Interrupt the worker process such that it can terminate its simulator processes
+        """
+        if self._process.is_alive():
+            os.kill(self._process.pid, signal.SIGINT)
+            self._process.join(1.0)
+
+        if self._process.is_alive():
+            LOGGER.debug("Terminating worker process with pid=%i", self._process.pid)
+            self._process.terminate()
+            self._process.join()
+
+    def close(self):
+        """
+        Stop the worker process
+        """
+        if self._process.is_alive():
+            try:
+                self._connection.send(None)
+            except (IOError, OSError):
+                pass
+            self._process.join()
+        self._connection.close()
+
+
+class TestCaseMonitor(object):
+    """
+    Poll the test cases started by a running simulation to emit when each test case
+    starts and ends and to measure the duration of each test case
+    """
+
+    _POLL_INTERVAL = 0.2
+
+    def __init__(self, follower, emit):
+        self._follower = follower
+        self._emit = emit
+        self._start_times = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        """
+        Poll the follower until stopped
+        """
+        while not self._stop.wait(self._POLL_INTERVAL):
+            self._poll()
+
+    def _poll(self):
+        """
+        Record the test cases started since the last poll, a test case ends when the next one starts
+        """
+        now = time.time()
+        for name in self._follower.poll():
+            self._end_last_test_case(now)
+            self._start_times.append((name, now))
+            self._emit("test_start", test=name)
+
+    def _end_last_test_case(self, end_time):
+        """
+        Emit the end of the test case which started last
+        """
+        if self._start_times:
+            name, start_time = self._start_times[-1]
+            self._emit("test_end", test=name, duration=end_time - start_time)
+
+    def stop(self):
+        """
+        Stop polling and return the duration of each started test case or None when the
+        test cases were not seen while running such as when the simulator buffers the file
+        """
+        self._stop.set()
+        self._thread.join()
+        seen_while_running = bool(self._start_times)
+        self._poll()
+        end_time = time.time()
+        self._end_last_test_case(end_time)
+
+        if not seen_while_running:
+            return None
+
+        end_times = [start_time for _, start_time in self._start_times[1:]] + [end_time]
+        return dict((name, end - start) for (name, start), end in zip(self._start_times, end_times))
+
+
 class TeeToFile(object):
     """
     Provide a write method which writes to multiple files
@@ -277,11 +778,14 @@ class TestScheduler(object):
     Schedule tests to different treads
     """
 
-    def __init__(self, tests):
+    def __init__(self, tests, admission=None):
         self._lock = threading.Lock()
-        self._tests = tests
-        self._idx = 0
+        self._pending = list(tests)
+        self._admission = admission
         self._num_done = 0
+        self._num_tests = len(tests)
+        if admission is not None:
+            admission.set_test_suites(tests)
 
     def __iter__(self):
         return self
@@ -295,26 +799,39 @@ class TestScheduler(object):
     def next(self):
         """
         Iterator in Python 2
+
+        Returns the first pending test which is admitted, waits while no test is admitted
         """
-        ostools.PROGRAM_STATUS.check_for_shutdown()
-        with self._lock:
-            if self._idx < len(self._tests):
-                idx = self._idx
-                self._idx += 1
-                return self._tests[idx]
-            else:
-                raise StopIteration
+        while True:
+            ostools.PROGRAM_STATUS.check_for_shutdown()
+            with self._lock:
+                if not self._pending:
+                    raise StopIteration
+
+                for idx, test in enumerate(self._pending):
+                    if self._admission is None or self._admission.try_admit(test):
+                        return self._pending.pop(idx)
 
-    def test_done(self):
+            time.sleep(0.05)
+
+    def test_done(self, test, retry=False):
         """
-        Signal that a test has been done
+        Signal that a test has been done, a test to retry is run again after the pending tests
+
+        The test is released before it is added again such that it is never admitted twice
         """
+        if self._admission is not None:
+            self._admission.release(test)
+
         with self._lock:
+            if retry:
+                self._pending.append(test)
+                self._num_tests += 1
             self._num_done += 1
 
     def is_finished(self):
         with self._lock:
-            return self._num_done >= len(self._tests)
+            return self._num_done >= self._num_tests
 
     def wait_for_finish(self):
         """
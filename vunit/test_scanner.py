@@ -0,0 +1,41 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Find test cases and pragmas within HDL code
+
+The results are stored with the parse result of a source file such that
+test benches do not have to read and scan the file again.
+"""
+
+import re
+
+_RE_VHDL_TEST_CASE = re.compile(r'\s+run\("(.*?)"\)', re.IGNORECASE)
+_RE_VERILOG_TEST_CASE = re.compile(r'`TEST_CASE\("(.*?)"\)')
+_RE_PRAGMA = re.compile(r'vunit_pragma\s+([a-zA-Z0-9_]+)', re.IGNORECASE)
+
+
+def find_vhdl_test_cases(code):
+    """
+    Return the names of all if run("something") test cases in VHDL code without comments
+    """
+    return [match.group(1) for match in _RE_VHDL_TEST_CASE.finditer(code)]
+
+
+def find_verilog_test_cases(code):
+    """
+    Return the names of all `TEST_CASE("something") test cases in Verilog code
+    """
+    return [match.group(1) for match in _RE_VERILOG_TEST_CASE.finditer(code)]
+
+
+def find_pragmas(code):
+    """
+    Return a list of all vunit pragmas found in the code
+
+    @TODO only look inside comments
+    """
+    return [match.group(1) for match in _RE_PRAGMA.finditer(code)]
@@ -40,6 +40,10 @@ class IndependentSimTestCase(object):
     def name(self):
         return self._name
 
+    @property
+    def config(self):
+        return self._config
+
     def run(self, output_path):
         """
         Run the test case using the output_path
@@ -100,11 +104,12 @@ class SameSimTestSuite(object):
     def name(self):
         return self._name
 
+    @property
+    def config(self):
+        return self._config
+
     def _full_name(self, name):
-        if name == "":
-            return self._name
-        else:
-            return self._name + "." + name
+        return _full_test_name(self._name, name)
 
     def keep_matches(self, test_filter):
         """
@@ -189,6 +194,51 @@ class SameSimTestSuite(object):
         return retval
 
 
+class TestCaseFollower(object):
+    """
+    Follow the vunit_results file of a running simulation to find when each test case starts
+    """
+
+    def __init__(self, file_name, test_suite_name):
+        self._file_name = file_name
+        self._test_suite_name = test_suite_name
+        self._offset = 0
+        self._partial = ""
+
+    def poll(self):
+        """
+        Return the full names of the test cases started since the last poll
+        """
+        try:
+            with open(self._file_name, "rb") as fread:
+                fread.seek(0, 2)
+                if fread.tell() < self._offset:
+                    # The file has been replaced
+                    self._offset = 0
+                    self._partial = ""
+                fread.seek(self._offset)
+                data = fread.read()
+        except (IOError, OSError):
+            return []
+
+        self._offset += len(data)
+        lines = (self._partial + data.decode("utf-8", "ignore")).split("\n")
+        self._partial = lines.pop()
+        # Lines end with CRLF on Windows
+        lines = [line.rstrip("\r") for line in lines]
+        return [_full_test_name(self._test_suite_name, line[len("test_start:"):])
+                for line in lines if line.startswith("test_start:")]
+
+
+def _full_test_name(test_suite_name, name):
+    """
+    Return the full name of a test case, the name is empty when the test bench has no test cases
+    """
+    if name == "":
+        return test_suite_name
+    return test_suite_name + "." + name
+
+
 def _add_runner_cfg(config, output_path, enabled_test_cases):
     """
     Return a new Configuration object with runner_cfg and output path information set
@@ -0,0 +1,151 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+Move directories out of the way with an atomic rename and delete them on a background thread
+
+A rename within a file system is instant regardless of the size of the
+directory while deleting it may take seconds. The trash directory must
+therefore be on the same file system as the discarded directories.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import logging
+from os.path import join, exists
+try:
+    import queue
+except ImportError:
+    # Python 2.7
+    import Queue as queue  # pylint: disable=import-error
+LOGGER = logging.getLogger(__name__)
+
+
+class Trash(object):
+    """
+    A trash directory emptied by a low priority daemon thread
+
+    The thread is started once per process since threads do not survive a fork.
+    Directories not yet deleted when the process exits are left in the trash
+    until purge_leftovers is called by a later run. Use get_trash to share
+    the trash and its thread within the process.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def discard(self, directory):
+        """
+        Move the directory to the trash to be deleted in the background
+
+        Returns False if the directory could not be moved such as when the
+        trash is on another file system or a file is in use on Windows
+        """
+        self._start()
+        try:
+            self._create()
+            bin_path = tempfile.mkdtemp(dir=self._path)
+        except (IOError, OSError):
+            return False
+
+        try:
+            os.rename(directory, join(bin_path, "discarded"))
+            return True
+        except OSError as exc:
+            LOGGER.debug("Could not move %s to the trash: %s", directory, exc)
+            return False
+        finally:
+            self._queue.put(bin_path)
+
+    def purge_leftovers(self):
+        """
+        Delete the directories left in the trash by an earlier run
+        """
+        self._start()
+        self._create()
+        for name in os.listdir(self._path):
+            self._queue.put(join(self._path, name))
+
+    def wait(self):
+        """
+        Wait until all discarded directories have been deleted
+        """
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def _create(self):
+        """
+        Create the trash directory unless it exists, it may have been removed with the output path
+        """
+        if not exists(self._path):
+            try:
+                os.makedirs(self._path)
+            except OSError:
+                # Created by another thread or process
+                if not exists(self._path):
+                    raise
+
+    def _start(self):
+        """
+        Start the deletion thread of this process unless already started
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=_delete_forever, args=(self._queue,))
+            thread.daemon = True
+            thread.start()
+
+
+_TRASHES = {}
+_TRASHES_LOCK = threading.Lock()
+
+
+def get_trash(path):
+    """
+    Return the trash of the path which is shared within the process
+    """
+    path = os.path.abspath(path)
+    with _TRASHES_LOCK:
+        if path not in _TRASHES:
+            _TRASHES[path] = Trash(path)
+        return _TRASHES[path]
+
+
+def _delete_forever(work_queue):
+    """
+    Delete the directories put in the work queue
+    """
+    _lower_priority()
+    while True:
+        path = work_queue.get()
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        finally:
+            work_queue.task_done()
+
+
+def _lower_priority():
+    """
+    Lower the scheduling priority of the calling thread such that the deletion does not
+    compete with the simulators, only done on Linux where the nice value is per thread
+    """
+    if not sys.platform.startswith("linux"):
+        return
+
+    try:
+        os.nice(19)
+    except OSError:
+        pass
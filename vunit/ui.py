@@ -96,6 +96,11 @@ The following simulation options are known.
   A list of PLI files
   A list of file names
 
+``timeout``
+  Seconds after which the simulation of the test is killed and the test fails with a timeout.
+  Takes precedence over the ``--timeout`` command line flag, ``None`` disables the timeout.
+  Number or None
+
 ``ghdl.flags``
    Extra arguments passed to ``ghdl --elab-run`` command *before* executable specific flags. Must be a list of strings.
    Must be a list of strings.
@@ -195,10 +200,11 @@ import sys
 import traceback
 import logging
 import os
-from os.path import exists, abspath, join, basename, splitext
+from os.path import exists, isdir, abspath, join, basename, splitext
 from glob import glob
 from fnmatch import fnmatch
-from vunit.database import PickledDataBase, DataBase
+from vunit.database import PickledDataBase, DataBase, LogDataBase, GenerationDataBase
+from vunit.hashing import ContentHashCache
 import vunit.ostools as ostools
 from vunit.vunit_cli import VUnitCLI
 from vunit.simulator_factory import SimulatorFactory
@@ -208,9 +214,16 @@ from vunit.project import (Project,
                            file_type_of,
                            check_vhdl_standard,
                            HDL_FILE_ENCODING)
-from vunit.test_runner import TestRunner
-from vunit.test_report import TestReport
+from vunit.test_runner import TestRunner, create_output_path
+from vunit.test_history import TestHistory
+from vunit.distributed import Coordinator, connect
+from vunit.admission import AdmissionController, LicenseSemaphore, cpu_count, available_memory
+from vunit.event_log import EventLog
+from vunit.test_report import TestReport, JUnitXmlWriter, PASSED
 from vunit.test_bench_list import TestBenchList
+from vunit.test_list import TestList
+from vunit.result_cache import ResultCache, create_fingerprint
+import vunit.about as about
 from vunit.exceptions import CompileError
 from vunit.location_preprocessor import LocationPreprocessor
 from vunit.check_preprocessor import CheckPreprocessor
@@ -225,6 +238,9 @@ from vunit.com import codec_generator
 
 LOGGER = logging.getLogger(__name__)
 
+# Version of the project database content, the database is re-created when it differs
+DATABASE_VERSION = str((11, sys.version)).encode()
+
 
 class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-public-methods
     """
@@ -279,6 +295,18 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
                    no_color=args.no_color,
                    verbose=args.verbose,
                    xunit_xml=args.xunit_xml,
+                   xunit_xml_output=args.xunit_xml_output,
+                   xunit_xml_max_output=args.xunit_xml_max_output,
+                   json_report=args.json_report,
+                   event_log=args.event_log,
+                   progress_interval=args.progress_interval,
+                   timeout=args.timeout,
+                   retries=args.retries,
+                   output_tail=args.output_tail,
+                   output_size_cap=args.output_size_cap,
+                   compress_output=args.compress_output,
+                   memory_budget=args.memory_budget,
+                   license_limit=args.license_limit,
                    log_level=args.log_level,
                    test_filter=test_filter,
                    list_only=args.list,
@@ -289,9 +317,19 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
                    compile_builtins=compile_builtins,
                    simulator_factory=SimulatorFactory(args),
                    num_threads=args.num_threads,
-                   exit_0=args.exit_0)
-
-    def __init__(self,  # pylint: disable=too-many-locals, too-many-arguments
+                   exit_0=args.exit_0,
+                   shared_parse_cache=args.shared_parse_cache,
+                   database_backend=args.database_backend,
+                   database_gc=args.db_gc,
+                   runner_backend=args.runner_backend,
+                   shard=args.shard,
+                   test_history=args.test_history,
+                   use_result_cache=args.result_cache,
+                   coordinator=args.coordinator,
+                   worker=args.worker,
+                   num_parse_processes=args.parse_processes)
+
+    def __init__(self,  # pylint: disable=too-many-locals, too-many-arguments, too-many-statements
                  output_path,
                  simulator_factory,
                  clean=False,
@@ -299,6 +337,18 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
                  no_color=False,
                  verbose=False,
                  xunit_xml=None,
+                 xunit_xml_output="failed",
+                 xunit_xml_max_output=None,
+                 json_report=None,
+                 event_log=None,
+                 progress_interval=None,
+                 timeout=None,
+                 retries=0,
+                 output_tail=None,
+                 output_size_cap=None,
+                 compress_output=False,
+                 memory_budget=None,
+                 license_limit=None,
                  log_level="warning",
                  test_filter=None,
                  list_only=False,
@@ -309,7 +359,17 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
                  vhdl_standard='2008',
                  compile_builtins=True,
                  num_threads=1,
-                 exit_0=False):
+                 exit_0=False,
+                 shared_parse_cache=None,
+                 database_backend="log",
+                 database_gc=False,
+                 runner_backend="thread",
+                 shard=None,
+                 test_history=None,
+                 use_result_cache=False,
+                 coordinator=None,
+                 worker=None,
+                 num_parse_processes=1):
 
         self._configure_logging(log_level)
         self._elaborate_only = elaborate_only
@@ -322,6 +382,16 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
 
         self._verbose = verbose
         self._xunit_xml = xunit_xml
+        self._xunit_xml_output = xunit_xml_output
+        self._xunit_xml_max_output = xunit_xml_max_output
+        self._json_report = json_report
+        self._event_log = None if event_log is None else EventLog.open(event_log)
+        self._progress_interval = progress_interval
+        self._timeout = timeout
+        self._retries = retries
+        self._output_tail = output_tail
+        self._output_size_cap = output_size_cap
+        self._compress_output = compress_output
 
         self._test_filter = test_filter if test_filter is not None else lambda name: True
         self._list_only = list_only
@@ -336,11 +406,33 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
         self._use_debug_codecs = use_debug_codecs
 
         self._simulator_factory = simulator_factory
+
+        if test_history is None:
+            self._test_history_file_name = join(self._output_path, "test_history.json")
+        else:
+            self._test_history_file_name = abspath(test_history)
+        # Loaded before the output path is cleaned such that it is kept
+        self._test_history = TestHistory.load(self._test_history_file_name)
+        self._shard = shard
+        self._use_result_cache = use_result_cache
+        self._worker_address = worker
         self._create_output_path(clean)
 
+        self._database_backend = database_backend
+        self._database_gc = database_gc
+        self._num_parse_processes = num_parse_processes
+        self._database = None
         self._project = None
-        self._create_project()
+        self._create_project(shared_parse_cache)
+        if num_threads == "auto":
+            num_threads = cpu_count()
+            if memory_budget is None:
+                memory_budget = "auto"
         self._num_threads = num_threads
+        self._memory_budget = memory_budget
+        self._license_limit = license_limit
+        self._runner_backend = runner_backend
+        self._coordinator_address = coordinator
         self._exit_0 = exit_0
 
         self._test_bench_list = TestBenchList()
@@ -348,15 +440,25 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
         if compile_builtins:
             self.add_builtins(library_name="vunit_lib")
 
-    def _create_project(self):
+    def _create_project(self, shared_parse_cache=None):
         """
         Create Project instance
         """
-        database = self._create_database()
+        self._database = self._create_database()
+        database = PickledDataBase(self._database)
+        shared_database = None
+        if shared_parse_cache is None and self._worker_address is not None:
+            # Read the parse results of the coordinator without modifying its database
+            shared_parse_cache = self._database_path(self._output_path)
+        if shared_parse_cache is not None:
+            shared_database = self._open_shared_database(shared_parse_cache)
+        content_hash_cache = ContentHashCache(database=database)
         self._project = Project(
-            vhdl_parser=CachedVHDLParser(database=database),
-            verilog_parser=VerilogParser(database=database),
-            depend_on_package_body=self._simulator_factory.package_users_depend_on_bodies())
+            vhdl_parser=CachedVHDLParser(database=database, shared_database=shared_database),
+            verilog_parser=VerilogParser(database=database, content_hash_cache=content_hash_cache),
+            depend_on_package_body=self._simulator_factory.package_users_depend_on_bodies(),
+            num_parse_processes=self._num_parse_processes,
+            content_hash_cache=content_hash_cache)
 
     def _create_database(self):
         """
@@ -365,13 +467,12 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
         Check for Python version used to create the database is the
         same as the running python instance or re-create
         """
-        project_database_file_name = join(self._output_path, "project_database")
         create_new = False
         key = b"version"
-        version = str((6, sys.version)).encode()
+        version = DATABASE_VERSION
         database = None
         try:
-            database = DataBase(project_database_file_name)
+            database = GenerationDataBase(self._open_database())
             create_new = (key not in database) or (database[key] != version)
         except KeyboardInterrupt:
             raise
@@ -380,8 +481,71 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
             create_new = True
 
         if create_new:
-            database = DataBase(project_database_file_name, new=True)
-        database[key] = version
+            if database is not None:
+                database.close()
+            database = GenerationDataBase(self._open_database(new=True))
+            database[key] = version
+
+        return database
+
+    def _open_database(self, new=False):
+        """
+        Open the project database using the selected backend
+        """
+        if self._worker_address is not None:
+            path = self._database_path(self._worker_output_path)
+        else:
+            path = self._database_path(self._output_path)
+
+        if self._database_backend == "log":
+            return LogDataBase(path, new=new)
+        return DataBase(path, new=new)
+
+    def _database_path(self, output_path):
+        """
+        Return the path of the project database of the selected backend within output_path
+        """
+        if self._database_backend == "log":
+            return join(output_path, "project_database.log")
+        return join(output_path, "project_database")
+
+    def _close_database(self):
+        """
+        Close the project database writing any pending index
+        Removes all entries not used by this run when database garbage collection was requested
+        """
+        if self._database is None:
+            return
+
+        if self._database_gc:
+            statistics = self._database.remove_unused(measure_kept=True)
+            print("Project database garbage collection removed %i entries (%s) and kept %i entries (%s)"
+                  % (statistics["removed_entries"], _format_size(statistics["removed_bytes"]),
+                     statistics["kept_entries"], _format_size(statistics["kept_bytes"])))
+
+        self._database.close()
+        self._database = None
+
+    @staticmethod
+    def _open_shared_database(path):
+        """
+        Open a read-only database of parse results shared from another output path
+
+        Returns None if the database does not exist or was created by another Python version
+        """
+        if not exists(path):
+            LOGGER.warning("Shared parse cache %s does not exist", path)
+            return None
+
+        if isdir(path):
+            database = DataBase(path)
+        else:
+            database = LogDataBase(path, read_only=True)
+        key = b"version"
+        if key not in database or database[key] != DATABASE_VERSION:
+            LOGGER.warning("Shared parse cache %s was created by another VUnit or Python version and is ignored",
+                           path)
+            return None
 
         return PickledDataBase(database)
 
@@ -662,7 +826,8 @@ class VUnit(object):  # pylint: disable=too-many-instance-attributes, too-many-p
             preprocessors = [p for p in preprocessors if p is not None]
             preprocessors = self._external_preprocessors + preprocessors
 
-        if len(preprocessors) == 0:
+        if len(preprocessors) == 0 or self._worker_address is not None:
+            # Workers only run tests compiled by the coordinator from its preprocessed files
             return file_name
 
         code = ostools.read_file(file_name)
@@ -735,6 +900,10 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
         except:  # pylint: disable=bare-except
             traceback.print_exc()
             exit(1)
+        finally:
+            self._close_database()
+            if self._event_log is not None:
+                self._event_log.close()
 
         if (not all_ok) and (not self._exit_0):
             exit(1)
@@ -748,8 +917,86 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
         self._test_bench_list.warn_when_empty()
         test_list = self._test_bench_list.create_tests(simulator_if, self._elaborate_only)
         test_list.keep_matches(self._test_filter)
+        if self._shard is not None:
+            shard_index, num_shards = self._shard
+            test_list.keep_shard(shard_index, num_shards, self._test_history)
         return test_list
 
+    def _test_bench_source_files(self, test_list):
+        """
+        Return the source files of the test benches of the test suites in the test list
+        """
+        test_bench_names = set(".".join(test_suite.name.split(".")[:2]) for test_suite in test_list)
+        source_files = set()
+        for test_bench in self._test_bench_list.get_test_benches():
+            if "%s.%s" % (test_bench.library_name, test_bench.name) in test_bench_names:
+                source_files.update(self._source_files_of_test_bench(test_bench))
+        return source_files
+
+    @staticmethod
+    def _source_files_of_test_bench(test_bench):
+        """
+        Return the source files of the design unit and architectures of the test bench
+        """
+        design_unit = test_bench.design_unit
+        source_files = set([design_unit.source_file])
+        if design_unit.is_entity:
+            source_files.update(design_unit.architecture_source_files.values())
+        return source_files
+
+    def _fingerprint_test_suites(self, test_list, simulator_if):
+        """
+        Return the fingerprint of the inputs of each test suite keyed by test suite name
+        """
+        dependency_graph = self._project.create_dependency_graph(implementation_dependencies=True)
+        simulator_identity = "%s %s" % (simulator_if.identity(), about.version())
+        content_hashes = {}
+        fingerprints = {}
+        for test_suite in test_list:
+            config = test_suite.config
+            key = (config.library_name, config.design_unit_name)
+            if key not in content_hashes:
+                test_bench = self._test_bench_list.get_test_bench(*key)
+                source_files = dependency_graph.get_dependencies(self._source_files_of_test_bench(test_bench))
+                content_hashes[key] = [source_file.content_hash for source_file in source_files]
+            fingerprints[test_suite.name] = create_fingerprint(config,
+                                                               content_hashes[key],
+                                                               simulator_identity,
+                                                               self._elaborate_only)
+        return fingerprints
+
+    def _add_cached_results(self, test_list, fingerprints, result_cache, report):
+        """
+        Add test suites which passed with the same fingerprint as cached to the report
+        and return a test list with the other test suites
+        """
+        remaining = TestList()
+        for test_suite in test_list:
+            if result_cache.is_cached(test_suite.test_cases, fingerprints[test_suite.name]):
+                output_file_name = join(create_output_path(self._test_output_path, test_suite.name),
+                                        "output.txt.gz" if self._compress_output else "output.txt")
+                for test_name in test_suite.test_cases:
+                    report.add_result(test_name, PASSED, 0.0, output_file_name, cached=True)
+                    if self._event_log is not None:
+                        self._event_log.emit("test_result", test=test_name, status=PASSED.name, time=0.0,
+                                             attempts=1, flaky=False, cached=True,
+                                             output_file_name=output_file_name)
+            else:
+                remaining.add_suite(test_suite)
+        return remaining
+
+    @staticmethod
+    def _record_results(test_list, fingerprints, result_cache, report):
+        """
+        Record the fingerprints of the test suites which were run
+        """
+        for test_suite in test_list:
+            for test_name in test_suite.test_cases:
+                if report.has_test(test_name) and not report.result_of(test_name).cached:
+                    result_cache.add_result(test_name,
+                                            report.result_of(test_name).passed,
+                                            fingerprints[test_suite.name])
+
     def _main(self):
         """
         Base vunit main function without performing exit
@@ -758,6 +1005,9 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
         if self._list_only:
             return self._main_list_only()
 
+        elif self._worker_address is not None:
+            return self._main_worker()
+
         elif self._list_files_only:
             return self._main_list_files_only()
 
@@ -772,25 +1022,62 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
         """
         simulator_if = self._simulator_factory.create()
         test_list = self._create_tests(simulator_if)
-        self._compile(simulator_if)
+        if self._shard is None:
+            self._compile(simulator_if)
+        else:
+            self._compile(simulator_if, self._test_bench_source_files(test_list))
 
         start_time = ostools.get_time()
-        report = TestReport(printer=self._printer)
+        junit_xml_writer = None
+        if self._xunit_xml is not None:
+            junit_xml_writer = JUnitXmlWriter(self._xunit_xml, self._xunit_xml_output, self._xunit_xml_max_output)
+        report = TestReport(printer=self._printer,
+                            progress_interval=self._progress_interval,
+                            junit_xml_writer=junit_xml_writer)
+        result_cache = None
+        fingerprints = None
+        tests_to_run = test_list
+        if self._use_result_cache:
+            result_cache = ResultCache.load(self._result_cache_file_name)
+            fingerprints = self._fingerprint_test_suites(test_list, simulator_if)
+            tests_to_run = self._add_cached_results(test_list, fingerprints, result_cache, report)
         try:
-            self._run_test(test_list, report)
+            self._run_test(tests_to_run, report)
             simulator_if.post_process(self._simulator_factory.simulator_output_path)
         except KeyboardInterrupt:
             print()
             LOGGER.debug("_main: Caught Ctrl-C shutting down")
         finally:
+            if result_cache is not None:
+                self._record_results(test_list, fingerprints, result_cache, report)
+                result_cache.save(self._result_cache_file_name)
+            del tests_to_run
             del test_list
             del simulator_if
 
         report.set_real_total_time(ostools.get_time() - start_time)
-        self._post_process(report)
+        self._post_process(report, junit_xml_writer)
 
         return report.all_ok()
 
+    def _main_worker(self):
+        """
+        Main function when running tests for a coordinator
+        """
+        simulator_if = self._simulator_factory.create()
+        # All test suites such that the coordinator may request any of them
+        test_list = self._test_bench_list.create_tests(simulator_if, self._elaborate_only)
+        runner = TestRunner(report=None,
+                            output_path=self._worker_output_path,
+                            verbose=self._verbose,
+                            timeout=self._timeout,
+                            output_tail=self._output_tail,
+                            output_size_cap=self._output_size_cap,
+                            compress_output=self._compress_output)
+        print("Connecting to coordinator at %s:%i" % self._worker_address)
+        runner.run_worker(test_list, connect(self._worker_address))
+        return True
+
     def _main_list_only(self):
         """
         Main function when only listing test cases
@@ -823,7 +1110,14 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
     def _create_output_path(self, clean):
         """
         Create or re-create the output path if necessary
+
+        Workers only create their own directory within the output path shared with the coordinator
         """
+        if self._worker_address is not None:
+            if not exists(self._worker_output_path):
+                os.makedirs(self._worker_output_path)
+            return
+
         if clean:
             ostools.renew_path(self._output_path)
         elif not exists(self._output_path):
@@ -835,6 +1129,18 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
     def vhdl_standard(self):
         return self._vhdl_standard
 
+    @property
+    def _test_output_path(self):
+        return join(self._output_path, "test_output")
+
+    @property
+    def _result_cache_file_name(self):
+        return join(self._output_path, "result_cache.json")
+
+    @property
+    def _worker_output_path(self):
+        return join(self._output_path, "worker_output")
+
     @property
     def _preprocessed_path(self):
         return join(self._output_path, "preprocessed")
@@ -847,32 +1153,80 @@ avoid location preprocessing of other functions sharing name with a VUnit log or
     def use_debug_codecs(self):
         return self._use_debug_codecs
 
-    def _compile(self, simulator_if):
+    def _compile(self, simulator_if, target_files=None):
         """
-        Compile entire project
+        Compile entire project or only the dependencies of the target files
         """
         simulator_if.compile_project(self._project,
-                                     continue_on_error=self._keep_compiling)
+                                     continue_on_error=self._keep_compiling,
+                                     target_files=target_files,
+                                     event_log=self._event_log)
 
     def _run_test(self, test_cases, report):
         """
         Run the test suites and return the report
         """
+        coordinator = None
+        if self._coordinator_address is not None:
+            coordinator = Coordinator(self._coordinator_address)
+            print("Coordinator listening on %s:%i" % coordinator.address)
+
         runner = TestRunner(report,
-                            join(self._output_path, "test_output"),
+                            self._test_output_path,
                             verbose=self._verbose,
-                            num_threads=self._num_threads)
-        runner.run(test_cases)
+                            num_threads=self._num_threads,
+                            backend=self._runner_backend,
+                            test_history=self._test_history,
+                            coordinator=coordinator,
+                            timeout=self._timeout,
+                            admission=self._create_admission_controller(),
+                            retries=self._retries,
+                            output_tail=self._output_tail,
+                            output_size_cap=self._output_size_cap,
+                            compress_output=self._compress_output,
+                            event_log=self._event_log)
+        try:
+            runner.run(test_cases)
+        finally:
+            if coordinator is not None:
+                coordinator.close()
+            self._test_history.save(self._test_history_file_name)
 
-    def _post_process(self, report):
+    def _create_admission_controller(self):
         """
-        Print the report to stdout and optionally write it to an XML file
+        Create the admission controller of the memory budget and license limit or None if there are none
+        """
+        memory_budget = self._memory_budget
+        if memory_budget == "auto":
+            memory_budget = available_memory()
+            if memory_budget is None:
+                LOGGER.warning("Could not determine the available memory, running without memory budget")
+
+        licenses = None
+        if self._license_limit is not None:
+            name, count = self._license_limit
+            if name is None:
+                name = self._simulator_factory.simulator_name
+            licenses = LicenseSemaphore(name, count)
+
+        if memory_budget is None and licenses is None:
+            return None
+
+        return AdmissionController(memory_budget=memory_budget,
+                                   licenses=licenses,
+                                   test_history=self._test_history)
+
+    def _post_process(self, report, junit_xml_writer=None):
+        """
+        Print the report to stdout and optionally complete the XML report and write a JSON file
         """
         report.print_str()
 
-        if self._xunit_xml is not None:
-            xml = report.to_junit_xml_str()
-            ostools.write_file(self._xunit_xml, xml)
+        if junit_xml_writer is not None:
+            junit_xml_writer.close()
+
+        if self._json_report is not None:
+            ostools.write_file(self._json_report, report.to_json_str())
 
     def add_builtins(self, library_name="vunit_lib", mock_lang=False, mock_log=False):
         """
@@ -1121,8 +1475,17 @@ class Library(object):
                                   "Use allow_empty=True to avoid exception,") % pattern)
             file_names += new_file_names
 
+        file_names = [self._preprocess(file_name, preprocessors) for file_name in file_names]
+
+        if not no_parse:
+            # Parse all Verilog files up front since it can be done in parallel
+            self._project.preparse_verilog_files([file_name for file_name in file_names
+                                                  if file_type_of(file_name) == "verilog"],
+                                                 include_dirs=_verilog_include_dirs(include_dirs),
+                                                 defines=defines)
+
         return SourceFileList(source_files=[
-            self.add_source_file(file_name, preprocessors, include_dirs, defines, vhdl_standard, no_parse=no_parse)
+            self._add_preprocessed_source_file(file_name, include_dirs, defines, vhdl_standard, no_parse=no_parse)
             for file_name in file_names])
 
     def add_source_file(self,  # pylint: disable=too-many-arguments
@@ -1145,15 +1508,25 @@ class Library(object):
            library.add_source_file("file.vhd")
 
         """
+        file_name = self._preprocess(file_name, preprocessors)
+        return self._add_preprocessed_source_file(file_name, include_dirs, defines, vhdl_standard, no_parse)
+
+    def _preprocess(self, file_name, preprocessors):
+        """
+        Preprocess file_name returning the name of the file to add
+        """
+        return self._parent._preprocess(  # pylint: disable=protected-access
+            self._library_name, abspath(file_name), preprocessors)
 
+    def _add_preprocessed_source_file(self,  # pylint: disable=too-many-arguments
+                                      file_name, include_dirs, defines, vhdl_standard, no_parse):
+        """
+        Add an already preprocessed source file to library
+        """
         file_type = file_type_of(file_name)
 
         if file_type == "verilog":
-            include_dirs = include_dirs if include_dirs is not None else []
-            include_dirs = add_verilog_include_dir(include_dirs)
-
-        file_name = self._parent._preprocess(  # pylint: disable=protected-access
-            self._library_name, abspath(file_name), preprocessors)
+            include_dirs = _verilog_include_dirs(include_dirs)
 
         source_file = self._project.add_source_file(file_name,
                                                     self._library_name,
@@ -1751,6 +2124,14 @@ def lower_generics(generics):
     return dict((name.lower(), value) for name, value in generics.items())
 
 
+def _verilog_include_dirs(include_dirs):
+    """
+    Return the include directories to use for a Verilog file including the VUnit include directory
+    """
+    include_dirs = include_dirs if include_dirs is not None else []
+    return add_verilog_include_dir(include_dirs)
+
+
 def _is_iterable_not_string(value):
     """
     Returns True if value is an iterable that is not a string
@@ -1759,3 +2140,14 @@ def _is_iterable_not_string(value):
         return isinstance(value, str)
     else:
         return isinstance(value, (str, unicode))  # pylint: disable=undefined-variable
+
+
+def _format_size(num_bytes):
+    """
+    Format a number of bytes for humans
+    """
+    for unit in ["B", "kB", "MB"]:
+        if num_bytes < 1024:
+            return "%.1f %s" % (num_bytes, unit)
+        num_bytes /= 1024.0
+    return "%.1f GB" % num_bytes
@@ -0,0 +1,132 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright (c) 2017, Lars Asplund lars.anders.asplund@gmail.com
+
+"""
+The parts of a parsed VHDL file needed by the project which are cached in the database
+"""
+
+
+class VHDLDesignFileSummary(object):  # pylint: disable=too-many-instance-attributes
+    """
+    The parts of a VHDLDesignFile needed by the project
+
+    Pickled as a tuple of built-in types together with a format version
+    such that loading it from the database is fast.
+    """
+
+    _format_version = 1
+
+    __slots__ = ("entities", "packages", "package_bodies", "architectures", "contexts",
+                 "component_instantiations", "configurations", "references", "test_cases", "pragmas")
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 entities=None,
+                 packages=None,
+                 package_bodies=None,
+                 architectures=None,
+                 contexts=None,
+                 component_instantiations=None,
+                 configurations=None,
+                 references=None,
+                 test_cases=None,
+                 pragmas=None):
+        self.entities = [] if entities is None else entities
+        self.packages = [] if packages is None else packages
+        self.package_bodies = [] if package_bodies is None else package_bodies
+        self.architectures = [] if architectures is None else architectures
+        self.contexts = [] if contexts is None else contexts
+        self.component_instantiations = [] if component_instantiations is None else component_instantiations
+        self.configurations = [] if configurations is None else configurations
+        self.references = [] if references is None else references
+        self.test_cases = [] if test_cases is None else test_cases
+        self.pragmas = [] if pragmas is None else pragmas
+
+    @classmethod
+    def from_design_file(cls, design_file):
+        """
+        Create summary of a VHDLDesignFile
+        """
+        return cls(entities=[DesignUnitSummary(entity.identifier,
+                                               generic_names=[generic.identifier for generic in entity.generics])
+                             for entity in design_file.entities],
+                   packages=[DesignUnitSummary(package.identifier) for package in design_file.packages],
+                   package_bodies=[DesignUnitSummary(body.identifier) for body in design_file.package_bodies],
+                   architectures=[DesignUnitSummary(arch.identifier, entity=arch.entity)
+                                  for arch in design_file.architectures],
+                   contexts=[DesignUnitSummary(context.identifier) for context in design_file.contexts],
+                   component_instantiations=list(design_file.component_instantiations),
+                   configurations=[DesignUnitSummary(config.identifier, entity=config.entity)
+                                   for config in design_file.configurations],
+                   references=list(design_file.references),
+                   test_cases=list(design_file.test_cases),
+                   pragmas=list(design_file.pragmas))
+
+    def to_tuple(self):
+        """
+        Return a tuple of built-in types
+        """
+        return (self._format_version,
+                [(entity.identifier, entity.generic_names) for entity in self.entities],
+                [package.identifier for package in self.packages],
+                [body.identifier for body in self.package_bodies],
+                [(arch.identifier, arch.entity) for arch in self.architectures],
+                [context.identifier for context in self.contexts],
+                self.component_instantiations,
+                [(config.identifier, config.entity) for config in self.configurations],
+                [(ref.reference_type, ref.library, ref.design_unit, ref.name_within) for ref in self.references],
+                self.test_cases,
+                self.pragmas)
+
+    def __reduce__(self):
+        return _vhdl_design_file_summary_from_tuple, (self.to_tuple(),)
+
+    @classmethod
+    def from_tuple(cls, value):
+        """
+        Create from tuple returned by to_tuple, returns None if the tuple has another format version
+        """
+        # Imported here since vhdl_parser imports this module
+        from vunit.vhdl_parser import VHDLReference
+
+        if not isinstance(value, tuple) or value[0] != cls._format_version:
+            return None
+
+        (_, entities, packages, package_bodies, architectures, contexts,
+         component_instantiations, configurations, references, test_cases, pragmas) = value
+        return cls(entities=[DesignUnitSummary(identifier, generic_names=generic_names)
+                             for identifier, generic_names in entities],
+                   packages=[DesignUnitSummary(identifier) for identifier in packages],
+                   package_bodies=[DesignUnitSummary(identifier) for identifier in package_bodies],
+                   architectures=[DesignUnitSummary(identifier, entity=entity)
+                                  for identifier, entity in architectures],
+                   contexts=[DesignUnitSummary(identifier) for identifier in contexts],
+                   component_instantiations=component_instantiations,
+                   configurations=[DesignUnitSummary(identifier, entity=entity)
+                                   for identifier, entity in configurations],
+                   references=[VHDLReference(*ref) for ref in references],
+                   test_cases=test_cases,
+                   pragmas=pragmas)
+
+
+def _vhdl_design_file_summary_from_tuple(value):
+    """
+    Unpickle a VHDLDesignFileSummary
+    """
+    return VHDLDesignFileSummary.from_tuple(value)
+
+
+class DesignUnitSummary(object):
+    """
+    The identifier of a design unit together with the entity of
+    architectures and configurations and the generic names of entities
+    """
+
+    __slots__ = ("identifier", "entity", "generic_names")
+
+    def __init__(self, identifier, entity=None, generic_names=None):
+        self.identifier = identifier
+        self.entity = entity
+        self.generic_names = generic_names
@@ -12,6 +12,8 @@ import re
 from os.path import abspath
 import logging
 from vunit.hashing import hash_string
+from vunit.test_scanner import find_vhdl_test_cases, find_pragmas
+from vunit.vhdl_design_file_summary import VHDLDesignFileSummary
 LOGGER = logging.getLogger(__name__)
 
 
@@ -20,47 +22,65 @@ class VHDLParser(object):
     Parses a single VHDL file
     """
 
-    def __init__(self):
-        pass
-
     @staticmethod
     def parse(code, file_name, content_hash=None):  # pylint: disable=unused-argument
         """
-        Parse the VHDL code and return a VHDLDesignFile parse result
+        Parse the VHDL code and return a VHDLDesignFileSummary parse result
         """
-        return VHDLDesignFile.parse(code)
+        return VHDLDesignFileSummary.from_design_file(VHDLDesignFile.parse(code))
 
 
 class CachedVHDLParser(object):
     """
     Parse a single VHDL file, caching the result to a database
+
+    Parse results are keyed by the content hash of the code such that
+    identical files at different locations share the same result. An
+    optional read-only shared database, such as the database of another
+    output path, is searched when the result is not found in the database.
     """
 
-    def __init__(self, database):
+    def __init__(self, database, shared_database=None):
         self._database = database
+        self._shared_database = shared_database
 
     def parse(self, code, file_name, content_hash=None):
         """
-        Parse the VHDL code and return a VHDLDesignFile parse result
+        Parse the VHDL code and return a VHDLDesignFileSummary parse result
         parse result is re-used if content hash found in database
         """
         file_name = abspath(file_name)
 
         if content_hash is None:
-            content_hash = "sha1:" + hash_string(code)
-        key = ("CachedVHDLParser.parse(%s)" % file_name).encode()
+            content_hash = hash_string(code)
+        key = ("CachedVHDLParser.parse(%s)" % content_hash).encode()
+
+        design_file = self._lookup(key)
+        if design_file is not None:
+            LOGGER.debug("Re-using cached VHDL parse results for %s with content_hash=%s",
+                         file_name, content_hash)
+        else:
+            design_file = VHDLDesignFileSummary.from_design_file(VHDLDesignFile.parse(code))
+            self._database[key] = design_file
 
-        if key in self._database:
-            design_file, old_content_hash = self._database[key]
-            if content_hash == old_content_hash:
-                LOGGER.debug("Re-using cached VHDL parse results for %s with content_hash=%s",
-                             file_name, content_hash)
-                return design_file
-
-        design_file = VHDLDesignFile.parse(code)
-        self._database[key] = design_file, content_hash
         return design_file
 
+    def _lookup(self, key):
+        """
+        Return the parse result stored with key or None when not found
+        """
+        if key in self._database:
+            # None when stored with another format version
+            return self._database[key]
+
+        if self._shared_database is not None and key in self._shared_database:
+            design_file = self._shared_database[key]
+            if design_file is not None:
+                self._database[key] = design_file
+            return design_file
+
+        return None
+
 
 class VHDLDesignFile(object):  # pylint: disable=too-many-instance-attributes
     """
@@ -74,7 +94,9 @@ class VHDLDesignFile(object):  # pylint: disable=too-many-instance-attributes
                  contexts=None,
                  component_instantiations=None,
                  configurations=None,
-                 references=None):
+                 references=None,
+                 test_cases=None,
+                 pragmas=None):
         self.entities = [] if entities is None else entities
         self.packages = [] if packages is None else packages
         self.package_bodies = [] if package_bodies is None else package_bodies
@@ -83,13 +105,18 @@ class VHDLDesignFile(object):  # pylint: disable=too-many-instance-attributes
         self.component_instantiations = [] if component_instantiations is None else component_instantiations
         self.configurations = [] if configurations is None else configurations
         self.references = [] if references is None else references
+        self.test_cases = [] if test_cases is None else test_cases
+        self.pragmas = [] if pragmas is None else pragmas
 
     @classmethod
     def parse(cls, code):
         """
         Return a new VHDLDesignFile instance by parsing the code
         """
-        code = remove_comments(code).lower()
+        pragmas = find_pragmas(code)
+        code = remove_comments(code)
+        test_cases = find_vhdl_test_cases(code)
+        code = code.lower()
         return cls(entities=list(VHDLEntity.find(code)),
                    architectures=list(VHDLArchitecture.find(code)),
                    packages=list(VHDLPackage.find(code)),
@@ -97,7 +124,9 @@ class VHDLDesignFile(object):  # pylint: disable=too-many-instance-attributes
                    contexts=list(VHDLContext.find(code)),
                    component_instantiations=list(cls._find_component_instantiations(code)),
                    configurations=list(VHDLConfiguration.find(code)),
-                   references=list(VHDLReference.find(code)))
+                   references=list(VHDLReference.find(code)),
+                   test_cases=test_cases,
+                   pragmas=pragmas)
 
     _component_re = re.compile(
         r"[a-zA-Z]\w*\s*\:\s*(?:component)?\s*(?:(?:[a-zA-Z]\w*)\.)?([a-zA-Z]\w*)\s*"
@@ -817,6 +846,8 @@ class VHDLReference(object):
     """
     Reference to design unit
     """
+    __slots__ = ("reference_type", "library", "design_unit", "name_within")
+
     _reference_types = ("package",
                         "context",
                         "entity",
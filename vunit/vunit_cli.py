@@ -41,6 +41,8 @@ from os.path import join, abspath
 import os
 from vunit.simulator_factory import SimulatorFactory
 from vunit.about import version
+from vunit.distributed import parse_address
+from vunit.admission import parse_license_limit
 
 
 class VUnitCLI(object):
@@ -118,6 +120,54 @@ def _create_argument_parser(description=None, for_documentation=False):
                         default=None,
                         help='Xunit test report .xml file')
 
+    parser.add_argument('--xunit-xml-output',
+                        default="failed",
+                        choices=["all", "failed", "none"],
+                        help='Embed the output of all, failed or none of the tests in the Xunit test report')
+
+    parser.add_argument('--xunit-xml-max-output', type=positive_int,
+                        default=None, metavar="CHARACTERS",
+                        help='Only embed the last CHARACTERS of the output of a test in the Xunit test report')
+
+    parser.add_argument('--json-report',
+                        default=None,
+                        help=('Test report .json file with the time, CPU time, peak memory '
+                              'and bytes written of each test'))
+
+    parser.add_argument('--event-log',
+                        default=None, metavar="FILE|FD",
+                        help=('Append JSON Lines events of compilation and test progress to FILE '
+                              'or to the open file descriptor FD as they happen'))
+
+    parser.add_argument('--progress-interval', type=positive_float,
+                        default=None, metavar="SECONDS",
+                        help=('Print a summary of the progress every SECONDS instead of a line per test '
+                              'for huge runs. Failures are still printed when they happen.'))
+
+    parser.add_argument('--timeout', type=positive_float,
+                        default=None, metavar="SECONDS",
+                        help=('Kill the simulator processes of a test suite running longer than SECONDS '
+                              'and fail its tests with a timeout. '
+                              'The timeout sim option of a test takes precedence.'))
+
+    parser.add_argument('--retries', type=non_negative_int,
+                        default=0, metavar="N",
+                        help=('Run a failed test suite again up to N times after the other test suites. '
+                              'Tests which pass after failing are reported as flaky.'))
+
+    parser.add_argument('--output-tail', type=positive_int,
+                        default=None, metavar="LINES",
+                        help=('Keep only the last LINES lines of the output of a test in memory '
+                              'and print them instead of the whole output when the test fails'))
+
+    parser.add_argument('--output-size-cap', type=megabytes_type,
+                        default=None, metavar="MEGABYTES",
+                        help='Truncate the output file of a test after MEGABYTES')
+
+    parser.add_argument('--compress-output', action='store_true',
+                        default=False,
+                        help='Gzip compress the output file of a test while it is written')
+
     parser.add_argument('--exit-0',
                         default=False,
                         action="store_true",
@@ -138,16 +188,91 @@ def _create_argument_parser(description=None, for_documentation=False):
                         help=("Log level of VUnit internal python logging. "
                               "Used for debugging"))
 
-    parser.add_argument('-p', '--num-threads', type=positive_int,
+    parser.add_argument('-p', '--num-threads', type=num_threads_type,
                         default=1,
                         help=('Number of tests to run in parallel. '
-                              'Test output is not continuously written in verbose mode with p > 1'))
+                              'Test output is not continuously written in verbose mode with p > 1. '
+                              'auto uses one thread per CPU and the available memory as --memory-budget.'))
+
+    parser.add_argument('--parse-processes', type=positive_int,
+                        default=1, metavar="N",
+                        help=('Parse Verilog files added in a batch using N processes. '
+                              'Only used where processes can be forked, otherwise the files are parsed serially.'))
+
+    parser.add_argument('--memory-budget', type=memory_budget_type,
+                        default=None, metavar="MEGABYTES",
+                        help=('Only start a test when the peak memory of the running tests recorded in the '
+                              'test history stays within MEGABYTES. auto uses the available memory.'))
+
+    parser.add_argument('--license-limit', type=license_limit_type,
+                        default=None, metavar="[NAME=]COUNT",
+                        help=('Run at most COUNT tests at a time using the license NAME. '
+                              'The limit is shared with all VUnit processes of the user on this host. '
+                              'NAME defaults to the simulator name.'))
+
+    parser.add_argument('--runner-backend',
+                        choices=["thread", "process"],
+                        default="thread",
+                        help=('Run parallel tests in threads of one Python process or in forked worker processes. '
+                              'The process backend lets Python pre_config and post_check hooks run on several cores '
+                              'but their side effects on Python state are not visible to other tests.'))
+
+    parser.add_argument('--shard', type=shard_type,
+                        default=None, metavar="INDEX/COUNT",
+                        help=('Only run shard INDEX out of COUNT shards of the tests. '
+                              'The shards are balanced using the test history and are only '
+                              'disjoint when all shards use the same test history and filter. '
+                              'Only the dependencies of the test benches of the shard are compiled.'))
+
+    parser.add_argument('--test-history', default=None,
+                        help=('Test history file with the runtimes used for scheduling and sharding. '
+                              'Default is test_history.json within the output path.'))
+
+    parser.add_argument('--result-cache', action='store_true',
+                        default=False,
+                        help=('Do not simulate tests which passed in an earlier run with the same fingerprint. '
+                              'The fingerprint covers the source files needed by the test bench, generics, '
+                              'sim options, pre_config, post_check and the path and modification time '
+                              'of the simulator executable. '
+                              'Results are only recorded with this flag, '
+                              'tests with a pre_config or post_check of unknown identity are always run.'))
+
+    parser.add_argument('--coordinator', type=coordinator_address_type,
+                        default=None, metavar="[HOST:]PORT",
+                        help=('Also run tests on workers connecting to this address. '
+                              'Listens on localhost unless HOST is given, use 0.0.0.0 to accept workers '
+                              'on other hosts. Use port 0 to let the operating system choose a free port.'))
+
+    parser.add_argument('--worker', type=worker_address_type,
+                        default=None, metavar="HOST:PORT",
+                        help=('Run tests for the coordinator at HOST:PORT instead of running tests. '
+                              'The worker must use the same run script and output path as the coordinator '
+                              'since the compiled libraries are used as they are. '
+                              'Workers only write to worker_output within the output path and ignore --clean.'))
 
     parser.add_argument("-u", "--unique-sim",
                         action="store_true",
                         default=False,
                         help="Do not re-use the same simulator process for running different test cases (slower)")
 
+    parser.add_argument('--shared-parse-cache',
+                        default=None,
+                        help=('Read-only project database within another output path. '
+                              'VHDL parse results of identical file contents found there are re-used.'))
+
+    parser.add_argument('--database-backend',
+                        choices=["log", "directory"],
+                        default="log",
+                        help=('Storage of the project database within the output path. '
+                              'log uses a single file, directory uses one file per entry.'))
+
+    parser.add_argument('--db-gc',
+                        action='store_true',
+                        default=False,
+                        help=('Remove all project database entries not used by this run '
+                              'and print size statistics. '
+                              'Entries unused for 10 runs are always removed.'))
+
     parser.add_argument('--version', action='version', version=version())
 
     SimulatorFactory.add_arguments(parser,
@@ -173,6 +298,97 @@ def positive_int(val):
         raise argparse.ArgumentTypeError("'%s' is not a valid positive int" % val)
 
 
+def non_negative_int(val):
+    """
+    ArgumentParse non-negative int check
+    """
+    try:
+        ival = int(val)
+        assert ival >= 0
+        return ival
+    except (ValueError, AssertionError):
+        raise argparse.ArgumentTypeError("'%s' is not a valid non-negative int" % val)
+
+
+def num_threads_type(val):
+    """
+    ArgumentParse positive int or auto check
+    """
+    if val == "auto":
+        return val
+    return positive_int(val)
+
+
+def memory_budget_type(val):
+    """
+    ArgumentParse MEGABYTES or auto check, returns bytes or auto
+    """
+    if val == "auto":
+        return val
+    return megabytes_type(val)
+
+
+def megabytes_type(val):
+    """
+    ArgumentParse positive MEGABYTES check, returns bytes
+    """
+    return int(positive_float(val) * 1024 * 1024)
+
+
+def license_limit_type(val):
+    """
+    ArgumentParse [NAME=]COUNT check, the name is None when not given
+    """
+    try:
+        return parse_license_limit(val)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'%s' is not a valid [NAME=]COUNT license limit" % val)
+
+
+def positive_float(val):
+    """
+    ArgumentParse positive float check
+    """
+    try:
+        fval = float(val)
+        assert fval > 0
+        return fval
+    except (ValueError, AssertionError):
+        raise argparse.ArgumentTypeError("'%s' is not a valid positive number" % val)
+
+
+def shard_type(val):
+    """
+    ArgumentParse INDEX/COUNT shard check, returns the zero based index and the count
+    """
+    try:
+        index, count = [int(part) for part in val.split("/")]
+        assert 1 <= index <= count
+        return index - 1, count
+    except (ValueError, AssertionError):
+        raise argparse.ArgumentTypeError("'%s' is not a valid INDEX/COUNT shard" % val)
+
+
+def coordinator_address_type(val):
+    """
+    ArgumentParse [HOST:]PORT check, the coordinator only listens on localhost unless a host is given
+    """
+    try:
+        return parse_address(val, default_host="localhost")
+    except ValueError:
+        raise argparse.ArgumentTypeError("'%s' is not a valid [HOST:]PORT address" % val)
+
+
+def worker_address_type(val):
+    """
+    ArgumentParse HOST:PORT check
+    """
+    try:
+        return parse_address(val, default_host="localhost")
+    except ValueError:
+        raise argparse.ArgumentTypeError("'%s' is not a valid HOST:PORT address" % val)
+
+
 def _parser_for_documentation():
     """
     Returns an argparse object used by sphinx for documentation in user_guide.rst